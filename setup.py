@@ -71,6 +71,8 @@ spotify_ext = Extension('spotify._spotify',
         'src/user.c',
         'src/pyspotify.c',
         'src/toplistbrowser.c',
+        'src/frames.c',
+        'src/view.c',
     ],
     include_dirs=['src'],
     libraries=['spotify'],
@@ -94,6 +96,8 @@ mockspotify_ext = Extension('spotify._mockspotify',
         'src/user.c',
         'src/pyspotify.c',
         'src/toplistbrowser.c',
+        'src/frames.c',
+        'src/view.c',
     ],
     include_dirs=['src'],
     libraries=['mockspotify'],
@@ -30,6 +30,7 @@ from spotify._spotify import ArtistBrowser
 from spotify._spotify import Image
 from spotify._spotify import User
 from spotify._spotify import ToplistBrowser
+from spotify._spotify import Frames
 
 from spotify._spotify import api_version
 from spotify._spotify import connect
@@ -3,6 +3,8 @@ The :mod:`spotify.audiosink` module provides audio sink wrappers for different
 audio sinks like ALSA, OSS, and PortAudio.
 """
 
+import threading
+import time
 import traceback
 
 
@@ -70,7 +72,7 @@ class BaseAudioSink(object):
         :param session: the current session
         :type session: :class:`spotify.Session`
         :param frames: the audio data
-        :type frames: :class:`buffer`
+        :type frames: :class:`spotify.Frames`
         :param frame_size: bytes per frame
         :type frame_size: :class:`int`
         :param num_frames: number of frames in this delivery
@@ -125,3 +127,153 @@ class BaseAudioSink(object):
                 or self._call_cache[func] != (args, kwargs)):
             self._call_cache[func] = (args, kwargs)
             func(*args, **kwargs)
+
+
+class BufferedSink(BaseAudioSink):
+    """
+    :class:`BufferedSink` wraps another audio sink, and decouples it from
+    libspotify's delivery thread.
+
+    The audio data is copied to a ring buffer, preallocated for
+    ``buffer_ms`` milliseconds of audio, and is written to the wrapped sink
+    from a dedicated thread. :meth:`music_delivery` never blocks: when the
+    buffer is full, it only consumes the frames that fit, and libspotify
+    delivers the rest again later.
+
+    Only the delivery thread writes to the buffer and only the writer thread
+    reads from it, each of them updating its own byte counter, so no lock is
+    shared between the two threads.
+
+    :param sink: the audio sink to write the audio data to
+    :type sink: :class:`BaseAudioSink`
+    :param buffer_ms: size of the buffer, in milliseconds of audio
+    :type buffer_ms: :class:`int`
+    """
+
+    #: How long to wait before writing again when the wrapped sink did not
+    #: consume any frames, in seconds.
+    retry_delay = 0.01
+
+    def __init__(self, sink, buffer_ms=500, **kwargs):
+        super(BufferedSink, self).__init__(**kwargs)
+        self.sink = sink
+        self.buffer_ms = buffer_ms
+
+        #: Number of times the buffer ran empty while playing.
+        self.underruns = 0
+        #: Number of deliveries which did not fit entirely in the buffer.
+        self.overruns = 0
+
+        self._session = None
+        self._format = None
+        self._buffer = None
+        self._written = 0       # updated by the delivery thread only
+        self._read = 0          # updated by the writer thread only
+        self._end_of_track = None
+        self._flush = False
+        self._paused = False
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def music_delivery(self, session, frames, frame_size, num_frames,
+            sample_type, sample_rate, channels):
+        if num_frames == 0:
+            return 0
+        audio_format = (frame_size, sample_type, sample_rate, channels)
+        if audio_format != self._format:
+            if self._written != self._read:
+                # Let the audio in the previous format play first.
+                return 0
+            size = sample_rate * self.buffer_ms // 1000 * frame_size
+            self._buffer = bytearray(max(size, frame_size))
+            self._format = audio_format
+        self._session = session
+        capacity = len(self._buffer)
+        free = capacity - (self._written - self._read)
+        consumed = min(num_frames, free // frame_size)
+        if consumed < num_frames:
+            self.overruns += 1
+        if consumed == 0:
+            return 0
+
+        length = consumed * frame_size
+        start = self._written % capacity
+        head = min(length, capacity - start)
+        self._buffer[start:start + head] = buffer(frames, 0, head)
+        if head < length:
+            self._buffer[:length - head] = buffer(frames, head, length - head)
+        self._written += length
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run)
+            self._thread.setDaemon(True)
+            self._thread.start()
+        self._wakeup.set()
+        return consumed
+
+    def _run(self):
+        """
+        Writes the buffered audio data to the wrapped sink.
+        """
+        playing = False
+        while True:
+            self._wakeup.clear()
+            if self._flush:
+                self._read = self._written
+                self._flush = False
+            end_of_track = self._end_of_track
+            if end_of_track is not None and self._read >= end_of_track:
+                self._end_of_track = None
+                playing = False
+                self.sink.end_of_track()
+            available = self._written - self._read
+            if self._paused or available == 0:
+                if available == 0 and playing:
+                    playing = False
+                    self.underruns += 1
+                self._wakeup.wait()
+                continue
+
+            buffer_ = self._buffer
+            frame_size, sample_type, sample_rate, channels = self._format
+            capacity = len(buffer_)
+            start = self._read % capacity
+            length = min(available, capacity - start)
+            num_frames = length // frame_size
+            consumed = self.sink.music_delivery(self._session,
+                buffer(buffer_, start, num_frames * frame_size), frame_size,
+                num_frames, sample_type, sample_rate, channels)
+            if consumed > 0:
+                playing = True
+                self._read += consumed * frame_size
+            else:
+                time.sleep(self.retry_delay)
+
+    def end_of_track(self):
+        """
+        Calls :meth:`end_of_track` of the wrapped sink once the buffered audio
+        data has been played.
+        """
+        if self._thread is None:
+            self.sink.end_of_track()
+        else:
+            self._end_of_track = self._written
+            self._wakeup.set()
+
+    def start(self):
+        self._paused = False
+        self.sink.start()
+        self._wakeup.set()
+
+    def stop(self):
+        """
+        Drops the buffered audio data, and stops the wrapped sink.
+        """
+        self._end_of_track = None
+        self._flush = True
+        self.sink.stop()
+        self._wakeup.set()
+
+    def pause(self):
+        self._paused = True
+        self.sink.pause()
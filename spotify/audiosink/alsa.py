@@ -10,6 +10,7 @@ class AlsaSink(BaseAudioSink):
         super(AlsaSink, self).__init__(**kwargs)
         self._mode = kwargs.get('mode', alsaaudio.PCM_NORMAL)
         self._device = None
+        self._params = None
         if sys.byteorder == 'little':
             self._format = alsaaudio.PCM_FORMAT_S16_LE
         elif sys.byteorder == 'big':
@@ -19,8 +20,12 @@ class AlsaSink(BaseAudioSink):
             sample_type, sample_rate, channels):
         if self._device is None:
             self._device = alsaaudio.PCM(mode=self._mode)
-        self._call_if_needed(self._device.setformat, self._format)
-        self._call_if_needed(self._device.setperiodsize, num_frames)
-        self._call_if_needed(self._device.setrate, sample_rate)
-        self._call_if_needed(self._device.setchannels, channels)
+            self._device.setformat(self._format)
+        # Only look at each parameter when one of them has changed
+        params = (num_frames, sample_rate, channels)
+        if params != self._params:
+            self._call_if_needed(self._device.setperiodsize, num_frames)
+            self._call_if_needed(self._device.setrate, sample_rate)
+            self._call_if_needed(self._device.setchannels, channels)
+            self._params = params
         return self._device.write(frames)
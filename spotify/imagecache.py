@@ -0,0 +1,341 @@
+"""
+A cache of images, such as album covers, keyed by their image id.
+
+libspotify loads an image again every time it is created with
+:meth:`spotify.Session.image_create`, and the data of a
+:class:`spotify.Image` is only valid as long as the image is alive. An
+:class:`ImageCache` keeps copies of the image data in memory, within a
+maximum size in bytes, and optionally in a directory on disk.
+"""
+
+import binascii
+import collections
+import errno
+import logging
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger('spotify.imagecache')
+
+
+class ImageCache(object):
+    """
+    Stores the data of images in memory, and in the directory *path* if it is
+    given.
+
+    The least recently used images are removed when the data kept in memory
+    exceeds *max_bytes* bytes, or when the data kept on disk exceeds
+    *max_disk_bytes* bytes.
+
+    The cache can be used from several threads.
+
+    :param max_bytes:       maximum size of the data kept in memory
+    :type max_bytes:        :class:`int`
+    :param path:            the directory of the disk tier, or ``None`` to
+                            only keep images in memory
+    :type path:             :class:`str`
+    :param max_disk_bytes:  maximum size of the data kept on disk, or
+                            ``None`` for no limit
+    :type max_disk_bytes:   :class:`int`
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, path=None,
+                 max_disk_bytes=None):
+        self.max_bytes = max_bytes
+        self.path = path
+        self.max_disk_bytes = max_disk_bytes
+        #: Number of images found in memory.
+        self.hits = 0
+        #: Number of images found on disk.
+        self.disk_hits = 0
+        #: Number of images loaded with libspotify.
+        self.misses = 0
+        #: Number of loads which joined a load of the same image in progress.
+        self.coalesced = 0
+        self._lock = threading.RLock()
+        self._memory = collections.OrderedDict()
+        self._memory_bytes = 0
+        self._loading = {}
+        self._images = {}
+        self._disk = collections.OrderedDict()
+        self._disk_bytes = 0
+        if path is not None:
+            self._scan_disk()
+
+    def __len__(self):
+        return len(self._memory)
+
+    def memory_bytes(self):
+        """
+        Returns the size of the data kept in memory.
+        """
+        return self._memory_bytes
+
+    def disk_bytes(self):
+        """
+        Returns the size of the data kept on disk.
+        """
+        return self._disk_bytes
+
+    def _scan_disk(self):
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+        files = []
+        for name in os.listdir(self.path):
+            if name.endswith('.tmp'):
+                # Left by a write which did not complete
+                self._unlink(name)
+                continue
+            if len(name) != 40:
+                continue
+            st = os.stat(os.path.join(self.path, name))
+            files.append((st.st_mtime, name, st.st_size))
+        for mtime, name, size in sorted(files):
+            self._disk[name] = size
+            self._disk_bytes += size
+
+    def get(self, image_id):
+        """
+        Returns the data of the image *image_id*, the 20 bytes returned by
+        :meth:`spotify.Album.cover`, or ``None`` if it is not in the cache.
+        """
+        with self._lock:
+            data = self._memory.pop(image_id, None)
+            if data is not None:
+                self.hits += 1
+                self._memory[image_id] = data
+                return data
+            if self.path is None:
+                return None
+            name = binascii.hexlify(image_id)
+            if name not in self._disk:
+                return None
+        data = self._read_disk(name)
+        with self._lock:
+            if data is None:
+                self._forget_disk(name)
+            else:
+                self.disk_hits += 1
+                self._store_memory(image_id, data)
+                if name in self._disk:
+                    # Most recently used last
+                    self._disk[name] = self._disk.pop(name)
+        return data
+
+    def put(self, image_id, data):
+        """
+        Stores *data* for the image *image_id*.
+        """
+        data = str(data)
+        with self._lock:
+            self._store_memory(image_id, data)
+        if self.path is not None:
+            self._write_disk(image_id, data)
+
+    def store(self, image):
+        """
+        Stores the data of a loaded :class:`spotify.Image`, under its
+        :meth:`spotify.Image.image_id`.
+
+        :return: whether the image was loaded and stored.
+        :rtype: :class:`bool`
+        """
+        if not image.is_loaded() or image.error() != 0:
+            return False
+        self.put(image.image_id(), image.data())
+        return True
+
+    def remove(self, image_id):
+        """
+        Removes the image *image_id* from the cache, if it is there.
+        """
+        name = binascii.hexlify(image_id)
+        with self._lock:
+            data = self._memory.pop(image_id, None)
+            if data is not None:
+                self._memory_bytes -= len(data)
+            if self.path is not None:
+                self._forget_disk(name)
+        if self.path is not None:
+            self._unlink(name)
+
+    def clear(self):
+        """
+        Removes all the images from memory and from disk.
+        """
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            names = [self._forget_disk(name) for name in list(self._disk)]
+        for name in names:
+            self._unlink(name)
+
+    def _store_memory(self, image_id, data):
+        old = self._memory.pop(image_id, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        if len(data) > self.max_bytes:
+            return
+        self._memory[image_id] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _read_disk(self, name):
+        # Called without the lock held, like _write_disk()
+        filename = os.path.join(self.path, name)
+        try:
+            with open(filename, 'rb') as f:
+                data = f.read()
+            os.utime(filename, None)
+        except (IOError, OSError) as e:
+            # The file may have been evicted since it was looked up
+            logger.debug('Could not read image %s: %s', name, e)
+            self._unlink(name)
+            return None
+        return data
+
+    def _write_disk(self, image_id, data):
+        # Called without the lock held, so that readers and the libspotify
+        # thread do not wait for the disk
+        name = binascii.hexlify(image_id)
+        if self.max_disk_bytes is not None and len(data) > self.max_disk_bytes:
+            return
+        tmp = None
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+            os.rename(tmp, os.path.join(self.path, name))
+        except (IOError, OSError):
+            logger.exception('Could not write image %s', name)
+            if tmp is not None:
+                self._unlink(os.path.basename(tmp))
+            return
+        with self._lock:
+            self._disk_bytes -= self._disk.pop(name, 0)
+            self._disk[name] = len(data)
+            self._disk_bytes += len(data)
+            evicted = []
+            if self.max_disk_bytes is not None:
+                while self._disk_bytes > self.max_disk_bytes:
+                    evicted.append(self._forget_disk(next(iter(self._disk))))
+        for name in evicted:
+            self._unlink(name)
+
+    def _forget_disk(self, name):
+        self._disk_bytes -= self._disk.pop(name, 0)
+        return name
+
+    def _unlink(self, name):
+        try:
+            os.remove(os.path.join(self.path, name))
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                logger.exception('Could not remove image %s', name)
+
+    def load(self, session, image_id, callback=None, userdata=None):
+        """
+        Gets the data of the image *image_id*, from the cache if it is there,
+        else by loading it with :meth:`spotify.Session.image_create`.
+
+        *callback* is called with the data, or ``None`` if the image could not
+        be loaded, and *userdata* once the data is available. If the image is
+        in the cache, it is called before this method returns. Loads of the
+        same image made while one is in progress share it, so that an image
+        shared by many albums is only loaded and stored once.
+
+        :param session: the session to load images with
+        :type session:  :class:`spotify.Session`
+        :rtype:         :class:`str` or ``None`` if the image is not in the
+                        cache
+        """
+        data = self.get(image_id)
+        with self._lock:
+            if data is None:
+                loading = self._loading.get(image_id)
+                if loading is not None:
+                    self.coalesced += 1
+                    loading.append((callback, userdata))
+                    return None
+                self.misses += 1
+                loading = self._loading[image_id] = [(callback, userdata)]
+        if data is not None:
+            if callback is not None:
+                callback(data, userdata)
+            return data
+
+        try:
+            image = session.image_create(image_id)
+            loaded = image.is_loaded()
+            if not loaded:
+                with self._lock:
+                    # Keep the image alive until it is loaded
+                    self._images[image_id] = image
+                image.add_load_callback(self._loaded, image_id)
+        except:
+            with self._lock:
+                callbacks = self._loading.pop(image_id, ())
+                self._images.pop(image_id, None)
+            # The caller gets the error, the loads which joined it get None
+            self._call_back(callbacks[1:], None)
+            raise
+        if loaded:
+            self._loaded(image, image_id)
+        return None
+
+    def _loaded(self, image, image_id):
+        data = None
+        if image.error() == 0:
+            data = str(image.data())
+        with self._lock:
+            if data is not None:
+                self._store_memory(image_id, data)
+            callbacks = self._loading.pop(image_id, ())
+            self._images.pop(image_id, None)
+        self._call_back(callbacks, data)
+        if data is not None and self.path is not None:
+            self._write_disk(image_id, data)
+
+    def _call_back(self, callbacks, data):
+        for callback, userdata in callbacks:
+            if callback is None:
+                continue
+            try:
+                callback(data, userdata)
+            except Exception:
+                logger.exception('Error in image callback')
+
+    def album_cover(self, session, album, callback=None, userdata=None):
+        """
+        Gets the cover of *album* like :meth:`load`. *callback* is called with
+        ``None`` if the album has no cover.
+
+        :type album:    :class:`spotify.Album`
+        :rtype:         :class:`str` or ``None`` if the cover is not in the
+                        cache
+        """
+        image_id = album.cover()
+        if image_id is None:
+            if callback is not None:
+                callback(None, userdata)
+            return None
+        return self.load(session, image_id, callback, userdata)
+
+    def stats(self):
+        """
+        :rtype:     :class:`dict`
+        :returns:   the number of ``hits``, ``disk_hits``, ``misses`` and
+                    ``coalesced`` loads, the number of ``entries`` in memory,
+                    and the ``memory_bytes`` and ``disk_bytes`` used.
+        """
+        with self._lock:
+            return {'hits': self.hits, 'disk_hits': self.disk_hits,
+                    'misses': self.misses, 'coalesced': self.coalesced,
+                    'entries': len(self._memory),
+                    'memory_bytes': self._memory_bytes,
+                    'disk_bytes': self._disk_bytes}
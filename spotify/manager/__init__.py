@@ -1,3 +1,6 @@
 from .session import SpotifySessionManager
 from .playlist import SpotifyPlaylistManager
 from .container import SpotifyContainerManager
+from .scheduler import RequestScheduler, INTERACTIVE, BATCH
+from .sync import PlaylistSynchronizer
+from .snapshot import PlaylistSnapshot
@@ -1,3 +1,7 @@
+import bisect
+
+from spotify import SpotifyError
+
 class SpotifyPlaylistManager:
     """
     Handles Spotify playlists callbacks. To implement you own callbacks,
@@ -7,26 +11,47 @@ class SpotifyPlaylistManager:
     standard error output (stderr).
     """
 
-    def __init__(self):
-        pass
+    #: If true, the track changes received while a playlist is being updated
+    #: (between two :meth:`playlist_update_in_progress` calls) are not given
+    #: to :meth:`tracks_added`, :meth:`tracks_moved` and
+    #: :meth:`tracks_removed`, but merged and given to :meth:`tracks_changed`
+    #: once the update is done. Only applies to playlists watched after it is
+    #: set.
+    coalesce_changes = False
 
     def watch(self, playlist, userdata=None):
         """
         Listen to modifications events on a playlist.
+
+        All the playlist events are dispatched to the callback methods of
+        this manager, through a single registration on the playlist.
         """
-        playlist.add_tracks_added_callback(self.tracks_added, userdata)
-        playlist.add_tracks_moved_callback(self.tracks_moved, userdata)
-        playlist.add_tracks_removed_callback(self.tracks_removed, userdata)
+        if self.coalesce_changes:
+            coalescer = _ChangesCoalescer(self, playlist, userdata)
+            # Subclasses do not call an __init__ method
+            self.__dict__.setdefault('_coalescers', []).append(coalescer)
+            playlist.add_manager(coalescer, userdata)
+        else:
+            playlist.add_manager(self, userdata)
 
     def unwatch(self, playlist, userdata=None):
         """
         Stop listening to events on the playlist.
         """
+        if self.coalesce_changes:
+            coalescers = self.__dict__.setdefault('_coalescers', [])
+            for coalescer in coalescers:
+                if coalescer.playlist == playlist \
+                        and coalescer.userdata is userdata:
+                    coalescers.remove(coalescer)
+                    try:
+                        playlist.remove_manager(coalescer, userdata)
+                    except SpotifyError:
+                        pass
+                    return
         try:
-            playlist.remove_callback(self.tracks_added, userdata)
-            playlist.remove_callback(self.tracks_moved, userdata)
-            playlist.remove_callback(self.tracks_removed, userdata)
-        except:
+            playlist.remove_manager(self, userdata)
+        except SpotifyError:
             pass
 
 ### Callbacks
@@ -61,6 +86,29 @@ class SpotifyPlaylistManager:
         """
         pass
 
+    def tracks_changed(self, playlist, removed, added, moved, userdata):
+        """
+        Callback
+
+        Called once a playlist is done updating, with all the track changes
+        made during the update merged, if :attr:`coalesce_changes` is set.
+
+        :param playlist:    playlist on which the event occured
+        :type playlist:     :class:`spotify.Playlist`
+        :param removed:     sorted positions, before the update, of the
+                            removed tracks
+        :type removed:      list of :class:`int`
+        :param added:       runs of added tracks, as ``(position, tracks)``
+                            tuples sorted by their position after the update
+        :type added:        list of :class:`tuple`
+        :param moved:       ``(old_position, new_position)`` tuples for the
+                            fewest tracks which need to be moved to give the
+                            tracks left their order after the update. The
+                            positions are before and after the update.
+        :type moved:        list of :class:`tuple`
+        """
+        pass
+
     def tracks_removed(self, playlist, tracks, userdata):
         """
         Callback
@@ -216,3 +264,118 @@ class SpotifyPlaylistManager:
         :type image:        :class:`str`
         """
         pass
+
+
+# Stands for a track added during an update in _ChangesCoalescer._state
+_ADDED = object()
+
+
+def _longest_increasing(values):
+    """
+    Returns the set of the indexes of a longest increasing subsequence of
+    values.
+    """
+    tails = []
+    tails_indexes = []
+    previous = [None] * len(values)
+    for i, value in enumerate(values):
+        j = bisect.bisect_left(tails, value)
+        if j:
+            previous[i] = tails_indexes[j - 1]
+        if j == len(tails):
+            tails.append(value)
+            tails_indexes.append(i)
+        else:
+            tails[j] = value
+            tails_indexes[j] = i
+    result = set()
+    i = tails_indexes[-1] if tails_indexes else None
+    while i is not None:
+        result.add(i)
+        i = previous[i]
+    return result
+
+
+class _ChangesCoalescer(object):
+    """
+    Registered on a playlist in place of a manager with
+    :attr:`SpotifyPlaylistManager.coalesce_changes` set. The playlist is
+    replayed as a list of positions before the update and added tracks while
+    an update is in progress, and the difference is given to the manager
+    once it is done. Other events are passed through.
+
+    The playlist calls :meth:`tracks_added_count` rather than
+    :meth:`tracks_added`, so that no :class:`spotify.Track` is created for
+    the tracks added during an update. Those still in the playlist once it
+    is done are read from it.
+    """
+
+    def __init__(self, manager, playlist, userdata):
+        self.manager = manager
+        self.playlist = playlist
+        self.userdata = userdata
+        self._state = None
+
+    def __getattr__(self, name):
+        return getattr(self.manager, name)
+
+    def playlist_update_in_progress(self, playlist, done, userdata):
+        if not done:
+            if self._state is None:
+                self._length = len(playlist)
+                self._state = range(self._length)
+        elif self._state is not None:
+            removed, added, moved = self._changes(playlist)
+            self._state = None
+            if removed or added or moved:
+                self.manager.tracks_changed(playlist, removed, added, moved,
+                                            userdata)
+        self.manager.playlist_update_in_progress(playlist, done, userdata)
+
+    def tracks_added(self, playlist, tracks, position, userdata):
+        if self._state is None:
+            return self.manager.tracks_added(playlist, tracks, position,
+                                             userdata)
+        self._state[position:position] = [_ADDED] * len(tracks)
+
+    def tracks_added_count(self, playlist, num_tracks, position, userdata):
+        if self._state is None:
+            tracks = list(playlist[position:position + num_tracks])
+            return self.manager.tracks_added(playlist, tracks, position,
+                                             userdata)
+        self._state[position:position] = [_ADDED] * num_tracks
+
+    def tracks_removed(self, playlist, tracks, userdata):
+        if self._state is None:
+            return self.manager.tracks_removed(playlist, tracks, userdata)
+        for i in sorted(tracks, reverse=True):
+            del self._state[i]
+
+    def tracks_moved(self, playlist, tracks, new_position, userdata):
+        if self._state is None:
+            return self.manager.tracks_moved(playlist, tracks, new_position,
+                                             userdata)
+        indexes = sorted(tracks)
+        moving = [self._state[i] for i in indexes]
+        for i in reversed(indexes):
+            del self._state[i]
+        new_position -= bisect.bisect_left(indexes, new_position)
+        self._state[new_position:new_position] = moving
+
+    def _changes(self, playlist):
+        kept = []
+        runs = []
+        for position, item in enumerate(self._state):
+            if item is _ADDED:
+                if runs and runs[-1][1] == position:
+                    runs[-1][1] += 1
+                else:
+                    runs.append([position, position + 1])
+            else:
+                kept.append((item, position))
+        added = [(start, list(playlist[start:end])) for start, end in runs]
+        in_order = _longest_increasing([old for old, new in kept])
+        moved = [kept[i] for i in range(len(kept)) if i not in in_order]
+        removed = sorted(set(range(self._length))
+                         .difference(old for old, new in kept))
+        return removed, added, moved
@@ -0,0 +1,255 @@
+import collections
+import logging
+import threading
+
+import spotify
+
+logger = logging.getLogger('spotify.manager.scheduler')
+
+#: Priority class of the requests a user is waiting for.
+INTERACTIVE = 0
+#: Priority class of background requests, started when no interactive
+#: request of the same type is waiting.
+BATCH = 1
+
+
+class ScheduledRequest(object):
+    """
+    A request submitted to a :class:`RequestScheduler`.
+    """
+
+    def __init__(self, lock, start, callback, userdata):
+        self._lock = lock
+        self._start = start
+        self._callback = callback
+        self._userdata = userdata
+        self._queue = None
+        self._done = False
+        #: The request object returned when the request was started, or
+        #: :class:`None` while it is waiting.
+        self.request = None
+
+    def cancel(self):
+        """
+        Removes the request from the queue if it has not been started yet.
+
+        :return: whether the request was cancelled.
+        :rtype: :class:`bool`
+        """
+        with self._lock:
+            if self._queue is None:
+                return False
+            self._queue.remove(self)
+            self._queue = None
+            self._done = True
+            return True
+
+
+class RequestScheduler(object):
+    """
+    Limits the number of requests to the Spotify service which are in
+    progress at the same time, queuing the others.
+
+    Each request has a type, such as ``'search'`` or ``'image'``, and at most
+    ``max_in_flight[type]`` requests of a type are in progress at once. A slot
+    is released when the completion callback of the request is called.
+
+    Waiting requests of the :data:`INTERACTIVE` priority class are started
+    before those of the :data:`BATCH` class. Within a class, the requests of
+    the different *owners* (any hashable identifying who made them, such as
+    a user or a view) are started in turn, so that one owner submitting many
+    requests does not hold back the others.
+
+    :param max_in_flight: the maximum number of requests in progress, by
+        request type.
+    :type max_in_flight: :class:`dict`
+    :param default_max_in_flight: the maximum for the other request types.
+    :type default_max_in_flight: :class:`int`
+    """
+
+    def __init__(self, max_in_flight=None, default_max_in_flight=8):
+        self.max_in_flight = dict(max_in_flight or {})
+        self.default_max_in_flight = default_max_in_flight
+        self._lock = threading.RLock()
+        self._in_flight = collections.defaultdict(int)
+        # type -> [OrderedDict(owner -> deque), ...] by priority class
+        self._queues = {}
+        self._dispatching = set()
+
+    def limit(self, type):
+        """
+        Returns the maximum number of requests of *type* in progress.
+        """
+        return self.max_in_flight.get(type, self.default_max_in_flight)
+
+    def in_flight(self, type):
+        """
+        Returns the number of requests of *type* in progress.
+        """
+        with self._lock:
+            return self._in_flight[type]
+
+    def queued(self, type):
+        """
+        Returns the number of requests of *type* waiting to be started.
+        """
+        with self._lock:
+            return sum(len(queue) for owners in self._queues.get(type, ())
+                       for queue in owners.itervalues())
+
+    def submit(self, type, start, callback=None, userdata=None,
+               priority=INTERACTIVE, owner=None):
+        """
+        Submits a request.
+
+        *start* makes the request when a slot is free: it is called with the
+        function to give as completion callback to libspotify, and returns the
+        request object, which is kept alive until it has completed. Then
+        *callback* is called with the request object and *userdata*, or with
+        ``None`` if *start* raised an exception.
+
+        The request is started before this method returns if a slot is free.
+
+        :param type: the request type.
+        :type type: string
+        :param priority: :data:`INTERACTIVE` or :data:`BATCH`.
+        :param owner: the owner of the request, for fair queuing.
+        :rtype: :class:`ScheduledRequest`
+        """
+        if priority not in (INTERACTIVE, BATCH):
+            raise ValueError('Unknown priority: %r' % priority)
+        scheduled = ScheduledRequest(self._lock, start, callback, userdata)
+        with self._lock:
+            owners = self._queues.setdefault(
+                type, [collections.OrderedDict(), collections.OrderedDict()])
+            queue = owners[priority].get(owner)
+            if queue is None:
+                queue = owners[priority][owner] = collections.deque()
+            queue.append(scheduled)
+            scheduled._queue = queue
+        self._dispatch(type)
+        return scheduled
+
+    def _next(self, type):
+        for owners in self._queues.get(type, ()):
+            while owners:
+                owner, queue = owners.popitem(last=False)
+                if not queue:
+                    # Emptied by cancel()
+                    continue
+                scheduled = queue.popleft()
+                if queue:
+                    # The owner's next request waits for the other owners'
+                    owners[owner] = queue
+                scheduled._queue = None
+                return scheduled
+        return None
+
+    def _dispatch(self, type):
+        # Requests completing synchronously call back into _dispatch() from
+        # start(); only the outermost call starts requests, in a loop.
+        with self._lock:
+            if type in self._dispatching:
+                return
+            self._dispatching.add(type)
+        try:
+            while True:
+                with self._lock:
+                    scheduled = None
+                    if self._in_flight[type] < self.limit(type):
+                        scheduled = self._next(type)
+                    if scheduled is None:
+                        self._dispatching.discard(type)
+                        return
+                    self._in_flight[type] += 1
+                self._start(type, scheduled)
+        except:
+            with self._lock:
+                self._dispatching.discard(type)
+            raise
+
+    def _start(self, type, scheduled):
+        def complete(result, data):
+            with self._lock:
+                if scheduled._done:
+                    return
+                scheduled._done = True
+                scheduled.request = None
+                self._in_flight[type] -= 1
+            if scheduled._callback is not None:
+                try:
+                    scheduled._callback(result, scheduled._userdata)
+                except Exception:
+                    logger.exception('Error in request callback')
+            self._dispatch(type)
+
+        try:
+            request = scheduled._start(complete)
+        except Exception:
+            logger.exception('Error starting %s request', type)
+            # The request failed: free its slot, and give its callback no
+            # result, unless the request completed before failing
+            complete(None, None)
+            return
+        with self._lock:
+            # The request may have completed right away
+            if not scheduled._done:
+                scheduled.request = request
+
+    def search(self, session, query, callback=None, userdata=None,
+               priority=INTERACTIVE, owner=None, **kwargs):
+        """
+        Submits a ``'search'`` request, see :meth:`spotify.Session.search`.
+        The other keyword arguments are passed to it.
+
+        :rtype: :class:`ScheduledRequest`
+        """
+        return self.submit(
+            'search',
+            lambda complete: session.search(query, complete, **kwargs),
+            callback, userdata, priority, owner)
+
+    def browse_album(self, album, callback=None, userdata=None,
+                     priority=INTERACTIVE, owner=None):
+        """
+        Submits a ``'browse_album'`` request, see
+        :class:`spotify.AlbumBrowser`.
+
+        :rtype: :class:`ScheduledRequest`
+        """
+        return self.submit(
+            'browse_album',
+            lambda complete: spotify.AlbumBrowser(album, complete),
+            callback, userdata, priority, owner)
+
+    def browse_artist(self, artist, type='full', callback=None,
+                      userdata=None, priority=INTERACTIVE, owner=None):
+        """
+        Submits a ``'browse_artist'`` request, see
+        :class:`spotify.ArtistBrowser`.
+
+        :rtype: :class:`ScheduledRequest`
+        """
+        return self.submit(
+            'browse_artist',
+            lambda complete: spotify.ArtistBrowser(artist, type, complete),
+            callback, userdata, priority, owner)
+
+    def image(self, session, image_id, callback=None, userdata=None,
+              priority=INTERACTIVE, owner=None):
+        """
+        Submits an ``'image'`` request, see
+        :meth:`spotify.Session.image_create`. The request completes when the
+        image is loaded.
+
+        :rtype: :class:`ScheduledRequest`
+        """
+        def start(complete):
+            image = session.image_create(image_id)
+            if image.is_loaded():
+                complete(image, None)
+            else:
+                image.add_load_callback(complete, None)
+            return image
+        return self.submit('image', start, callback, userdata, priority,
+                           owner)
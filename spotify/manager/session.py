@@ -1,5 +1,14 @@
+import collections
+import errno
+import fcntl
+import os
+import select
 import spotify
 import threading
+import time
+import traceback
+
+from spotify import SpotifyError
 
 class SpotifySessionManager(object):
     """
@@ -17,6 +26,13 @@ class SpotifySessionManager(object):
     appkey_file = 'spotify_appkey.key'
     user_agent = 'pyspotify-example'
 
+    #: Number of preallocated blocks the audio data given to
+    #: :meth:`music_delivery` is copied to, so it stays valid after the call.
+    #: While all the blocks are in use, deliveries are refused. If 0, the
+    #: :class:`spotify.Frames` given to :meth:`music_delivery` refer to
+    #: libspotify's memory, and are only valid during the call.
+    frames_pool_size = 0
+
     def __init__(self, username=None, password=None, remember_me=False):
         self.username = username
         self.password = password
@@ -24,31 +40,347 @@ class SpotifySessionManager(object):
         if self.application_key is None:
             self.application_key = open(self.appkey_file).read()
         self.awoken = threading.Event() # used to block until awoken
-        self.timer = None
         self.finished = False
-
-    def connect(self):
+        self.event_loop = None
+        self._loop_session = None
+        self._process_events_handle = None
+        self._loop_thread = None
+        self._load_waiters = []
+        self._load_lock = threading.Lock()
+        self._metadata_updates = None
+        self._calls = collections.deque()
+        self._wake_fds = None
+
+    def connect(self, event_loop=None):
         """
         Connect to the Spotify API using the given username and password.
         This method calls the :func:`spotify.connect` function.
+
+        By default this runs :meth:`loop` and only returns on disconnect.
+
+        If *event_loop* is given, the session is driven by that event loop
+        instead, and the session is returned right away: events are processed
+        through ``event_loop.call_later()``, and notifications from the Spotify
+        subsystem wake the event loop through
+        ``event_loop.call_soon_threadsafe()``. Any :mod:`asyncio` compatible
+        event loop can be used.
+
+        :param event_loop: event loop to run the session in.
+        :rtype: :class:`spotify.Session` if *event_loop* is given, else
+            :class:`None`.
         """
-        session = spotify.connect(self)
-        self.loop(session) # returns on disconnect
+        if event_loop is None:
+            session = spotify.connect(self)
+            self.loop(session) # returns on disconnect
+            return
+        self.event_loop = event_loop
+        self._loop_session = spotify.connect(self)
+        event_loop.call_soon_threadsafe(self._process_events)
+        return self._loop_session
 
     def loop(self, session):
         """
         The main loop.
 
-        This processes events and then either waits for an event. The event is
-        either triggered by a timer expiring, or by a notification from within
-        the Spotify subsystem (which calls :meth:`wake`).
+        This processes events and then waits for an event, for at most the
+        timeout returned by :meth:`spotify.Session.process_events`. The wait
+        ends as soon as the Spotify subsystem sends a notification (which
+        calls :meth:`wake`). No extra thread is started for the timeout.
         """
+        self._loop_thread = threading.current_thread()
+        self._loop_session = session
+        if self._wake_fds is None:
+            self._wake_fds = self._wake_pipe()
+        wake_fd = self._wake_fds[0]
         while not self.finished:
             self.awoken.clear()
+            self._run_calls()
             timeout = session.process_events()
-            self.timer = threading.Timer(timeout/1000.0, self.awoken.set)
-            self.timer.start()
-            self.awoken.wait()
+            self._check_loaded(session)
+            try:
+                ready = select.select([wake_fd], [], [], timeout / 1000.0)[0]
+            except select.error as e:
+                if e.args[0] != errno.EINTR:
+                    raise
+                continue
+            if ready:
+                # A wake made while processing events is still in the pipe,
+                # so that it is never missed.
+                os.read(wake_fd, 4096)
+        self._loop_thread = None
+
+    def _wake_pipe(self):
+        """
+        Returns the file descriptors of a pipe :meth:`wake` writes to, to end
+        the wait of :meth:`loop`.
+        """
+        fds = os.pipe()
+        for fd in fds:
+            flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+            fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+            flags = fcntl.fcntl(fd, fcntl.F_GETFD)
+            fcntl.fcntl(fd, fcntl.F_SETFD, flags | fcntl.FD_CLOEXEC)
+        return fds
+
+    def _process_events(self):
+        """
+        Process events from the event loop given to :meth:`connect`, and
+        schedule the next call.
+        """
+        if self._process_events_handle is not None:
+            self._process_events_handle.cancel()
+            self._process_events_handle = None
+        if self.finished or self._loop_session is None:
+            return
+        timeout = self._loop_session.process_events()
+        self._check_loaded(self._loop_session)
+        self._process_events_handle = self.event_loop.call_later(
+            timeout / 1000.0, self._process_events)
+
+    def _call_soon(self, func):
+        """
+        Calls *func* from the thread processing the session's events, which
+        is the only one allowed to call libspotify.
+        """
+        if self.event_loop is not None:
+            self.event_loop.call_soon_threadsafe(func)
+        else:
+            self._calls.append(func)
+            self.wake()
+
+    def _run_calls(self):
+        """
+        Runs the functions given to :meth:`_call_soon` by :meth:`loop`.
+        """
+        while self._calls:
+            func = self._calls.popleft()
+            try:
+                func()
+            except Exception:
+                traceback.print_exc()
+
+    def _check_loaded(self, session):
+        """
+        Completes the waits of :meth:`wait_loaded` whose objects are loaded.
+        The objects are only checked again after libspotify notified that
+        metadata was updated, except playlists, whose loading is not notified
+        this way, which are checked every time.
+        """
+        with self._load_lock:
+            waiters = self._load_waiters[:]
+        if not waiters:
+            return
+        updates = session.metadata_updates()
+        if updates == self._metadata_updates \
+                and not any(waiter.polled() for waiter in waiters):
+            return
+        self._metadata_updates = updates
+        for waiter in waiters:
+            if waiter.check():
+                self._remove_waiter(waiter)
+
+    def _add_waiter(self, waiter):
+        if waiter.check():
+            return
+        with self._load_lock:
+            self._load_waiters.append(waiter)
+        self._metadata_updates = None
+
+    def _remove_waiter(self, waiter):
+        with self._load_lock:
+            try:
+                self._load_waiters.remove(waiter)
+            except ValueError:
+                pass
+
+    def wait_loaded(self, objs, timeout=None):
+        """
+        Wait until all the given objects are loaded, while the session is
+        driven by :meth:`loop` or by the event loop given to :meth:`connect`.
+
+        When connected to an event loop, returns a future which is completed
+        with the list of the objects once they are all loaded, or fails with
+        a :exc:`spotify.SpotifyError` after *timeout* seconds.
+
+        Else, blocks until the objects are loaded, or for at most *timeout*
+        seconds. This must be called from another thread than the one running
+        :meth:`loop`.
+
+        :param objs: :class:`spotify.Track`, :class:`spotify.Album`,
+            :class:`spotify.Artist`, :class:`spotify.User` or
+            :class:`spotify.Playlist` objects.
+        :param timeout: the maximum time to wait in seconds, or :class:`None`
+            to wait forever.
+        :type timeout: :class:`float`
+        :rtype: a future if connected to an event loop, else :class:`bool`,
+            true if the objects are loaded.
+        """
+        if self.event_loop is not None:
+            future = self.event_loop.create_future()
+
+            def loaded(objs):
+                if not future.done():
+                    future.set_result(objs)
+
+            waiter = _LoadWaiter(objs, loaded)
+            if not waiter.check():
+                with self._load_lock:
+                    self._load_waiters.append(waiter)
+                self._metadata_updates = None
+                handle = None
+                if timeout is not None:
+                    handle = self.event_loop.call_later(
+                        timeout, lambda: self._load_timeout(waiter, future))
+
+                def done(future):
+                    # The caller may cancel the future, e.g. with
+                    # asyncio.wait_for(), the objects are then not checked
+                    # any more.
+                    if future.cancelled():
+                        waiter.cancel()
+                        self._remove_waiter(waiter)
+                    if handle is not None:
+                        handle.cancel()
+
+                future.add_done_callback(done)
+            return future
+        if threading.current_thread() is self._loop_thread:
+            raise SpotifyError('Cannot wait from the thread running loop()')
+        event = threading.Event()
+        waiter = _LoadWaiter(objs, lambda objs: event.set())
+        # The objects are checked by the thread running loop()
+        self._call_soon(lambda: self._add_waiter(waiter))
+        loaded = event.wait(timeout)
+        if not loaded:
+            # Completed in the meantime if cancel() returns true
+            loaded = waiter.cancel()
+            self._call_soon(lambda: self._remove_waiter(waiter))
+        return bool(loaded)
+
+    def _load_timeout(self, waiter, future):
+        if not waiter.cancel():
+            self._remove_waiter(waiter)
+            if not future.done():
+                future.set_exception(
+                    SpotifyError('Timed out waiting for objects to load'))
+
+    def _future(self, request):
+        """
+        Returns a future of the event loop given to :meth:`connect`, which is
+        completed by the callback passed to *request*.
+        """
+        if self.event_loop is None:
+            raise SpotifyError('Not connected to an event loop')
+        future = self.event_loop.create_future()
+        pending = []
+
+        def callback(result, userdata):
+            # Completion callbacks are called from process_events(), which
+            # runs in the event loop.
+            del pending[:]
+            if not future.done():
+                future.set_result(result)
+
+        # Keep the request object alive until it has completed.
+        pending.append(request(callback))
+        return future
+
+    def search_future(self, query, **kwargs):
+        """
+        Conduct a search, like :meth:`spotify.Session.search`.
+
+        Only available when connected to an event loop, see :meth:`connect`.
+
+        :param query: the search query.
+        :type query: string
+        :return: a future whose result is the :class:`spotify.Results`.
+        """
+        return self._future(lambda callback: self._loop_session.search(
+            query, callback, **kwargs))
+
+    def search_iter(self, query, type='tracks', page_size=100, lookahead=1,
+                    timeout=None):
+        """
+        Iterate over all the tracks, albums or artists found for a query,
+        while the session is driven by :meth:`loop` or by an event loop.
+
+        The results are requested by pages of *page_size* items. While a
+        page is iterated over, up to *lookahead* following pages are
+        requested in the background.
+
+        This must be called from another thread than the one processing the
+        session's events. The searches are made, and the items of the pages
+        read, by the thread processing the events.
+
+        :param query: the search query.
+        :type query: string
+        :param type: one of ``'tracks'``, ``'albums'`` or ``'artists'``.
+        :type type: string
+        :param page_size: the number of items requested at once.
+        :type page_size: :class:`int`
+        :param lookahead: the number of pages requested in advance.
+        :type lookahead: :class:`int`
+        :param timeout: the maximum time to wait for a page in seconds, or
+            :class:`None` to wait forever. :exc:`spotify.SpotifyError` is
+            raised when it is exceeded.
+        :type timeout: :class:`float`
+        :return: an iterator of :class:`spotify.Track`,
+            :class:`spotify.Album` or :class:`spotify.Artist`.
+        """
+        if type not in ('tracks', 'albums', 'artists'):
+            raise ValueError('Unknown search type: %r' % type)
+        if threading.current_thread() is self._loop_thread:
+            raise SpotifyError('Cannot wait from the thread running loop()')
+        if self._loop_session is None:
+            raise SpotifyError('Not connected')
+        return iter(_SearchPager(self._loop_session, self._call_soon, query,
+                                 type, page_size, lookahead, timeout))
+
+    def browse_album_future(self, album):
+        """
+        Browse an album, like :class:`spotify.AlbumBrowser`.
+
+        Only available when connected to an event loop, see :meth:`connect`.
+
+        :param album: the album to browse.
+        :type album: :class:`spotify.Album`
+        :return: a future whose result is the loaded
+            :class:`spotify.AlbumBrowser`.
+        """
+        return self._future(lambda callback: spotify.AlbumBrowser(
+            album, callback))
+
+    def browse_artist_future(self, artist, type='full'):
+        """
+        Browse an artist, like :class:`spotify.ArtistBrowser`.
+
+        Only available when connected to an event loop, see :meth:`connect`.
+
+        :param artist: the artist to browse.
+        :type artist: :class:`spotify.Artist`
+        :param type: one of ``'full'``, ``'no_tracks'`` or ``'no_albums'``.
+        :type type: string
+        :return: a future whose result is the loaded
+            :class:`spotify.ArtistBrowser`.
+        """
+        return self._future(lambda callback: spotify.ArtistBrowser(
+            artist, type, callback))
+
+    def toplist_future(self, type, region):
+        """
+        Browse a toplist, like :class:`spotify.ToplistBrowser`.
+
+        Only available when connected to an event loop, see :meth:`connect`.
+
+        :param type: one of ``'albums'``, ``'artists'`` or ``'tracks'``.
+        :type type: string
+        :param region: a country code, ``'all'``, ``'current'`` or a
+            :class:`spotify.User`.
+        :return: a future whose result is the loaded
+            :class:`spotify.ToplistBrowser`.
+        """
+        return self._future(lambda callback: spotify.ToplistBrowser(
+            type, region, callback))
 
     def terminate(self):
         """
@@ -63,9 +395,17 @@ class SpotifySessionManager(object):
         """
         This is called by the Spotify subsystem to wake up the main loop.
         """
-        if self.timer is not None:
-            self.timer.cancel()
+        if self.event_loop is not None:
+            self.event_loop.call_soon_threadsafe(self._process_events)
+            return
         self.awoken.set()
+        if self._wake_fds is not None:
+            try:
+                os.write(self._wake_fds[1], '\0')
+            except OSError as e:
+                # A full pipe already wakes the loop
+                if e.errno != errno.EAGAIN:
+                    raise
 
     def logged_in(self, session, error):
         """
@@ -164,8 +504,9 @@ class SpotifySessionManager(object):
 
         :param session: the current session
         :type session: :class:`spotify.Session`
-        :param frames: the audio data
-        :type frames: :class:`buffer`
+        :param frames: the audio data, only valid during this call unless
+            :attr:`frames_pool_size` is set
+        :type frames: :class:`spotify.Frames`
         :param frame_size: bytes per frame
         :type frame_size: :class:`int`
         :param num_frames: number of frames in this delivery
@@ -222,3 +563,145 @@ class SpotifySessionManager(object):
         :type session: :class:`spotify.Session`
         """
         pass
+
+
+class _LoadWaiter(object):
+    """
+    Objects waited for by :meth:`SpotifySessionManager.wait_loaded`, and the
+    function called with them once they are all loaded.
+    """
+
+    def __init__(self, objs, loaded):
+        self.objs = list(objs)
+        self.pending = self.objs
+        self.loaded = loaded
+        self._lock = threading.Lock()
+        self._done = False
+        self._cancelled = False
+
+    def polled(self):
+        """
+        Returns true if the objects must be checked without waiting for a
+        metadata update, because the wait was cancelled or some objects are
+        playlists.
+        """
+        return self._cancelled or any(isinstance(obj, spotify.Playlist)
+                                      for obj in self.pending)
+
+    def check(self):
+        """
+        Returns true, after calling the function, if the objects are loaded,
+        or if the wait was cancelled. Must be called from the thread
+        processing the session's events.
+        """
+        if self._cancelled:
+            return True
+        self.pending = [obj for obj in self.pending if not obj.is_loaded()]
+        if self.pending:
+            return False
+        with self._lock:
+            if self._cancelled:
+                return True
+            self._done = True
+        self.loaded(self.objs)
+        return True
+
+    def cancel(self):
+        """
+        Cancels the wait, unless the objects are already loaded.
+
+        :return: whether the objects were loaded.
+        """
+        with self._lock:
+            if not self._done:
+                self._cancelled = True
+            return self._done
+
+
+class _SearchPager(object):
+    """
+    Requests the pages of a search for
+    :meth:`SpotifySessionManager.search_iter`. The pages are requested and
+    read by the thread processing the session's events, through *call_soon*,
+    and waited for by the iterating thread.
+    """
+
+    def __init__(self, session, call_soon, query, type, page_size, lookahead,
+                 timeout):
+        self.session = session
+        self.call_soon = call_soon
+        self.query = query
+        self.type = type
+        self.page_size = page_size
+        self.lookahead = lookahead
+        self.timeout = timeout
+        self._condition = threading.Condition()
+        self._pages = {}        # offset -> list of items, or exception
+        self._requests = {}     # offset -> Results being loaded
+        self._total = None
+        self._next_offset = 0
+
+    def _request(self):
+        offset = self._next_offset
+        self._next_offset += self.page_size
+        self.call_soon(lambda: self._start(offset))
+
+    def _start(self, offset):
+        kwargs = {'track_count': 0, 'album_count': 0, 'artist_count': 0}
+        kind = self.type[:-1]
+        kwargs[kind + '_offset'] = offset
+        kwargs[kind + '_count'] = self.page_size
+        try:
+            results = self.session.search(self.query, self._completed,
+                                          userdata=offset, **kwargs)
+        except Exception as e:
+            with self._condition:
+                self._pages[offset] = e
+                self._condition.notify_all()
+            return
+        with self._condition:
+            # Keep the request alive until it has completed.
+            if offset not in self._pages:
+                self._requests[offset] = results
+
+    def _completed(self, results, offset):
+        items = list(getattr(results, self.type)())
+        total = getattr(results, 'total_' + self.type)()
+        with self._condition:
+            self._requests.pop(offset, None)
+            self._pages[offset] = items
+            if self._total is None:
+                self._total = total
+            self._condition.notify_all()
+
+    def _wait(self, offset):
+        deadline = None
+        if self.timeout is not None:
+            deadline = time.time() + self.timeout
+        with self._condition:
+            while offset not in self._pages:
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise SpotifyError('Timed out waiting for results')
+                self._condition.wait(remaining)
+            page = self._pages.pop(offset)
+        if isinstance(page, Exception):
+            raise page
+        return page
+
+    def __iter__(self):
+        offset = 0
+        self._request()
+        while True:
+            items = self._wait(offset)
+            end = min(self._total,
+                      offset + self.page_size * (self.lookahead + 1))
+            while self._next_offset < end:
+                self._request()
+            for item in items:
+                yield item
+            offset += self.page_size
+            if not items or offset >= self._total:
+                return
@@ -0,0 +1,138 @@
+import bisect
+import threading
+
+import spotify
+from spotify.manager.playlist import SpotifyPlaylistManager
+
+
+class PlaylistSnapshot(SpotifyPlaylistManager):
+    """
+    A copy of the track URIs of a playlist, kept up to date with the
+    :meth:`tracks_added`, :meth:`tracks_moved` and :meth:`tracks_removed`
+    callbacks of the playlist.
+
+    Reading the snapshot does not call libspotify, so it can be done from any
+    thread without waiting for the session thread: its length and the URI at
+    a position are read in constant time, and whether a URI is in the
+    playlist is looked up in an index of the URIs.
+
+    The snapshot watches the playlist until :meth:`close` is called. It must
+    be created on the thread processing the libspotify events, e.g. in a
+    session callback, as it reads the tracks of the playlist.
+
+    :param playlist: the playlist to copy.
+    :type playlist: :class:`spotify.Playlist`
+    """
+
+    def __init__(self, playlist):
+        self.playlist = playlist
+        self._lock = threading.Lock()
+        self._uris = []
+        self._counts = {}
+        self._thread = threading.current_thread()
+        # Watched first, so that no change is missed before the first read
+        self.watch(playlist)
+        self.refresh()
+
+    def close(self):
+        """
+        Stops updating the snapshot.
+        """
+        self.unwatch(self.playlist)
+
+    def refresh(self):
+        """
+        Reads all the tracks of the playlist again. This calls libspotify,
+        so it can only be done on the thread the snapshot was created on.
+
+        :raise: :exc:`RuntimeError` if called from another thread.
+        """
+        if threading.current_thread() is not self._thread:
+            raise RuntimeError('The snapshot can only be refreshed on the '
+                               'thread it was created on')
+        uris = self.playlist.tracks_metadata(['uri'])['uri']
+        uris = [intern(uri) for uri in uris]
+        counts = {}
+        for uri in uris:
+            counts[uri] = counts.get(uri, 0) + 1
+        with self._lock:
+            self._uris = uris
+            self._counts = counts
+
+    def __len__(self):
+        return len(self._uris)
+
+    def __getitem__(self, index):
+        with self._lock:
+            return self._uris[index]
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._uris))
+
+    def __contains__(self, uri):
+        return uri in self._counts
+
+    def count(self, uri):
+        """
+        Returns the number of times the track *uri* is in the playlist.
+        """
+        return self._counts.get(uri, 0)
+
+    def index(self, uri):
+        """
+        Returns the position of the first occurrence of the track *uri*.
+
+        :raise: :exc:`ValueError` if the track is not in the playlist.
+        """
+        with self._lock:
+            return self._uris.index(uri)
+
+    def uris(self):
+        """
+        Returns the URIs of the tracks of the playlist.
+
+        :rtype: list of :class:`str`
+        """
+        with self._lock:
+            return list(self._uris)
+
+    def _add(self, uris):
+        for uri in uris:
+            self._counts[uri] = self._counts.get(uri, 0) + 1
+
+    def _remove(self, uris):
+        for uri in uris:
+            count = self._counts[uri] - 1
+            if count:
+                self._counts[uri] = count
+            else:
+                del self._counts[uri]
+
+    def tracks_added(self, playlist, tracks, position, userdata):
+        uris = [intern(str(spotify.Link.from_track(track)))
+                for track in tracks]
+        with self._lock:
+            self._uris[position:position] = uris
+            self._add(uris)
+
+    def tracks_removed(self, playlist, tracks, userdata):
+        removed = set(tracks)
+        with self._lock:
+            self._remove(self._uris[i] for i in removed)
+            self._uris = [uri for i, uri in enumerate(self._uris)
+                          if i not in removed]
+
+    def tracks_moved(self, playlist, tracks, new_position, userdata):
+        indexes = sorted(tracks)
+        with self._lock:
+            moving = [self._uris[i] for i in indexes]
+            for i in reversed(indexes):
+                del self._uris[i]
+            new_position -= bisect.bisect_left(indexes, new_position)
+            self._uris[new_position:new_position] = moving
+
+    def playlist_state_changed(self, playlist, userdata):
+        # The tracks of a playlist which was not loaded yet are not notified
+        if playlist.is_loaded() and len(playlist) != len(self._uris):
+            self.refresh()
@@ -0,0 +1,219 @@
+import bisect
+import collections
+import logging
+
+from spotify.manager.playlist import SpotifyPlaylistManager, \
+    _longest_increasing
+
+logger = logging.getLogger('spotify.manager.sync')
+
+
+class PlaylistSynchronizer(SpotifyPlaylistManager):
+    """
+    Makes a playlist contain a target list of tracks with few changes.
+
+    The tracks kept in place are the longest sequence of tracks which are in
+    the same order in the playlist and in the target list, so that only the
+    other tracks are moved, removed or added. Consecutive tracks are changed
+    together: the changes are applied with one
+    :meth:`spotify.Playlist.remove_tracks` call, then a
+    :meth:`spotify.Playlist.reorder_tracks` call per run of moved tracks and a
+    :meth:`spotify.Playlist.add_tracks` call per run of added tracks.
+
+    :param playlist: the playlist to change.
+    :type playlist: :class:`spotify.Playlist`
+    """
+
+    def __init__(self, playlist):
+        self.playlist = playlist
+        self._pending = None
+
+    def uris(self):
+        """
+        Returns the URIs of the tracks of the playlist.
+
+        :rtype: list of :class:`str`
+        """
+        return list(self.playlist.tracks_metadata(['uri'])['uri'])
+
+    def diff(self, target):
+        """
+        Returns the changes making the playlist contain the tracks of
+        *target*, in the order they are to be applied:
+
+        - ``('remove', positions)``, the positions of the tracks to remove,
+        - ``('move', positions, new_position)``, the positions of the tracks
+          to move before the track at *new_position*, all the positions being
+          taken before the move, as for
+          :meth:`spotify.Playlist.reorder_tracks`,
+        - ``('add', position, uris)``, the URIs of the tracks to add at
+          *position*.
+
+        :param target: the URIs of the tracks the playlist should contain.
+        :type target: list of :class:`str`
+        :rtype: list of :class:`tuple`
+        """
+        return _diff(self.uris(), list(target))
+
+    def apply(self, changes):
+        """
+        Applies the *changes* returned by :meth:`diff`.
+        """
+        for change in changes:
+            if change[0] == 'remove':
+                self.playlist.remove_tracks(change[1])
+            elif change[0] == 'move':
+                self.playlist.reorder_tracks(change[1], change[2])
+            else:
+                self.playlist.add_tracks(change[1], change[2])
+
+    def sync(self, target, callback=None, userdata=None):
+        """
+        Changes the playlist to contain the tracks of *target*.
+
+        Once as many tracks as were changed have been notified through the
+        :meth:`tracks_removed`, :meth:`tracks_moved` and :meth:`tracks_added`
+        callbacks, *callback* is called with the playlist, whether it
+        contains the tracks of *target*, and *userdata*. The playlist may
+        differ from *target* if another client changed it meanwhile. If the
+        playlist already contains the tracks of *target*, *callback* is
+        called before this method returns.
+
+        Only one synchronization can run at a time, :meth:`cancel` stops it
+        if the changes are never notified.
+
+        :param target: the URIs of the tracks the playlist should contain.
+        :type target: list of :class:`str`
+        :return: the number of changes made.
+        :rtype: :class:`int`
+        """
+        if self._pending is not None:
+            raise RuntimeError('The playlist is already being synchronized')
+        target = list(target)
+        changes = _diff(self.uris(), target)
+        if not changes:
+            if callback is not None:
+                callback(self.playlist, True, userdata)
+            return 0
+        # The number of tracks changed, a call to libspotify may be notified
+        # in several callbacks.
+        count = sum(len(change[1]) if change[0] != 'add' else len(change[2])
+                    for change in changes)
+        self._pending = [count, target, callback, userdata]
+        self.watch(self.playlist)
+        try:
+            self.apply(changes)
+        except:
+            self._finish()
+            raise
+        return len(changes)
+
+    def cancel(self):
+        """
+        Stops waiting for the changes made by :meth:`sync` to be notified,
+        the callback given to :meth:`sync` is called as if the playlist did
+        not contain the target tracks.
+        """
+        if self._pending is not None:
+            self._done(False)
+
+    def _changed(self, count):
+        if self._pending is None:
+            return
+        self._pending[0] -= count
+        if self._pending[0] > 0:
+            return
+        # Reading the playlist is linear in its length, so it is only done
+        # once all the changes have been notified.
+        ok = self.uris() == self._pending[1]
+        if not ok:
+            logger.warning('Playlist differs from the target after sync')
+        self._done(ok)
+
+    def _done(self, ok):
+        callback, userdata = self._pending[2:]
+        self._finish()
+        if callback is not None:
+            callback(self.playlist, ok, userdata)
+
+    def _finish(self):
+        self._pending = None
+        self.unwatch(self.playlist)
+
+    def tracks_added(self, playlist, tracks, position, userdata):
+        self._changed(len(tracks))
+
+    def tracks_moved(self, playlist, tracks, new_position, userdata):
+        self._changed(len(tracks))
+
+    def tracks_removed(self, playlist, tracks, userdata):
+        self._changed(len(tracks))
+
+
+def _diff(current, target):
+    # Pair the n-th occurrences of each URI in both lists, the unpaired
+    # tracks are removed or added.
+    wanted = collections.defaultdict(collections.deque)
+    for j, uri in enumerate(target):
+        wanted[uri].append(j)
+    paired = []
+    removed = []
+    for i, uri in enumerate(current):
+        if wanted[uri]:
+            paired.append((i, wanted[uri].popleft()))
+        else:
+            removed.append(i)
+    added = sorted(j for positions in wanted.itervalues() for j in positions)
+
+    changes = []
+    if removed:
+        changes.append(('remove', removed))
+
+    # The paired tracks are the playlist after the removal, the tracks of a
+    # longest subsequence already in target order stay where they are.
+    kept = _longest_increasing([j for i, j in paired])
+    state = [j for i, j in paired]
+    index = dict((j, k) for k, j in enumerate(state))
+    moved = set(state[k] for k in range(len(state)) if k not in kept)
+    order = sorted(state)
+    k = 0
+    while k < len(order):
+        if order[k] not in moved:
+            k += 1
+            continue
+        # Moving a run of tracks keeps their order, so only tracks after
+        # each other in the playlist can be moved together.
+        start = k
+        positions = [index[order[k]]]
+        k += 1
+        while k < len(order) and order[k] in moved:
+            position = index[order[k]]
+            if position < positions[-1]:
+                break
+            positions.append(position)
+            k += 1
+        if start:
+            new_position = index[order[start - 1]] + 1
+        else:
+            new_position = 0
+        changes.append(('move', positions, new_position))
+        run = order[start:k]
+        for position in reversed(positions):
+            del state[position]
+        insert = new_position - bisect.bisect_left(positions, new_position)
+        state[insert:insert] = run
+        # Only the tracks between the moved ones and their new position
+        # have changed places.
+        for position in range(min(positions[0], insert),
+                              max(positions[-1] + 1, new_position)):
+            index[state[position]] = position
+
+    start = 0
+    while start < len(added):
+        end = start + 1
+        while end < len(added) and added[end] == added[end - 1] + 1:
+            end += 1
+        changes.append(('add', added[start],
+                        [target[j] for j in added[start:end]]))
+        start = end
+    return changes
@@ -0,0 +1,286 @@
+"""
+A persistent cache of the metadata of tracks, albums, artists and users,
+keyed by their Spotify URI.
+
+libspotify has to load the metadata of every object again after each restart
+of the application. With a :class:`MetadataCache`, the metadata stored during
+a previous run can be served immediately while libspotify loads the objects
+in the background.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+import spotify
+
+
+def object_uri(obj):
+    """
+    Returns the Spotify URI of a :class:`spotify.Track`,
+    :class:`spotify.Album`, :class:`spotify.Artist` or :class:`spotify.User`.
+    """
+    if isinstance(obj, spotify.Track):
+        return str(spotify.Link.from_track(obj))
+    elif isinstance(obj, spotify.Album):
+        return str(spotify.Link.from_album(obj))
+    elif isinstance(obj, spotify.Artist):
+        return str(spotify.Link.from_artist(obj))
+    elif isinstance(obj, spotify.User):
+        return 'spotify:user:%s' % obj.canonical_name().encode('utf-8')
+    raise TypeError('cannot cache the metadata of %r' % obj)
+
+
+def _link(get, obj):
+    if obj is None:
+        return None
+    return str(get(obj))
+
+
+def object_metadata(obj):
+    """
+    Returns the metadata of a loaded :class:`spotify.Track`,
+    :class:`spotify.Album`, :class:`spotify.Artist` or :class:`spotify.User`
+    as a :class:`dict`, with the names of the object's methods as keys.
+    Related objects are given by their names, and their URIs under the
+    ``'<name>_uri'`` keys.
+    """
+    if isinstance(obj, spotify.Track):
+        album = obj.album()
+        artists = obj.artists()
+        return {
+            'type': 'track',
+            'name': obj.name(),
+            'artists': [a.name() for a in artists],
+            'artists_uri': [_link(spotify.Link.from_artist, a)
+                            for a in artists],
+            'album': album.name() if album else None,
+            'album_uri': _link(spotify.Link.from_album, album),
+            'duration': obj.duration(),
+            'popularity': obj.popularity(),
+            'disc': obj.disc(),
+            'index': obj.index(),
+        }
+    elif isinstance(obj, spotify.Album):
+        artist = obj.artist()
+        return {
+            'type': 'album',
+            'name': obj.name(),
+            'artist': artist.name() if artist else None,
+            'artist_uri': _link(spotify.Link.from_artist, artist),
+            'year': obj.year(),
+            'album_type': obj.type(),
+            'is_available': obj.is_available(),
+        }
+    elif isinstance(obj, spotify.Artist):
+        return {
+            'type': 'artist',
+            'name': obj.name(),
+        }
+    elif isinstance(obj, spotify.User):
+        return {
+            'type': 'user',
+            'canonical_name': obj.canonical_name(),
+            'display_name': obj.display_name(),
+        }
+    raise TypeError('cannot cache the metadata of %r' % obj)
+
+
+class MetadataCache(object):
+    """
+    Stores metadata in a SQLite database.
+
+    Entries older than *ttl* seconds are considered stale and are not
+    returned. When the cache holds more than *max_entries* entries, the least
+    recently used ones are removed. Reads do not write to the database: the
+    times the entries are used at are kept in memory, and written with the
+    next change, at most *flush_interval* seconds later, or by :meth:`flush`.
+
+    The cache can be used from several threads.
+
+    :param path:        the database file, in memory by default
+    :type path:         :class:`str`
+    :param ttl:         lifetime of the entries in seconds, or ``None`` for
+                        no expiry
+    :type ttl:          :class:`int`
+    :param max_entries: maximum number of entries
+    :type max_entries:  :class:`int`
+    :param flush_interval: maximum delay in seconds before the use times are
+                        written
+    :type flush_interval: :class:`int`
+    """
+
+    def __init__(self, path=':memory:', ttl=7 * 24 * 3600,
+                 max_entries=100000, flush_interval=30):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS metadata ('
+            'uri TEXT PRIMARY KEY, data TEXT, stored REAL, used REAL)')
+        self._db.execute(
+            'CREATE INDEX IF NOT EXISTS metadata_used ON metadata (used)')
+        self._db.commit()
+        self._count = self._db.execute(
+            'SELECT COUNT(*) FROM metadata').fetchone()[0]
+        self._time = time.time
+        # uri -> time used, not written yet
+        self._used = {}
+        self._flushed = self._time()
+
+    def __len__(self):
+        return self._count
+
+    def get(self, uri):
+        """
+        Returns the metadata stored for *uri*, or ``None`` if there is none
+        or if it has expired.
+        """
+        now = self._time()
+        with self._lock:
+            row = self._db.execute(
+                'SELECT data, stored FROM metadata WHERE uri = ?',
+                (uri,)).fetchone()
+            if row is None:
+                return None
+            data, stored = row
+            if self.ttl is not None and now - stored > self.ttl:
+                self._used.pop(uri, None)
+                self._delete(uri)
+                self._commit(now)
+                return None
+            self._used[uri] = now
+            if now - self._flushed > self.flush_interval:
+                self._commit(now)
+        return json.loads(data)
+
+    def flush(self):
+        """
+        Writes the times the entries were used at.
+        """
+        with self._lock:
+            self._commit(self._time())
+
+    def _write_used(self):
+        if self._used:
+            self._db.executemany(
+                'UPDATE metadata SET used = ? WHERE uri = ?',
+                [(used, uri) for uri, used in self._used.iteritems()])
+            self._used.clear()
+
+    def _commit(self, now):
+        self._write_used()
+        self._db.commit()
+        self._flushed = now
+
+    def put(self, uri, metadata):
+        """
+        Stores *metadata*, a :class:`dict` which can be encoded to JSON, for
+        *uri*.
+        """
+        self.put_many([(uri, metadata)])
+
+    def put_many(self, items):
+        """
+        Stores several ``(uri, metadata)`` pairs at once.
+        """
+        now = self._time()
+        with self._lock:
+            # The least recently used entries are evicted below
+            self._write_used()
+            for uri, metadata in items:
+                data = json.dumps(metadata)
+                cursor = self._db.execute(
+                    'UPDATE metadata SET data = ?, stored = ?, used = ? '
+                    'WHERE uri = ?', (data, now, now, uri))
+                if cursor.rowcount == 0:
+                    self._db.execute(
+                        'INSERT INTO metadata VALUES (?, ?, ?, ?)',
+                        (uri, data, now, now))
+                    self._count += 1
+            if self._count > self.max_entries:
+                self._db.execute(
+                    'DELETE FROM metadata WHERE uri IN ('
+                    'SELECT uri FROM metadata ORDER BY used LIMIT ?)',
+                    (self._count - self.max_entries,))
+                self._count = self.max_entries
+            self._commit(now)
+
+    def remove(self, uri):
+        """
+        Removes the metadata stored for *uri*, if any.
+        """
+        with self._lock:
+            self._used.pop(uri, None)
+            self._delete(uri)
+            self._commit(self._time())
+
+    def _delete(self, uri):
+        cursor = self._db.execute('DELETE FROM metadata WHERE uri = ?',
+                                  (uri,))
+        self._count -= cursor.rowcount
+
+    def clear(self):
+        """
+        Removes all the entries.
+        """
+        with self._lock:
+            self._used.clear()
+            self._db.execute('DELETE FROM metadata')
+            self._db.commit()
+            self._count = 0
+
+    def close(self):
+        """
+        Closes the database, after writing the times the entries were used at.
+        """
+        with self._lock:
+            self._commit(self._time())
+            self._db.close()
+
+    def store(self, *objs):
+        """
+        Stores the metadata of the given objects which are loaded.
+
+        :rtype:     :class:`int`
+        :returns:   the number of objects stored
+        """
+        items = [(object_uri(obj), object_metadata(obj))
+                 for obj in objs if obj.is_loaded()]
+        self.put_many(items)
+        return len(items)
+
+    def lookup(self, obj):
+        """
+        Returns the metadata of *obj*. If it is loaded, its metadata is read
+        and stored in the cache, unless the cache already has the same
+        metadata stored less than half the *ttl* ago. Else the metadata from
+        the cache is returned, if any.
+
+        :param obj: a :class:`spotify.Track`, :class:`spotify.Album`,
+                    :class:`spotify.Artist` or :class:`spotify.User`
+        :rtype:     :class:`dict` or ``None``
+        """
+        uri = object_uri(obj)
+        if obj.is_loaded():
+            result = object_metadata(obj)
+            if not self._is_fresh(uri, result):
+                self.put(uri, result)
+            return result
+        return self.get(uri)
+
+    def _is_fresh(self, uri, metadata):
+        now = self._time()
+        with self._lock:
+            row = self._db.execute(
+                'SELECT data, stored FROM metadata WHERE uri = ?',
+                (uri,)).fetchone()
+            if row is None or json.loads(row[0]) != metadata:
+                return False
+            if self.ttl is not None and now - row[1] > self.ttl / 2.0:
+                return False
+            self._used[uri] = now
+            return True
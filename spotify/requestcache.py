@@ -0,0 +1,266 @@
+"""
+Caches of the results of requests to the Spotify service.
+
+Identical requests made while one is in progress are coalesced: only one
+request is made, and its result is given to the callbacks of all of them.
+Completed results are kept for a while, so that repeated requests are
+answered without a round-trip to the service.
+"""
+
+import collections
+import logging
+import threading
+import time
+
+import spotify
+
+logger = logging.getLogger('spotify.requestcache')
+
+
+class _InFlight(object):
+    __slots__ = ('request', 'callbacks', 'thread', 'started')
+
+    def __init__(self):
+        self.request = None
+        self.callbacks = []
+        self.thread = threading.current_thread()
+        # Set once the request object is known
+        self.started = threading.Event()
+
+
+class RequestCache(object):
+    """
+    Base class of the request caches.
+
+    Results are kept for at most *ttl* seconds, and only the *max_entries*
+    most recently used results are kept.
+
+    :param max_entries: maximum number of results kept
+    :type max_entries:  :class:`int`
+    :param ttl:         lifetime of the results in seconds, or ``None`` for
+                        no expiry
+    :type ttl:          :class:`int`
+    """
+
+    def __init__(self, max_entries=128, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        #: Number of requests answered from the cache.
+        self.hits = 0
+        #: Number of requests made to the Spotify service.
+        self.misses = 0
+        #: Number of requests which joined an identical request in progress.
+        self.coalesced = 0
+        self._lock = threading.RLock()
+        self._results = collections.OrderedDict()
+        self._in_flight = {}
+        self._time = time.time
+
+    def __len__(self):
+        return len(self._results)
+
+    def clear(self):
+        """
+        Forgets all the results.
+        """
+        with self._lock:
+            self._results.clear()
+
+    def _cacheable(self, result):
+        return result.is_loaded()
+
+    def _cached(self, key):
+        entry = self._results.pop(key, None)
+        if entry is None:
+            return None
+        result, stored = entry
+        if self.ttl is not None and self._time() - stored > self.ttl:
+            return None
+        # Most recently used last
+        self._results[key] = entry
+        return result
+
+    def _request(self, key, start, callback, userdata):
+        """
+        Returns the result for *key*, calling *callback* with it and
+        *userdata* once it is complete. *start* is called to make a new
+        request with the function to call on completion, and returns the
+        request object.
+        """
+        coalesced = None
+        with self._lock:
+            result = self._cached(key)
+            if result is not None:
+                self.hits += 1
+            else:
+                coalesced = self._in_flight.get(key)
+                if coalesced is not None:
+                    self.coalesced += 1
+                    coalesced.callbacks.append((callback, userdata))
+                else:
+                    self.misses += 1
+                    in_flight = _InFlight()
+                    in_flight.callbacks.append((callback, userdata))
+                    self._in_flight[key] = in_flight
+        if result is not None:
+            if callback is not None:
+                callback(result, userdata)
+            return result
+        if coalesced is not None:
+            # The identical request may still be starting in another thread
+            if coalesced.thread is not threading.current_thread():
+                coalesced.started.wait()
+            return coalesced.request
+
+        def complete(result, data):
+            self._complete(key, result)
+
+        try:
+            request = start(complete)
+        except:
+            with self._lock:
+                if self._in_flight.get(key) is in_flight:
+                    del self._in_flight[key]
+            in_flight.started.set()
+            # The requests coalesced with this one get no result
+            self._call_back(in_flight.callbacks[1:], None)
+            raise
+        in_flight.request = request
+        in_flight.started.set()
+        return request
+
+    def _complete(self, key, result):
+        with self._lock:
+            in_flight = self._in_flight.pop(key, None)
+            if in_flight is None:
+                return
+            if self._cacheable(result):
+                self._results.pop(key, None)
+                self._results[key] = (result, self._time())
+                while len(self._results) > self.max_entries:
+                    self._results.popitem(last=False)
+        self._call_back(in_flight.callbacks, result)
+
+    def _call_back(self, callbacks, result):
+        for callback, userdata in callbacks:
+            if callback is None:
+                continue
+            try:
+                callback(result, userdata)
+            except Exception:
+                logger.exception('Error in request callback')
+
+    def stats(self):
+        """
+        :rtype:     :class:`dict`
+        :returns:   the number of ``hits``, ``misses`` and ``coalesced``
+                    requests, and the number of ``entries`` kept.
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'coalesced': self.coalesced,
+                    'entries': len(self._results)}
+
+
+def normalize_query(query):
+    """
+    Returns the form of a search query used as cache key, with runs of
+    whitespace replaced by a single space. The case is kept, as it is
+    significant for operators such as ``AND`` and ``OR``.
+    """
+    if isinstance(query, str):
+        query = query.decode('utf-8')
+    return u' '.join(query.split())
+
+
+class SearchCache(RequestCache):
+    """
+    A cache in front of :meth:`spotify.Session.search`.
+
+    Searches are identified by their normalized query (see
+    :func:`normalize_query`) and their offsets and counts, but the query is
+    given to libspotify as is. Searches which failed are not kept.
+    """
+
+    def search(self, session, query, callback=None, track_offset=0,
+               track_count=32, album_offset=0, album_count=32,
+               artist_offset=0, artist_count=32, userdata=None):
+        """
+        Conduct a search like :meth:`spotify.Session.search`.
+
+        If the results are in the cache, *callback* is called before this
+        method returns.
+
+        :param session: the session to search with
+        :type session:  :class:`spotify.Session`
+        :rtype:         :class:`spotify.Results`, which may not be loaded yet
+        """
+        counts = dict(track_offset=track_offset, track_count=track_count,
+                      album_offset=album_offset, album_count=album_count,
+                      artist_offset=artist_offset, artist_count=artist_count)
+        key = (normalize_query(query), track_offset, track_count,
+               album_offset, album_count, artist_offset, artist_count)
+        return self._request(
+            key, lambda complete: session.search(query, complete, **counts),
+            callback, userdata)
+
+    def _cacheable(self, result):
+        return result.error() == 0
+
+
+class BrowseCache(RequestCache):
+    """
+    A cache in front of :class:`spotify.AlbumBrowser`,
+    :class:`spotify.ArtistBrowser` and :class:`spotify.ToplistBrowser`.
+
+    Browsers are identified by their album, by their artist and type, or by
+    the type and region of the toplist. Browsers which did not load are not
+    kept.
+    """
+
+    def browse_album(self, album, callback=None, userdata=None):
+        """
+        Browse an album like :class:`spotify.AlbumBrowser`.
+
+        If the browser is in the cache, *callback* is called before this
+        method returns.
+
+        :rtype: :class:`spotify.AlbumBrowser`
+        """
+        return self._request(
+            ('album', album),
+            lambda complete: spotify.AlbumBrowser(album, complete),
+            callback, userdata)
+
+    def browse_artist(self, artist, type='full', callback=None,
+                      userdata=None):
+        """
+        Browse an artist like :class:`spotify.ArtistBrowser`.
+
+        If the browser is in the cache, *callback* is called before this
+        method returns.
+
+        :rtype: :class:`spotify.ArtistBrowser`
+        """
+        return self._request(
+            ('artist', artist, type),
+            lambda complete: spotify.ArtistBrowser(artist, type, complete),
+            callback, userdata)
+
+    def toplist(self, type, region, callback=None, userdata=None):
+        """
+        Browse a toplist like :class:`spotify.ToplistBrowser`.
+
+        If the browser is in the cache, *callback* is called before this
+        method returns.
+
+        :rtype: :class:`spotify.ToplistBrowser`
+        """
+        if isinstance(region, spotify.User):
+            key = ('toplist', type, 'user', region.canonical_name())
+        else:
+            key = ('toplist', type, region)
+        return self._request(
+            key,
+            lambda complete: spotify.ToplistBrowser(type, region, complete),
+            callback, userdata)
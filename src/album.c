@@ -16,27 +16,63 @@ Album_new(PyTypeObject * type, PyObject *args, PyObject *kwds)
 
     self = (Album *) type->tp_alloc(type, 0);
     self->_album = NULL;
+    self->_weakreflist = NULL;
     return (PyObject *)self;
 }
 
+/* Wrappers of the albums currently alive, see wrapper_cache_get() */
+static PyObject *album_cache = NULL;
+
 PyObject *
 Album_FromSpotify(sp_album * album)
 {
-    PyObject *a = PyObject_CallObject((PyObject *)&AlbumType, NULL);
+    PyObject *a = wrapper_cache_get(album_cache, album);
 
+    if (a)
+        return a;
+    a = PyObject_CallObject((PyObject *)&AlbumType, NULL);
     ((Album *) a)->_album = album;
     sp_album_add_ref(album);
+    wrapper_cache_add(&album_cache, album, a);
     return a;
 }
 
 static void
 Album_dealloc(Album * self)
 {
+    wrapper_cache_remove(album_cache, self->_album, (PyObject *)self);
+    if (self->_weakreflist)
+        PyObject_ClearWeakRefs((PyObject *)self);
     if (self->_album)
         sp_album_release(self->_album);
     self->ob_type->tp_free(self);
 }
 
+static PyObject *
+Album_richcompare(PyObject *a, PyObject *b, int op)
+{
+    PyObject *result;
+
+    if (!PyObject_TypeCheck(a, &AlbumType)
+        || !PyObject_TypeCheck(b, &AlbumType)
+        || (op != Py_EQ && op != Py_NE)) {
+        Py_INCREF(Py_NotImplemented);
+        return Py_NotImplemented;
+    }
+    if ((((Album *) a)->_album == ((Album *) b)->_album) == (op == Py_EQ))
+        result = Py_True;
+    else
+        result = Py_False;
+    Py_INCREF(result);
+    return result;
+}
+
+static long
+Album_hash(Album * self)
+{
+    return _Py_HashPointer(self->_album);
+}
+
 static PyObject *
 Album_is_loaded(Album * self)
 {
@@ -141,7 +177,7 @@ PyTypeObject AlbumType = {
     0,                  /*tp_as_number */
     0,                  /*tp_as_sequence */
     0,                  /*tp_as_mapping */
-    0,                  /*tp_hash */
+    (hashfunc) Album_hash, /*tp_hash */
     0,                  /*tp_call */
     (reprfunc) Album_str,   /*tp_str */
     0,                  /*tp_getattro */
@@ -151,8 +187,8 @@ PyTypeObject AlbumType = {
     "Album objects",    /* tp_doc */
     0,                  /* tp_traverse */
     0,                  /* tp_clear */
-    0,                  /* tp_richcompare */
-    0,                  /* tp_weaklistoffset */
+    Album_richcompare,  /* tp_richcompare */
+    offsetof(Album, _weakreflist), /* tp_weaklistoffset */
     0,                  /* tp_iter */
     0,                  /* tp_iternext */
     Album_methods,      /* tp_methods */
@@ -1,5 +1,6 @@
 typedef struct {
     PyObject_HEAD sp_album *_album;
+    PyObject *_weakreflist;
 } Album;
 
 extern PyTypeObject AlbumType;
@@ -6,6 +6,7 @@
 #include "albumbrowser.h"
 #include "track.h"
 #include "session.h"
+#include "view.h"
 
 PyObject *
 AlbumBrowser_FromSpotify(sp_albumbrowse * browse)
@@ -83,6 +84,25 @@ AlbumBrowser_is_loaded(AlbumBrowser * self)
     return Py_BuildValue("i", sp_albumbrowse_is_loaded(self->_browser));
 }
 
+static int
+albumbrowser_num_tracks(void *browser)
+{
+    return sp_albumbrowse_num_tracks(browser);
+}
+
+static PyObject *
+albumbrowser_track(void *browser, int index)
+{
+    return Track_FromSpotify(sp_albumbrowse_track(browser, index));
+}
+
+static PyObject *
+AlbumBrowser_tracks(AlbumBrowser * self)
+{
+    return SequenceView_New((PyObject *)self, self->_browser,
+                            albumbrowser_num_tracks, albumbrowser_track);
+}
+
 Py_ssize_t
 AlbumBrowser_sq_length(AlbumBrowser * self)
 {
@@ -92,7 +112,7 @@ AlbumBrowser_sq_length(AlbumBrowser * self)
 PyObject *
 AlbumBrowser_sq_item(AlbumBrowser * self, Py_ssize_t index)
 {
-    if (index >= sp_albumbrowse_num_tracks(self->_browser)) {
+    if (index < 0 || index >= sp_albumbrowse_num_tracks(self->_browser)) {
         PyErr_SetString(PyExc_IndexError, "");
         return NULL;
     }
@@ -118,6 +138,10 @@ static PyMethodDef AlbumBrowser_methods[] = {
      (PyCFunction)AlbumBrowser_is_loaded,
      METH_NOARGS,
      "True if this album browser has finished loading"},
+    {"tracks",
+     (PyCFunction)AlbumBrowser_tracks,
+     METH_NOARGS,
+     "Return a sequence of all the tracks found while browsing."},
     {NULL}
 };
 
@@ -15,27 +15,63 @@ Artist_new(PyTypeObject * type, PyObject *args, PyObject *kwds)
 
     self = (Artist *) type->tp_alloc(type, 0);
     self->_artist = NULL;
+    self->_weakreflist = NULL;
     return (PyObject *)self;
 }
 
+/* Wrappers of the artists currently alive, see wrapper_cache_get() */
+static PyObject *artist_cache = NULL;
+
 PyObject *
 Artist_FromSpotify(sp_artist * artist)
 {
-    PyObject *a = PyObject_CallObject((PyObject *)&ArtistType, NULL);
+    PyObject *a = wrapper_cache_get(artist_cache, artist);
 
+    if (a)
+        return a;
+    a = PyObject_CallObject((PyObject *)&ArtistType, NULL);
     ((Artist *) a)->_artist = artist;
     sp_artist_add_ref(artist);
+    wrapper_cache_add(&artist_cache, artist, a);
     return a;
 }
 
 static void
 Artist_dealloc(Artist * self)
 {
+    wrapper_cache_remove(artist_cache, self->_artist, (PyObject *)self);
+    if (self->_weakreflist)
+        PyObject_ClearWeakRefs((PyObject *)self);
     if (self->_artist)
         sp_artist_release(self->_artist);
     self->ob_type->tp_free(self);
 }
 
+static PyObject *
+Artist_richcompare(PyObject *a, PyObject *b, int op)
+{
+    PyObject *result;
+
+    if (!PyObject_TypeCheck(a, &ArtistType)
+        || !PyObject_TypeCheck(b, &ArtistType)
+        || (op != Py_EQ && op != Py_NE)) {
+        Py_INCREF(Py_NotImplemented);
+        return Py_NotImplemented;
+    }
+    if ((((Artist *) a)->_artist == ((Artist *) b)->_artist) == (op == Py_EQ))
+        result = Py_True;
+    else
+        result = Py_False;
+    Py_INCREF(result);
+    return result;
+}
+
+static long
+Artist_hash(Artist * self)
+{
+    return _Py_HashPointer(self->_artist);
+}
+
 static PyObject *
 Artist_is_loaded(Artist * self)
 {
@@ -89,7 +125,7 @@ PyTypeObject ArtistType = {
     0,                  /*tp_as_number */
     0,                  /*tp_as_sequence */
     0,                  /*tp_as_mapping */
-    0,                  /*tp_hash */
+    (hashfunc) Artist_hash, /*tp_hash */
     0,                  /*tp_call */
     Artist_str,         /*tp_str */
     0,                  /*tp_getattro */
@@ -99,8 +135,8 @@ PyTypeObject ArtistType = {
     "Artist objects",   /* tp_doc */
     0,                  /* tp_traverse */
     0,                  /* tp_clear */
-    0,                  /* tp_richcompare */
-    0,                  /* tp_weaklistoffset */
+    Artist_richcompare,  /* tp_richcompare */
+    offsetof(Artist, _weakreflist), /* tp_weaklistoffset */
     0,                  /* tp_iter */
     0,                  /* tp_iternext */
     Artist_methods,     /* tp_methods */
@@ -1,5 +1,6 @@
 typedef struct {
     PyObject_HEAD sp_artist *_artist;
+    PyObject *_weakreflist;
 } Artist;
 
 extern PyTypeObject ArtistType;
@@ -7,6 +7,7 @@
 #include "album.h"
 #include "session.h"
 #include "track.h"
+#include "view.h"
 
 PyObject *
 ArtistBrowser_FromSpotify(sp_artistbrowse * browse)
@@ -97,53 +98,62 @@ ArtistBrowser_is_loaded(ArtistBrowser * self)
     return Py_BuildValue("i", sp_artistbrowse_is_loaded(self->_browser));
 }
 
-static PyObject *
-ArtistBrowser_albums(ArtistBrowser * self)
+static int
+artistbrowser_num_albums(void *browser)
 {
-    sp_album *album;
-    int count = sp_artistbrowse_num_albums(self->_browser);
-    PyObject *l = PyList_New(count);
-    int i;
+    return sp_artistbrowse_num_albums(browser);
+}
 
-    for (i = 0; i < count; ++i) {
-        album = sp_artistbrowse_album(self->_browser, i);
-        PyObject *a = Album_FromSpotify(album);
+static PyObject *
+artistbrowser_album(void *browser, int index)
+{
+    return Album_FromSpotify(sp_artistbrowse_album(browser, index));
+}
 
-        PyList_SetItem(l, i, a);
-    }
-    return l;
+static int
+artistbrowser_num_similar_artists(void *browser)
+{
+    return sp_artistbrowse_num_similar_artists(browser);
 }
 
 static PyObject *
-ArtistBrowser_similar_artists(ArtistBrowser * self)
+artistbrowser_similar_artist(void *browser, int index)
 {
-    sp_artist *artist;
-    int count = sp_artistbrowse_num_similar_artists(self->_browser);
-    PyObject *l = PyList_New(count);
-    int i;
+    return Artist_FromSpotify(sp_artistbrowse_similar_artist(browser, index));
+}
 
-    for (i = 0; i < count; ++i) {
-        artist = sp_artistbrowse_similar_artist(self->_browser, i);
-        PyObject *a = Artist_FromSpotify(artist);
+static int
+artistbrowser_num_tracks(void *browser)
+{
+    return sp_artistbrowse_num_tracks(browser);
+}
 
-        PyList_SetItem(l, i, a);
-    }
-    return l;
+static PyObject *
+artistbrowser_track(void *browser, int index)
+{
+    return Track_FromSpotify(sp_artistbrowse_track(browser, index));
 }
 
 static PyObject *
-ArtistBrowser_tracks(ArtistBrowser * self)
+ArtistBrowser_albums(ArtistBrowser * self)
 {
-    int count = sp_artistbrowse_num_tracks(self->_browser);
-    PyObject *l = PyList_New(count);
-    int i;
+    return SequenceView_New((PyObject *)self, self->_browser,
+                            artistbrowser_num_albums, artistbrowser_album);
+}
 
-    for (i = 0; i < count; ++i) {
-        PyObject *a = Track_FromSpotify(sp_artistbrowse_track(self->_browser, i));
+static PyObject *
+ArtistBrowser_similar_artists(ArtistBrowser * self)
+{
+    return SequenceView_New((PyObject *)self, self->_browser,
+                            artistbrowser_num_similar_artists,
+                            artistbrowser_similar_artist);
+}
 
-        PyList_SetItem(l, i, a);
-    }
-    return l;
+static PyObject *
+ArtistBrowser_tracks(ArtistBrowser * self)
+{
+    return SequenceView_New((PyObject *)self, self->_browser,
+                            artistbrowser_num_tracks, artistbrowser_track);
 }
 
 Py_ssize_t
@@ -155,7 +165,7 @@ ArtistBrowser_sq_length(ArtistBrowser * self)
 PyObject *
 ArtistBrowser_sq_item(ArtistBrowser * self, Py_ssize_t index)
 {
-    if (index >= sp_artistbrowse_num_tracks(self->_browser)) {
+    if (index < 0 || index >= sp_artistbrowse_num_tracks(self->_browser)) {
         PyErr_SetString(PyExc_IndexError, "");
         return NULL;
     }
@@ -184,15 +194,15 @@ static PyMethodDef ArtistBrowser_methods[] = {
     {"albums",
      (PyCFunction)ArtistBrowser_albums,
      METH_NOARGS,
-     "Return a list of all the albums found while browsing."},
+     "Return a sequence of all the albums found while browsing."},
     {"similar_artists",
      (PyCFunction)ArtistBrowser_similar_artists,
      METH_NOARGS,
-     "Return a list of all the artists found while browsing."},
+     "Return a sequence of all the artists found while browsing."},
     {"tracks",
      (PyCFunction)ArtistBrowser_tracks,
      METH_NOARGS,
-     "Return a list of all the tracks found while browsing."},
+     "Return a sequence of all the tracks found while browsing."},
     {NULL}
 };
 
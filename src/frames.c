@@ -0,0 +1,385 @@
+#include <Python.h>
+#include <structmember.h>
+#include <stdint.h>
+#include <string.h>
+#include "pyspotify.h"
+#include "frames.h"
+
+/* Initial size of the pool blocks: 2048 frames of 16 bit stereo samples,
+ * which is what libspotify usually delivers at once. Blocks grow as
+ * needed. */
+#define FRAMES_BLOCK_SIZE (2048 * 2 * sizeof(int16_t))
+
+typedef struct {
+    char *data;
+    size_t size;
+} frames_block;
+
+/* Free blocks of the pool, only accessed with the GIL held */
+static frames_block *g_pool = NULL;
+static int g_pool_size = 0;
+static int g_pool_free = 0;
+
+static void
+pool_give_back(char *data, size_t size)
+{
+    if (g_pool_free < g_pool_size) {
+        g_pool[g_pool_free].data = data;
+        g_pool[g_pool_free].size = size;
+        g_pool_free++;
+    }
+    else {
+        PyMem_Free(data);
+    }
+}
+
+int
+frames_pool_configure(int size)
+{
+    int i;
+
+    for (i = 0; i < g_pool_free; i++)
+        PyMem_Free(g_pool[i].data);
+    PyMem_Free(g_pool);
+    g_pool = NULL;
+    g_pool_size = g_pool_free = 0;
+    if (size <= 0)
+        return 0;
+
+    g_pool = PyMem_New(frames_block, size);
+    if (!g_pool) {
+        PyErr_NoMemory();
+        return -1;
+    }
+    g_pool_size = size;
+    for (i = 0; i < size; i++) {
+        g_pool[i].data = PyMem_Malloc(FRAMES_BLOCK_SIZE);
+        if (!g_pool[i].data) {
+            PyErr_NoMemory();
+            return -1;
+        }
+        g_pool[i].size = FRAMES_BLOCK_SIZE;
+        g_pool_free++;
+    }
+    return 0;
+}
+
+int
+frames_pool_enabled(void)
+{
+    return g_pool_size > 0;
+}
+
+static PyMemberDef Frames_members[] = {
+    {NULL}
+};
+
+static PyObject *
+Frames_new(PyTypeObject * type, PyObject *args, PyObject *kwds)
+{
+    Frames *self;
+
+    self = (Frames *) type->tp_alloc(type, 0);
+    self->_data = NULL;
+    self->_shape[0] = self->_shape[1] = 0;
+    self->_strides[0] = self->_strides[1] = 0;
+    self->_block = NULL;
+    self->_block_size = 0;
+    self->_owner = NULL;
+    self->_exports = 0;
+    self->_size[0] = 0;
+    return (PyObject *)self;
+}
+
+static Frames *
+Frames_create(int num_frames, int channels)
+{
+    Frames *f = (Frames *) PyObject_CallObject((PyObject *)&FramesType, NULL);
+
+    if (!f)
+        return NULL;
+    f->_shape[0] = num_frames;
+    f->_shape[1] = channels;
+    f->_strides[0] = channels * sizeof(int16_t);
+    f->_strides[1] = sizeof(int16_t);
+    f->_size[0] = num_frames * channels * sizeof(int16_t);
+    return f;
+}
+
+PyObject *
+Frames_FromMemory(const void *data, int num_frames, int channels,
+                  PyObject *owner)
+{
+    Frames *f = Frames_create(num_frames, channels);
+
+    if (!f)
+        return NULL;
+    f->_data = (char *)data;
+    Py_XINCREF(owner);
+    f->_owner = owner;
+    return (PyObject *)f;
+}
+
+PyObject *
+Frames_FromPool(const void *data, int num_frames, int channels)
+{
+    Frames *f;
+    frames_block block;
+    size_t size = (size_t)num_frames * channels * sizeof(int16_t);
+
+    if (g_pool_free == 0)
+        return NULL;
+    block = g_pool[--g_pool_free];
+    if (block.size < size) {
+        char *grown = PyMem_Realloc(block.data, size);
+
+        if (!grown) {
+            pool_give_back(block.data, block.size);
+            return PyErr_NoMemory();
+        }
+        block.data = grown;
+        block.size = size;
+    }
+    f = Frames_create(num_frames, channels);
+    if (!f) {
+        pool_give_back(block.data, block.size);
+        return NULL;
+    }
+    memcpy(block.data, data, size);
+    f->_data = f->_block = block.data;
+    f->_block_size = block.size;
+    return (PyObject *)f;
+}
+
+void
+Frames_Invalidate(PyObject *frames)
+{
+    Frames *f = (Frames *) frames;
+    char *copy;
+
+    if (f->_block)
+        return;
+    if (f->_exports == 0) {
+        f->_data = NULL;
+        return;
+    }
+    /* A buffer still points to the data, which goes away: give the frames
+     * their own copy of it. */
+    copy = PyMem_Malloc(f->_size[0] ? f->_size[0] : 1);
+    if (!copy) {
+        PyErr_NoMemory();
+        PyErr_WriteUnraisable(frames);
+        f->_data = NULL;
+        return;
+    }
+    memcpy(copy, f->_data, f->_size[0]);
+    f->_data = f->_block = copy;
+    f->_block_size = f->_size[0];
+}
+
+static void
+Frames_dealloc(Frames * self)
+{
+    if (self->_block)
+        pool_give_back(self->_block, self->_block_size);
+    Py_XDECREF(self->_owner);
+    self->ob_type->tp_free(self);
+}
+
+static Py_ssize_t
+Frames_len(Frames * self)
+{
+    return self->_shape[0] * self->_strides[0];
+}
+
+static int
+Frames_check_valid(Frames * self)
+{
+    if (self->_data)
+        return 1;
+    PyErr_SetString(SpotifyError,
+                    "frames are only valid during music_delivery");
+    return 0;
+}
+
+static PyObject *
+Frames_num_frames(Frames * self)
+{
+    return PyInt_FromSsize_t(self->_shape[0]);
+}
+
+static PyObject *
+Frames_channels(Frames * self)
+{
+    return PyInt_FromSsize_t(self->_shape[1]);
+}
+
+static PyObject *
+Frames_is_valid(Frames * self)
+{
+    return PyBool_FromLong(self->_data != NULL);
+}
+
+static PyObject *
+Frames_str(Frames * self)
+{
+    if (!Frames_check_valid(self))
+        return NULL;
+    return PyBytes_FromStringAndSize(self->_data, Frames_len(self));
+}
+
+/* Old style buffer protocol, for code written for the buffer objects given
+ * by earlier versions */
+static Py_ssize_t
+Frames_getreadbuffer(Frames * self, Py_ssize_t segment, void **ptr)
+{
+    if (segment != 0) {
+        PyErr_SetString(PyExc_SystemError,
+                        "accessing non-existent frames segment");
+        return -1;
+    }
+    if (!Frames_check_valid(self))
+        return -1;
+    *ptr = self->_data;
+    return Frames_len(self);
+}
+
+static Py_ssize_t
+Frames_getsegcount(Frames * self, Py_ssize_t *lenp)
+{
+    if (lenp)
+        *lenp = Frames_len(self);
+    return 1;
+}
+
+static Py_ssize_t
+Frames_getcharbuffer(Frames * self, Py_ssize_t segment, char **ptr)
+{
+    return Frames_getreadbuffer(self, segment, (void **)ptr);
+}
+
+/* New style buffer protocol: read-only, 16 bit samples shaped as
+ * (num_frames, channels). Consumers not asking for the format get the
+ * samples as a one-dimensional array of bytes. */
+static Py_ssize_t frames_byte_stride[1] = { 1 };
+
+static int
+Frames_getbuffer(Frames * self, Py_buffer * view, int flags)
+{
+    if (!Frames_check_valid(self))
+        return -1;
+    if (PyBuffer_FillInfo(view, (PyObject *)self, self->_data,
+                          Frames_len(self), 1, flags) < 0)
+        return -1;
+    if ((flags & PyBUF_FORMAT) == PyBUF_FORMAT) {
+        view->format = "h";
+        view->itemsize = sizeof(int16_t);
+        if ((flags & PyBUF_ND) == PyBUF_ND) {
+            view->ndim = 2;
+            view->shape = self->_shape;
+        }
+        if ((flags & PyBUF_STRIDES) == PyBUF_STRIDES)
+            view->strides = self->_strides;
+    }
+    else {
+        if ((flags & PyBUF_ND) == PyBUF_ND)
+            view->shape = self->_size;
+        if ((flags & PyBUF_STRIDES) == PyBUF_STRIDES)
+            view->strides = frames_byte_stride;
+    }
+    self->_exports++;
+    return 0;
+}
+
+static void
+Frames_releasebuffer(Frames * self, Py_buffer * view)
+{
+    self->_exports--;
+}
+
+static PyMethodDef Frames_methods[] = {
+    {"num_frames",
+     (PyCFunction)Frames_num_frames,
+     METH_NOARGS,
+     "Returns the number of frames"},
+    {"channels",
+     (PyCFunction)Frames_channels,
+     METH_NOARGS,
+     "Returns the number of channels"},
+    {"is_valid",
+     (PyCFunction)Frames_is_valid,
+     METH_NOARGS,
+     "True if the audio data can still be accessed"},
+    {NULL}
+};
+
+static PySequenceMethods Frames_as_sequence = {
+    (lenfunc) Frames_len,       /* sq_length */
+    0,                          /* sq_concat */
+    0,                          /* sq_repeat */
+    0,                          /* sq_item */
+    0,                          /* sq_slice */
+    0,                          /* sq_ass_item */
+    0,                          /* sq_ass_slice */
+    0,                          /* sq_contains */
+    0,                          /* sq_inplace_concat */
+    0,                          /* sq_inplace_repeat */
+};
+
+static PyBufferProcs Frames_as_buffer = {
+    (readbufferproc) Frames_getreadbuffer,      /* bf_getreadbuffer */
+    0,                                          /* bf_getwritebuffer */
+    (segcountproc) Frames_getsegcount,          /* bf_getsegcount */
+    (charbufferproc) Frames_getcharbuffer,      /* bf_getcharbuffer */
+    (getbufferproc) Frames_getbuffer,           /* bf_getbuffer */
+    (releasebufferproc) Frames_releasebuffer,   /* bf_releasebuffer */
+};
+
+PyTypeObject FramesType = {
+    PyObject_HEAD_INIT(NULL)
+    0,                          /*ob_size */
+    "spotify.Frames",           /*tp_name */
+    sizeof(Frames),             /*tp_basicsize */
+    0,                          /*tp_itemsize */
+    (destructor) Frames_dealloc,        /*tp_dealloc */
+    0,                          /*tp_print */
+    0,                          /*tp_getattr */
+    0,                          /*tp_setattr */
+    0,                          /*tp_compare */
+    0,                          /*tp_repr */
+    0,                          /*tp_as_number */
+    &Frames_as_sequence,        /*tp_as_sequence */
+    0,                          /*tp_as_mapping */
+    0,                          /*tp_hash */
+    0,                          /*tp_call */
+    (reprfunc) Frames_str,      /*tp_str */
+    0,                          /*tp_getattro */
+    0,                          /*tp_setattro */
+    &Frames_as_buffer,          /*tp_as_buffer */
+    Py_TPFLAGS_DEFAULT | Py_TPFLAGS_HAVE_NEWBUFFER,     /*tp_flags */
+    "Audio data delivered by libspotify",       /* tp_doc */
+    0,                          /* tp_traverse */
+    0,                          /* tp_clear */
+    0,                          /* tp_richcompare */
+    0,                          /* tp_weaklistoffset */
+    0,                          /* tp_iter */
+    0,                          /* tp_iternext */
+    Frames_methods,             /* tp_methods */
+    Frames_members,             /* tp_members */
+    0,                          /* tp_getset */
+    0,                          /* tp_base */
+    0,                          /* tp_dict */
+    0,                          /* tp_descr_get */
+    0,                          /* tp_descr_set */
+    0,                          /* tp_dictoffset */
+    0,                          /* tp_init */
+    0,                          /* tp_alloc */
+    Frames_new,                 /* tp_new */
+};
+
+void
+frames_init(PyObject *m)
+{
+    Py_INCREF(&FramesType);
+    PyModule_AddObject(m, "Frames", (PyObject *)&FramesType);
+}
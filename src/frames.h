@@ -0,0 +1,38 @@
+typedef struct {
+    PyObject_HEAD
+    char *_data;                /* NULL once invalidated */
+    Py_ssize_t _shape[2];       /* num_frames, channels */
+    Py_ssize_t _strides[2];
+    char *_block;               /* pool block owning _data, if any */
+    size_t _block_size;
+    PyObject *_owner;           /* object owning _data, if any */
+    int _exports;               /* number of buffers exported */
+    Py_ssize_t _size[1];        /* shape of the buffer as bytes */
+} Frames;
+
+extern PyTypeObject FramesType;
+
+extern void frames_init(PyObject *m);
+
+/* Sets the number of preallocated blocks of the frames pool. 0 disables the
+ * pool. */
+extern int frames_pool_configure(int size);
+
+/* Returns true if the frames pool is enabled */
+extern int frames_pool_enabled(void);
+
+/* Wraps the 16 bit samples delivered by libspotify without copying them. The
+ * object must be invalidated with Frames_Invalidate() before the data goes
+ * away. owner may be NULL, or an object kept alive with the frames. */
+PyObject *Frames_FromMemory(const void *data, int num_frames, int channels,
+                            PyObject *owner);
+
+/* Copies the samples into a block of the frames pool, which is given back
+ * when the object is deallocated. Returns NULL without setting an exception
+ * if all the blocks are in use. */
+PyObject *Frames_FromPool(const void *data, int num_frames, int channels);
+
+/* Makes any further access to the frames' data raise an exception. Frames
+ * copied to the pool own their data and stay valid, and so do frames whose
+ * buffer is still exported, e.g. to a memoryview: their data is copied. */
+void Frames_Invalidate(PyObject *frames);
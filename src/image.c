@@ -4,6 +4,53 @@
 #include "pyspotify.h"
 #include "image.h"
 
+/* The load callbacks which have not been called yet, by image, so that they
+ * can be removed, and are removed when the Image object which added them is
+ * deallocated: libspotify never calls the callbacks of an image which is
+ * released before it is loaded. */
+typedef struct _image_callback_trampoline {
+    PyObject *callback;
+    PyObject *userdata;
+    Image *owner;
+    sp_image *image;
+    struct _image_callback_trampoline *next;
+} image_callback_trampoline;
+
+static ptr_table image_callbacks_table;
+
+static void image_callback(sp_image * image, void *userdata);
+
+static void
+image_callbacks_unlink(image_callback_trampoline *tramp)
+{
+    image_callback_trampoline *first, **prev;
+
+    first = ptr_table_get(&image_callbacks_table, tramp->image);
+    prev = &first;
+    while (*prev && *prev != tramp)
+        prev = &(*prev)->next;
+    if (*prev)
+        *prev = tramp->next;
+    /* Replacing the value of a key in the table allocates nothing, so this
+     * cannot fail */
+    if (first)
+        ptr_table_set(&image_callbacks_table, tramp->image, first);
+    else
+        ptr_table_pop(&image_callbacks_table, tramp->image);
+}
+
+/* Removes the callback from libspotify and frees the trampoline. Must be
+ * called with the GIL held. */
+static void
+image_callback_delete(image_callback_trampoline *tramp)
+{
+    image_callbacks_unlink(tramp);
+    sp_image_remove_load_callback(tramp->image, image_callback, tramp);
+    Py_DECREF(tramp->callback);
+    Py_XDECREF(tramp->userdata);
+    free(tramp);
+}
+
 static PyMemberDef Image_members[] = {
     {NULL}
 };
@@ -31,8 +78,20 @@ Image_FromSpotify(sp_image * image)
 static void
 Image_dealloc(Image * self)
 {
-    if (self->_image)
+    image_callback_trampoline *tramp;
+
+    if (self->_image) {
+        /* Deleting a callback may run arbitrary code, which may change the
+         * list, so it is scanned again from the start after each deletion */
+        do {
+            tramp = ptr_table_get(&image_callbacks_table, self->_image);
+            while (tramp && tramp->owner != self)
+                tramp = tramp->next;
+            if (tramp)
+                image_callback_delete(tramp);
+        } while (tramp);
         sp_image_release(self->_image);
+    }
     self->ob_type->tp_free(self);
 }
 
@@ -67,29 +126,45 @@ Image_data(Image * self)
 static PyObject *
 Image_image_id(Image * self)
 {
-    /* TODO */
-    Py_RETURN_NONE;
+    const byte *image_id = sp_image_image_id(self->_image);
+
+    return PyBytes_FromStringAndSize((const char *)image_id, 20);
 }
 
-typedef struct {
-    PyObject *callback;
-    PyObject *userdata;
-} image_callback_trampoline;
+static PyObject *
+Image_image_id_hex(Image * self)
+{
+    static const char digits[] = "0123456789abcdef";
+    const byte *image_id = sp_image_image_id(self->_image);
+    char hex[40];
+    int i;
 
-void
+    for (i = 0; i < 20; i++) {
+        hex[2 * i] = digits[image_id[i] >> 4];
+        hex[2 * i + 1] = digits[image_id[i] & 0xf];
+    }
+    return PyBytes_FromStringAndSize(hex, 40);
+}
+
+static void
 image_callback(sp_image * image, void *userdata)
 {
     image_callback_trampoline *tramp = (image_callback_trampoline *) userdata;
-    PyObject *i;
+    PyObject *i, *res;
     PyGILState_STATE gstate;
 
     gstate = PyGILState_Ensure();
+    image_callbacks_unlink(tramp);
     i = Image_FromSpotify(image);
-    PyObject_CallFunctionObjArgs(tramp->callback, i, tramp->userdata, NULL);
+    res = PyObject_CallFunctionObjArgs(tramp->callback, i, tramp->userdata,
+                                       NULL);
+    if (!res)
+        PyErr_WriteUnraisable(tramp->callback);
+    Py_XDECREF(res);
     Py_DECREF(i);
     Py_DECREF(tramp->callback);
     Py_XDECREF(tramp->userdata);
-    free(userdata);
+    free(tramp);
     PyGILState_Release(gstate);
 }
 
@@ -102,11 +177,20 @@ Image_add_load_callback(Image * self, PyObject *args)
 
     if (!PyArg_ParseTuple(args, "O|O", &callback, &userdata))
         return NULL;
-    Py_XINCREF(callback);
-    Py_XINCREF(userdata);
     tramp = malloc(sizeof(image_callback_trampoline));
+    if (!tramp)
+        return PyErr_NoMemory();
+    tramp->next = ptr_table_get(&image_callbacks_table, self->_image);
+    if (ptr_table_set(&image_callbacks_table, self->_image, tramp) < 0) {
+        free(tramp);
+        return PyErr_NoMemory();
+    }
+    Py_INCREF(callback);
+    Py_XINCREF(userdata);
     tramp->userdata = userdata;
     tramp->callback = callback;
+    tramp->owner = self;
+    tramp->image = self->_image;
 
     Py_BEGIN_ALLOW_THREADS;
     sp_image_add_load_callback(self->_image, image_callback, tramp);
@@ -118,8 +202,29 @@ Image_add_load_callback(Image * self, PyObject *args)
 static PyObject *
 Image_remove_load_callback(Image * self, PyObject *args)
 {
-    /* TODO */
-    Py_RETURN_NONE;;
+    PyObject *callback = NULL;
+    PyObject *userdata = NULL;
+    image_callback_trampoline *tramp;
+    int equal;
+
+    if (!PyArg_ParseTuple(args, "O|O", &callback, &userdata))
+        return NULL;
+    tramp = ptr_table_get(&image_callbacks_table, self->_image);
+    for (; tramp; tramp = tramp->next) {
+        if ((tramp->userdata ? tramp->userdata : Py_None) !=
+            (userdata ? userdata : Py_None))
+            continue;
+        /* Bound methods are new objects each time they are looked up */
+        equal = PyObject_RichCompareBool(tramp->callback, callback, Py_EQ);
+        if (equal < 0)
+            return NULL;
+        if (equal) {
+            image_callback_delete(tramp);
+            Py_RETURN_NONE;
+        }
+    }
+    PyErr_SetString(SpotifyError, "This callback was not added");
+    return NULL;
 }
 
 static PyMethodDef Image_methods[] = {
@@ -142,7 +247,11 @@ static PyMethodDef Image_methods[] = {
     {"image_id",
      (PyCFunction)Image_image_id,
      METH_NOARGS,
-     "Get image ID"},
+     "Get image ID, as 20 bytes"},
+    {"image_id_hex",
+     (PyCFunction)Image_image_id_hex,
+     METH_NOARGS,
+     "Get image ID, as 40 hexadecimal digits"},
     {"add_load_callback",
      (PyCFunction)Image_add_load_callback,
      METH_VARARGS,
@@ -8,6 +8,7 @@
 #include "album.h"
 #include "playlist.h"
 #include "search.h"
+#include "session.h"
 
 static PyMemberDef Link_members[] = {
     {NULL}
@@ -203,6 +204,157 @@ Link_as_artist(Link * self)
     return artist;
 }
 
+/* A URI being resolved by Link_resolve_many() */
+typedef struct {
+    PyObject *encoded;          /* the URI as bytes */
+    const char *uri;
+    sp_linktype type;
+    void *object;               /* the resolved object, with a reference */
+} resolved_link;
+
+/* Resolves a URI without using the Python API, so it can be called without
+ * holding the GIL */
+static void
+resolve_link(resolved_link * rl)
+{
+    sp_link *link = sp_link_create_from_string(rl->uri);
+
+    rl->object = NULL;
+    if (!link) {
+        rl->type = SP_LINKTYPE_INVALID;
+        return;
+    }
+    rl->type = sp_link_type(link);
+    switch (rl->type) {
+    case SP_LINKTYPE_TRACK:
+        rl->object = sp_link_as_track(link);
+        if (rl->object)
+            sp_track_add_ref(rl->object);
+        break;
+    case SP_LINKTYPE_ALBUM:
+        rl->object = sp_link_as_album(link);
+        if (rl->object)
+            sp_album_add_ref(rl->object);
+        break;
+    case SP_LINKTYPE_ARTIST:
+        rl->object = sp_link_as_artist(link);
+        if (rl->object)
+            sp_artist_add_ref(rl->object);
+        break;
+    case SP_LINKTYPE_PLAYLIST:
+        if (g_session)
+            rl->object = sp_playlist_create(g_session, link);
+        break;
+    default:
+        break;
+    }
+    sp_link_release(link);
+}
+
+/* Returns a new reference to the wrapper of a resolved link, or to a
+ * SpotifyError instance if it could not be resolved */
+static PyObject *
+resolved_link_object(resolved_link * rl)
+{
+    PyObject *result;
+
+    if (!rl->object) {
+        const char *message;
+
+        if (rl->type == SP_LINKTYPE_INVALID)
+            message = "Failed to get link from a Spotify URI";
+        else if (rl->type == SP_LINKTYPE_PLAYLIST)
+            message = "Playlist links can only be resolved in a session";
+        else
+            message = "Unsupported link type";
+        return PyObject_CallFunction(SpotifyError, "s", message);
+    }
+    switch (rl->type) {
+    case SP_LINKTYPE_TRACK:
+        result = Track_FromSpotify(rl->object);
+        sp_track_release(rl->object);
+        break;
+    case SP_LINKTYPE_ALBUM:
+        result = Album_FromSpotify(rl->object);
+        sp_album_release(rl->object);
+        break;
+    case SP_LINKTYPE_ARTIST:
+        result = Artist_FromSpotify(rl->object);
+        sp_artist_release(rl->object);
+        break;
+    default:
+        result = Playlist_FromSpotify(rl->object);
+        sp_playlist_release(rl->object);
+        break;
+    }
+    rl->object = NULL;
+    return result;
+}
+
+static PyObject *
+Link_resolve_many(Link * self, PyObject *args)
+{
+    PyObject *uris, *seq, *result = NULL;
+    resolved_link *links;
+    Py_ssize_t i, n, encoded = 0;
+
+    if (!PyArg_ParseTuple(args, "O", &uris))
+        return NULL;
+    seq = PySequence_Fast(uris, "uris must be a sequence of strings");
+    if (!seq)
+        return NULL;
+    n = PySequence_Fast_GET_SIZE(seq);
+    links = PyMem_New(resolved_link, n);
+    if (!links) {
+        Py_DECREF(seq);
+        return PyErr_NoMemory();
+    }
+    for (; encoded < n; encoded++) {
+        PyObject *item = PySequence_Fast_GET_ITEM(seq, encoded);
+        resolved_link *rl = &links[encoded];
+
+        if (PyUnicode_Check(item)) {
+            rl->encoded = PyUnicode_AsUTF8String(item);
+        }
+        else {
+            Py_INCREF(item);
+            rl->encoded = item;
+        }
+        if (!rl->encoded)
+            goto cleanup;
+        rl->uri = PyBytes_AsString(rl->encoded);
+        if (!rl->uri) {
+            Py_DECREF(rl->encoded);
+            goto cleanup;
+        }
+    }
+
+    Py_BEGIN_ALLOW_THREADS;
+    for (i = 0; i < n; i++)
+        resolve_link(&links[i]);
+    Py_END_ALLOW_THREADS;
+
+    result = PyList_New(n);
+    for (i = 0; i < n; i++) {
+        PyObject *item = resolved_link_object(&links[i]);
+
+        if (!item || !result) {
+            Py_XDECREF(item);
+            Py_CLEAR(result);
+        }
+        else {
+            PyList_SET_ITEM(result, i, item);
+        }
+    }
+
+  cleanup:
+    for (i = 0; i < encoded; i++)
+        Py_DECREF(links[i].encoded);
+    PyMem_Free(links);
+    Py_DECREF(seq);
+    return result;
+}
+
 static PyObject *
 Link_str(PyObject *oself)
 {
@@ -244,6 +396,10 @@ static PyMethodDef Link_methods[] = {
      (PyCFunction)Link_from_playlist,
      METH_VARARGS | METH_CLASS,
      "Create a new Link object from a Playlist object"},
+    {"resolve_many",
+     (PyCFunction)Link_resolve_many,
+     METH_VARARGS | METH_CLASS,
+     "Resolve a list of Spotify URIs to Track, Album, Artist or Playlist objects"},
     {"type",
      (PyCFunction)Link_type,
      METH_NOARGS,
@@ -6,6 +6,7 @@
 #include <Python.h>
 #include <stdio.h>
 #include <string.h>
+#include <stdint.h>
 #include <libspotify/api.h>
 #include <libmockspotify.h>
 #include "pyspotify.h"
@@ -23,6 +24,8 @@
 #include "track.h"
 #include "user.h"
 #include "toplistbrowser.h"
+#include "frames.h"
+#include "view.h"
 
 /****************************** GLOBALS ************************************/
 
@@ -277,6 +280,32 @@ mock_album(PyObject *self, PyObject *args, PyObject *kwds)
     return Album_FromSpotify(album);
 }
 
+/// Generate a mock spotify.Image python object
+PyObject *
+mock_image(PyObject *self, PyObject *args, PyObject *kwds)
+{
+    char *image_id, *data="";
+    int id_len, data_len=0;
+    sp_imageformat format=SP_IMAGE_FORMAT_JPEG;
+    sp_error error=SP_ERROR_OK;
+    sp_image *image;
+
+    static char *kwlist[] =
+        { "image_id", "data", "format", "error", NULL };
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "s#|s#ii", kwlist,
+                &image_id, &id_len, &data, &data_len, &format, &error))
+        return NULL;
+    if (id_len != 20) {
+        PyErr_SetString(SpotifyError, "Image id length != 20");
+        return NULL;
+    }
+
+    image = mocksp_image_create((const byte *)image_id, format, data_len,
+                                (const byte *)data, error);
+    return Image_FromSpotify(image);
+}
+
 /// Generate a mock spotify.Playlist python object
 PyObject *
 mock_playlist(PyObject *self, PyObject *args, PyObject *kwds)
@@ -639,6 +668,61 @@ mock_registry_clean(PyObject *self)
     Py_RETURN_NONE;
 }
 
+/************************* AUDIO FRAMES *************************************/
+
+/// Generate a mock spotify.Frames object, as given to music_delivery
+PyObject *
+mock_frames(PyObject *self, PyObject *args, PyObject *kwds)
+{
+    PyObject *data, *frames;
+    int channels = 2, valid = 1, pooled = 0;
+
+    static char *kwlist[] = { "data", "channels", "valid", "pooled", NULL };
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "O!|iii", kwlist,
+                                     &PyBytes_Type, &data, &channels,
+                                     &valid, &pooled))
+        return NULL;
+
+    int num_frames = PyBytes_GET_SIZE(data) / (channels * sizeof(int16_t));
+
+    if (pooled) {
+        frames = Frames_FromPool(PyBytes_AS_STRING(data), num_frames,
+                                 channels);
+        if (!frames && !PyErr_Occurred())
+            Py_RETURN_NONE;
+        return frames;
+    }
+    frames = Frames_FromMemory(PyBytes_AS_STRING(data), num_frames,
+                               channels, data);
+    if (frames && !valid)
+        Frames_Invalidate(frames);
+    return frames;
+}
+
+PyObject *
+mock_frames_pool(PyObject *self, PyObject *args)
+{
+    int size;
+
+    if (!PyArg_ParseTuple(args, "i", &size))
+        return NULL;
+    if (frames_pool_configure(size) < 0)
+        return NULL;
+    Py_RETURN_NONE;
+}
+
+PyObject *
+mock_frames_invalidate(PyObject *self, PyObject *args)
+{
+    PyObject *frames;
+
+    if (!PyArg_ParseTuple(args, "O!", &FramesType, &frames))
+        return NULL;
+    Frames_Invalidate(frames);
+    Py_RETURN_NONE;
+}
+
 /************************* CURRENT SESSION **********************************/
 
 PyObject *
@@ -676,6 +760,8 @@ static PyMethodDef module_methods[] = {
         METH_VARARGS | METH_KEYWORDS, "Create a mock artist"},
     {"mock_artistbrowse", (PyCFunction)mock_artistbrowse,
         METH_VARARGS | METH_KEYWORDS, "Create a mock artist browser"},
+    {"mock_image", (PyCFunction)mock_image,
+        METH_VARARGS | METH_KEYWORDS, "Create a mock image"},
     {"mock_playlist", (PyCFunction)mock_playlist,
         METH_VARARGS | METH_KEYWORDS, "Create a mock playlist"},
     {"mock_playlistcontainer", (PyCFunction)mock_playlistcontainer,
@@ -688,6 +774,12 @@ static PyMethodDef module_methods[] = {
         METH_VARARGS | METH_KEYWORDS, "Create a mock session"},
     {"mock_toplistbrowse", (PyCFunction)mock_toplistbrowse,
         METH_VARARGS | METH_KEYWORDS, "Create a mock toplist browser"},
+    {"mock_frames", (PyCFunction)mock_frames,
+        METH_VARARGS | METH_KEYWORDS, "Create mock audio frames"},
+    {"mock_frames_pool", mock_frames_pool,
+        METH_VARARGS, "Set the number of blocks of the frames pool."},
+    {"mock_frames_invalidate", mock_frames_invalidate,
+        METH_VARARGS, "Invalidate audio frames."},
     {"mock_set_current_session", (PyCFunction)mock_set_current_session,
         METH_VARARGS | METH_KEYWORDS, "Set the current session."},
     {"mock_event_trigger", event_trigger,
@@ -728,10 +820,16 @@ init_mockspotify(void)
         return;
     if (PyType_Ready(&TrackType) < 0)
         return;
+    if (PyType_Ready(&ImageType) < 0)
+        return;
     if (PyType_Ready(&UserType) < 0)
         return;
     if (PyType_Ready(&ToplistBrowserType) < 0)
         return;
+    if (PyType_Ready(&FramesType) < 0)
+        return;
+    if (PyType_Ready(&SequenceViewType) < 0)
+        return;
 
     m = Py_InitModule("_mockspotify", module_methods);
     if (m == NULL)
@@ -758,6 +856,9 @@ init_mockspotify(void)
     session_init(m);
     search_init(m);
     track_init(m);
+    image_init(m);
     user_init(m);
     toplistbrowser_init(m);
+    frames_init(m);
+    view_init(m);
 }
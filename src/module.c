@@ -16,6 +16,8 @@
 #include "track.h"
 #include "image.h"
 #include "user.h"
+#include "frames.h"
+#include "view.h"
 
 PyObject *SpotifyError;
 PyObject *SpotifyApiVersion;
@@ -55,6 +57,10 @@ init_spotify(void)
         return;
     if (PyType_Ready(&UserType) < 0)
         return;
+    if (PyType_Ready(&FramesType) < 0)
+        return;
+    if (PyType_Ready(&SequenceViewType) < 0)
+        return;
 
     m = Py_InitModule("_spotify", module_methods);
     if (m == NULL)
@@ -84,4 +90,6 @@ init_spotify(void)
     track_init(m);
     image_init(m);
     user_init(m);
+    frames_init(m);
+    view_init(m);
 }
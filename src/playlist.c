@@ -9,14 +9,14 @@
 
 /* This is the playlist callbacks table.
  *
- * It is a linked list of entries keeping enough information into pyspotify
- * to be able to remove the callbacks after a while, especially when dealing
- * with a different python Playlist object than the one the callbacks were
- * added from. Each entry corresponds to a spotify playlist on which
- * callbacks have been added. When all callbacks are removed from a playlist,
- * the entry is free'd from memory.
+ * It is a hash table of entries, keyed by the spotify playlist, keeping enough
+ * information into pyspotify to be able to remove the callbacks after a
+ * while, especially when dealing with a different python Playlist object than
+ * the one the callbacks were added from. Each entry corresponds to a spotify
+ * playlist on which callbacks have been added. When all callbacks are removed
+ * from a playlist, the entry is free'd from memory.
  */
-static pl_cb_entry *playlist_callbacks_table = NULL;
+static ptr_table playlist_callbacks_table;
 
 static PyMemberDef Playlist_members[] = {
     {NULL}
@@ -29,91 +29,177 @@ Playlist_new(PyTypeObject * type, PyObject *args, PyObject *kwds)
 
     self = (Playlist *) type->tp_alloc(type, 0);
     self->_playlist = NULL;
+    self->_weakreflist = NULL;
     return (PyObject *)self;
 }
 
+/* Wrappers of the playlists currently alive, see wrapper_cache_get() */
+static PyObject *playlist_cache = NULL;
+
 PyObject *
 Playlist_FromSpotify(sp_playlist * spl)
 {
     Playlist *playlist =
+        (Playlist *) wrapper_cache_get(playlist_cache, spl);
+
+    if (playlist)
+        return (PyObject *)playlist;
+    playlist =
         (Playlist *) PyObject_CallObject((PyObject *)&PlaylistType, NULL);
     playlist->_playlist = spl;
     sp_playlist_add_ref(spl);
     sp_playlist_set_autolink_tracks(spl, 1);
+    wrapper_cache_add(&playlist_cache, spl, (PyObject *)playlist);
     return (PyObject *)playlist;
 }
 
 static void
 Playlist_dealloc(Playlist * self)
 {
+    wrapper_cache_remove(playlist_cache, self->_playlist, (PyObject *)self);
+    if (self->_weakreflist)
+        PyObject_ClearWeakRefs((PyObject *)self);
     if (self->_playlist)
         sp_playlist_release(self->_playlist);
     self->ob_type->tp_free(self);
 }
 
+static PyObject *
+Playlist_richcompare(PyObject *a, PyObject *b, int op)
+{
+    PyObject *result;
+
+    if (!PyObject_TypeCheck(a, &PlaylistType)
+        || !PyObject_TypeCheck(b, &PlaylistType)
+        || (op != Py_EQ && op != Py_NE)) {
+        Py_INCREF(Py_NotImplemented);
+        return Py_NotImplemented;
+    }
+    if ((((Playlist *) a)->_playlist == ((Playlist *) b)->_playlist)
+        == (op == Py_EQ))
+        result = Py_True;
+    else
+        result = Py_False;
+    Py_INCREF(result);
+    return result;
+}
+
+static long
+Playlist_hash(Playlist * self)
+{
+    return _Py_HashPointer(self->_playlist);
+}
+
 static PyObject *
 Playlist_is_loaded(Playlist * self)
 {
     return Py_BuildValue("i", sp_playlist_is_loaded(self->_playlist));
 }
 
+/* Calls progress(done, total), if progress is given. Returns -1 if it raised
+ * an exception. */
+static int
+playlist_report_progress(PyObject *progress, int done, int total)
+{
+    PyObject *res;
+
+    if (!progress || progress == Py_None)
+        return 0;
+    res = PyObject_CallFunction(progress, "ii", done, total);
+    if (!res)
+        return -1;
+    Py_DECREF(res);
+    return 0;
+}
+
+static int
+playlist_compare_indices(const void *a, const void *b)
+{
+    return *(const int *)a - *(const int *)b;
+}
+
 static PyObject *
-Playlist_remove_tracks(Playlist * self, PyObject *args)
+Playlist_remove_tracks(Playlist * self, PyObject *args, PyObject *kwds)
 {
-    PyObject *py_tracks;
-    PyObject *item;
-    sp_error err;
+    PyObject *py_tracks, *seq, *item;
+    PyObject *progress = NULL;
+    PyObject *result = NULL;
+    sp_error err = SP_ERROR_OK;
     int *tracks;
-    int num_tracks;
-    int playlist_length;
-    int i;
+    Py_ssize_t index;
+    int num_tracks, playlist_length, chunk_size = 0;
+    int i, n, done, end;
+    static char *kwlist[] = { "tracks", "chunk_size", "progress", NULL };
 
-    if (!PyArg_ParseTuple(args, "O", &py_tracks))
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|iO", kwlist,
+                                     &py_tracks, &chunk_size, &progress))
         return NULL;
-    if (!PySequence_Check(py_tracks)) {
-        PyErr_SetString(PyExc_TypeError, "expected sequence");
+    seq = PySequence_Fast(py_tracks, "expected an iterable of integers");
+    if (!seq)
         return NULL;
+    num_tracks = PySequence_Fast_GET_SIZE(seq);
+    tracks = PyMem_New(int, num_tracks ? num_tracks : 1);
+    if (!tracks) {
+        Py_DECREF(seq);
+        return PyErr_NoMemory();
     }
-    num_tracks = PySequence_Size(py_tracks);
-    tracks = (int *)malloc(sizeof(tracks) * num_tracks);
     playlist_length = sp_playlist_num_tracks(self->_playlist);
     for (i = 0; i < num_tracks; i++) {
-        item = PySequence_GetItem(py_tracks, i);
-        if (!PyInt_Check(item)) {
-            free(tracks);
-            PyErr_SetString(PyExc_TypeError, "expected sequence of integers");
-            return NULL;
+        item = PySequence_Fast_GET_ITEM(seq, i);
+        if (!PyIndex_Check(item)) {
+            PyErr_SetString(PyExc_TypeError,
+                            "expected an iterable of integers");
+            goto cleanup;
         }
-        tracks[i] = (int)PyInt_AsLong(item);
-        if (tracks[i] > playlist_length) {
+        index = PyNumber_AsSsize_t(item, PyExc_IndexError);
+        if (index == -1 && PyErr_Occurred())
+            goto cleanup;
+        if (index < 0 || index >= playlist_length) {
             PyErr_SetString(PyExc_IndexError,
                             "specified track does not exist");
-            return NULL;
+            goto cleanup;
         }
-        Py_DECREF(item);
+        tracks[i] = (int)index;
     }
 
-    Py_BEGIN_ALLOW_THREADS;
-    err = sp_playlist_remove_tracks(self->_playlist, tracks, num_tracks);
-    Py_END_ALLOW_THREADS;
+    /* Remove the tracks from the end of the playlist, so that the removal of
+     * a chunk does not move the tracks of the next ones. */
+    qsort(tracks, num_tracks, sizeof(int), playlist_compare_indices);
+    n = 0;
+    for (i = 0; i < num_tracks; i++) {
+        if (n == 0 || tracks[i] != tracks[n - 1])
+            tracks[n++] = tracks[i];
+    }
+    num_tracks = n;
+    if (chunk_size <= 0)
+        chunk_size = num_tracks;
+    for (end = num_tracks, done = 0; end > 0; end -= n) {
+        n = end < chunk_size ? end : chunk_size;
+        Py_BEGIN_ALLOW_THREADS;
+        err = sp_playlist_remove_tracks(self->_playlist, tracks + end - n, n);
+        Py_END_ALLOW_THREADS;
+        if (err != SP_ERROR_OK)
+            break;
+        done += n;
+        if (playlist_report_progress(progress, done, num_tracks) < 0)
+            goto cleanup;
+    }
+    result = handle_error(err);
 
-    return handle_error(err);
+cleanup:
+    PyMem_Free(tracks);
+    Py_DECREF(seq);
+    return result;
 }
 
-static void
+/* Returns -1 with an exception set if memory is exhausted */
+static int
 pl_callbacks_table_add(Playlist * pl, playlist_callback * cb)
 {
-    pl_cb_entry *curr, *entry = NULL;
+    pl_cb_entry *entry;
 
     /* Look for an existing entry for this playlist */
-    curr = playlist_callbacks_table;
-    while (curr) {
-        if (curr->playlist == pl->_playlist) {
-            entry = curr;
-            break;
-        }
-        curr = curr->next;
-    }
+    entry = ptr_table_get(&playlist_callbacks_table, pl->_playlist);
     /* Update callbacks entry */
     if (entry) {
         cb->next = entry->callbacks;
@@ -122,33 +208,37 @@ pl_callbacks_table_add(Playlist * pl, playlist_callback * cb)
     else {
         cb->next = NULL;
         entry = malloc(sizeof(pl_cb_entry));
-        sp_playlist_add_ref(pl->_playlist);
+        if (!entry) {
+            PyErr_NoMemory();
+            return -1;
+        }
         entry->playlist = pl->_playlist;
         entry->callbacks = cb;
-        entry->next = playlist_callbacks_table;
-        playlist_callbacks_table = entry;
+        if (ptr_table_set(&playlist_callbacks_table, pl->_playlist,
+                          entry) < 0) {
+            free(entry);
+            PyErr_NoMemory();
+            return -1;
+        }
+        sp_playlist_add_ref(pl->_playlist);
     }
+    return 0;
 }
 
+/* Removes the callback added with this callback function and userdata, or, if
+ * callback is NULL, the one added with add_manager() for this manager and
+ * userdata */
 static playlist_callback *
-pl_callbacks_table_remove(Playlist * pl,
-                          PyObject *callback, PyObject *userdata)
+pl_callbacks_table_remove(Playlist * pl, PyObject *callback,
+                          PyObject *manager, PyObject *userdata)
 {
-    pl_cb_entry *e_prev = NULL, *e_curr, *entry = NULL;
+    pl_cb_entry *entry;
     playlist_callback *c_prev = NULL, *c_curr;
     playlist_callback *result = NULL;
     PyObject *code1, *code2;
 
     /* Look for an existing entry for this playlist */
-    e_curr = playlist_callbacks_table;
-    while (e_curr) {
-        if (e_curr->playlist == pl->_playlist) {
-            entry = e_curr;
-            break;
-        }
-        e_prev = e_curr;
-        e_curr = e_curr->next;
-    }
+    entry = ptr_table_get(&playlist_callbacks_table, pl->_playlist);
     /* Update callbacks entry */
     if (!entry) {
         return NULL;
@@ -160,11 +250,19 @@ pl_callbacks_table_remove(Playlist * pl,
              * Python Function objects. However, to each function corresponds
              * an unique Code object.
              */
-            PyObject *tmp1 = as_function(c_curr->trampoline->callback);
-            PyObject *tmp2 = as_function(callback);
-            code1 = PyFunction_GetCode(tmp1);
-            code2 = PyFunction_GetCode(tmp2);
-            if (code1 == code2 && c_curr->trampoline->userdata == userdata) {
+            Callback *tramp = c_curr->trampoline;
+            int match;
+
+            if (!callback || !tramp->callback) {
+                match = !callback && !tramp->callback
+                    && tramp->manager == manager;
+            }
+            else {
+                code1 = PyFunction_GetCode(as_function(tramp->callback));
+                code2 = PyFunction_GetCode(as_function(callback));
+                match = code1 == code2;
+            }
+            if (match && tramp->userdata == userdata) {
                 result = c_curr;
                 if (c_prev) {
                     c_prev->next = c_curr->next;
@@ -182,12 +280,7 @@ pl_callbacks_table_remove(Playlist * pl,
         return NULL;
     /* Cleanup */
     if (!entry->callbacks) {
-        if (e_prev) {
-            e_prev->next = entry->next;
-        }
-        else {
-            playlist_callbacks_table = entry->next;
-        }
+        ptr_table_pop(&playlist_callbacks_table, entry->playlist);
         sp_playlist_release(entry->playlist);
         free(entry);
     }
@@ -213,9 +306,17 @@ Playlist_add_callback(Playlist * self, PyObject *args,
     }
     tramp = create_trampoline(callback, Py_None, userdata);
     to_add = malloc(sizeof(playlist_callback));
+    if (!to_add) {
+        delete_trampoline(tramp);
+        return PyErr_NoMemory();
+    }
     to_add->callback = pl_callbacks;
     to_add->trampoline = tramp;
-    pl_callbacks_table_add(self, to_add);
+    if (pl_callbacks_table_add(self, to_add) < 0) {
+        free(to_add);
+        delete_trampoline(tramp);
+        return NULL;
+    }
 #ifdef DEBUG
     fprintf(stderr, "[DEBUG]-playlist- adding callback (%p,%p) py(%p,%p)\n",
             pl_callbacks, tramp, tramp->callback,
@@ -225,6 +326,30 @@ Playlist_add_callback(Playlist * self, PyObject *args,
     Py_RETURN_NONE;
 }
 
+/* Calls the Python callback of a playlist trampoline, and reports any error.
+ * Trampolines added with add_manager() have no callback, and dispatch to the
+ * manager's method called name instead. Steals the reference to args. */
+static void
+playlist_call(Callback * tramp, const char *name, PyObject *args)
+{
+    PyObject *callback, *res = NULL;
+
+    if (tramp->callback) {
+        callback = tramp->callback;
+        Py_INCREF(callback);
+    }
+    else {
+        callback = PyObject_GetAttrString(tramp->manager, name);
+    }
+    if (callback && args)
+        res = PyObject_Call(callback, args, NULL);
+    if (!res)
+        PyErr_WriteUnraisable(callback ? callback : tramp->manager);
+    Py_XDECREF(res);
+    Py_XDECREF(callback);
+    Py_XDECREF(args);
+}
+
 void
 playlist_tracks_added_callback(sp_playlist * playlist,
                                sp_track * const *tracks, int num_tracks,
@@ -232,28 +357,29 @@ playlist_tracks_added_callback(sp_playlist * playlist,
 {
     Callback *tramp = (Callback *) userdata;
     PyGILState_STATE gstate;
-    PyObject *py_tracks = PyList_New(num_tracks);
+    PyObject *py_tracks;
     int i;
-    PyObject *res;
 
     gstate = PyGILState_Ensure();
+    /* Managers which only need the number of added tracks, such as the one
+     * coalescing changes, spare the creation of the Track objects */
+    if (!tramp->callback
+        && PyObject_HasAttrString(tramp->manager, "tracks_added_count")) {
+        playlist_call(tramp, "tracks_added_count",
+                      Py_BuildValue("(NiiO)", Playlist_FromSpotify(playlist),
+                                    num_tracks, position, tramp->userdata));
+        PyGILState_Release(gstate);
+        return;
+    }
+    py_tracks = PyList_New(num_tracks);
     for (i = 0; i < num_tracks; i++) {
         PyObject *track = Track_FromSpotify(tracks[i]);
 
         PyList_SetItem(py_tracks, i, track);
     }
-    PyObject *p = Playlist_FromSpotify(playlist);
-
-    res = PyObject_CallFunctionObjArgs(tramp->callback,
-                                       p,
-                                       py_tracks,
-                                       Py_BuildValue("i", position),
-                                       tramp->userdata, NULL);
-    if (!res)
-        PyErr_WriteUnraisable(tramp->callback);
-    Py_XDECREF(res);
-    Py_DECREF(py_tracks);
-    Py_DECREF(p);
+    playlist_call(tramp, "tracks_added",
+                  Py_BuildValue("(NNiO)", Playlist_FromSpotify(playlist),
+                                py_tracks, position, tramp->userdata));
     PyGILState_Release(gstate);
 }
 
@@ -274,23 +400,17 @@ playlist_tracks_removed_callback(sp_playlist * playlist, const int *tracks,
 {
     Callback *tramp = (Callback *) userdata;
     PyGILState_STATE gstate;
-    PyObject *py_tracks = PyList_New(num_tracks);
+    PyObject *py_tracks;
     int i;
-    PyObject *res;
 
+    gstate = PyGILState_Ensure();
+    py_tracks = PyList_New(num_tracks);
     for (i = 0; i < num_tracks; i++) {
-        PyList_SetItem(py_tracks, i, Py_BuildValue("i", tracks[i]));
+        PyList_SetItem(py_tracks, i, PyInt_FromLong(tracks[i]));
     }
-    gstate = PyGILState_Ensure();
-    PyObject *p = Playlist_FromSpotify(playlist);
-
-    res = PyObject_CallFunctionObjArgs(tramp->callback,
-                                       p, py_tracks, tramp->userdata, NULL);
-    if (!res)
-        PyErr_WriteUnraisable(tramp->callback);
-    Py_XDECREF(res);
-    Py_DECREF(py_tracks);
-    Py_DECREF(p);
+    playlist_call(tramp, "tracks_removed",
+                  Py_BuildValue("(NNO)", Playlist_FromSpotify(playlist),
+                                py_tracks, tramp->userdata));
     PyGILState_Release(gstate);
 }
 
@@ -312,26 +432,17 @@ playlist_tracks_moved_callback(sp_playlist * playlist, const int *tracks,
 {
     Callback *tramp = (Callback *) userdata;
     PyGILState_STATE gstate;
-    PyObject *py_tracks = PyList_New(num_tracks);
+    PyObject *py_tracks;
     int i;
-    PyObject *res;
 
+    gstate = PyGILState_Ensure();
+    py_tracks = PyList_New(num_tracks);
     for (i = 0; i < num_tracks; i++) {
-        PyList_SetItem(py_tracks, i, Py_BuildValue("i", tracks[i]));
+        PyList_SetItem(py_tracks, i, PyInt_FromLong(tracks[i]));
     }
-    gstate = PyGILState_Ensure();
-    PyObject *p = Playlist_FromSpotify(playlist);
-
-    res = PyObject_CallFunctionObjArgs(tramp->callback,
-                                       p,
-                                       py_tracks,
-                                       Py_BuildValue("i", new_position),
-                                       tramp->userdata, NULL);
-    if (!res)
-        PyErr_WriteUnraisable(tramp->callback);
-    Py_XDECREF(res);
-    Py_DECREF(py_tracks);
-    Py_DECREF(p);
+    playlist_call(tramp, "tracks_moved",
+                  Py_BuildValue("(NNiO)", Playlist_FromSpotify(playlist),
+                                py_tracks, new_position, tramp->userdata));
     PyGILState_Release(gstate);
 }
 
@@ -349,20 +460,13 @@ Playlist_add_tracks_moved_callback(Playlist * self, PyObject *args)
 void
 playlist_renamed_callback(sp_playlist * playlist, void *userdata)
 {
+    Callback *tramp = (Callback *) userdata;
     PyGILState_STATE gstate;
-    Callback *tramp;
-    PyObject *res;
 
     gstate = PyGILState_Ensure();
-    tramp = (Callback *) userdata;
-    PyObject *p = Playlist_FromSpotify(playlist);
-
-    res = PyObject_CallFunctionObjArgs(tramp->callback,
-                                       p, tramp->userdata, NULL);
-    if (!res)
-        PyErr_WriteUnraisable(tramp->callback);
-    Py_XDECREF(res);
-    Py_DECREF(p);
+    playlist_call(tramp, "playlist_renamed",
+                  Py_BuildValue("(NO)", Playlist_FromSpotify(playlist),
+                                tramp->userdata));
     PyGILState_Release(gstate);
 }
 
@@ -380,20 +484,13 @@ Playlist_add_playlist_renamed_callback(Playlist * self, PyObject *args)
 void
 playlist_state_changed_callback(sp_playlist * playlist, void *userdata)
 {
+    Callback *tramp = (Callback *) userdata;
     PyGILState_STATE gstate;
-    Callback *tramp;
-    PyObject *res;
 
     gstate = PyGILState_Ensure();
-    tramp = (Callback *) userdata;
-    PyObject *p = Playlist_FromSpotify(playlist);
-
-    res = PyObject_CallFunctionObjArgs(tramp->callback,
-                                       p, tramp->userdata, NULL);
-    if (!res)
-        PyErr_WriteUnraisable(tramp->callback);
-    Py_XDECREF(res);
-    Py_DECREF(p);
+    playlist_call(tramp, "playlist_state_changed",
+                  Py_BuildValue("(NO)", Playlist_FromSpotify(playlist),
+                                tramp->userdata));
     PyGILState_Release(gstate);
 }
 
@@ -412,22 +509,13 @@ void
 playlist_update_in_progress_callback(sp_playlist * playlist,
                                      bool done, void *userdata)
 {
+    Callback *tramp = (Callback *) userdata;
     PyGILState_STATE gstate;
-    Callback *tramp;
-    PyObject *res, *pdone;
 
     gstate = PyGILState_Ensure();
-    tramp = (Callback *) userdata;
-    pdone = PyBool_FromLong(done);
-    PyObject *p = Playlist_FromSpotify(playlist);
-
-    res = PyObject_CallFunctionObjArgs(tramp->callback,
-                                       p, pdone, tramp->userdata, NULL);
-    if (!res)
-        PyErr_WriteUnraisable(tramp->callback);
-    Py_XDECREF(res);
-    Py_DECREF(p);
-    Py_DECREF(pdone);
+    playlist_call(tramp, "playlist_update_in_progress",
+                  Py_BuildValue("(NNO)", Playlist_FromSpotify(playlist),
+                                PyBool_FromLong(done), tramp->userdata));
     PyGILState_Release(gstate);
 }
 
@@ -447,20 +535,13 @@ Playlist_add_playlist_update_in_progress_callback(Playlist * self,
 void
 playlist_metadata_updated_callback(sp_playlist * playlist, void *userdata)
 {
+    Callback *tramp = (Callback *) userdata;
     PyGILState_STATE gstate;
-    Callback *tramp;
-    PyObject *res;
 
     gstate = PyGILState_Ensure();
-    tramp = (Callback *) userdata;
-    PyObject *p = Playlist_FromSpotify(playlist);
-
-    res = PyObject_CallFunctionObjArgs(tramp->callback,
-                                       p, tramp->userdata, NULL);
-    if (!res)
-        PyErr_WriteUnraisable(tramp->callback);
-    Py_XDECREF(res);
-    Py_DECREF(p);
+    playlist_call(tramp, "playlist_metadata_updated",
+                  Py_BuildValue("(NO)", Playlist_FromSpotify(playlist),
+                                tramp->userdata));
     PyGILState_Release(gstate);
 }
 
@@ -482,28 +563,14 @@ playlist_track_created_changed_callback(sp_playlist * playlist,
                                         int position, sp_user * user,
                                         int when, void *userdata)
 {
+    Callback *tramp = (Callback *) userdata;
     PyGILState_STATE gstate;
-    Callback *tramp;
-    PyObject *res, *ppos, *puser, *pwhen;
 
     gstate = PyGILState_Ensure();
-    tramp = (Callback *) userdata;
-    PyObject *p = Playlist_FromSpotify(playlist);
-
-    ppos = PyInt_FromLong(position);
-    puser = User_FromSpotify(user);
-    pwhen = PyInt_FromLong(when);
-    res = PyObject_CallFunctionObjArgs(tramp->callback,
-                                       p,
-                                       ppos,
-                                       puser, pwhen, tramp->userdata, NULL);
-    if (!res)
-        PyErr_WriteUnraisable(tramp->callback);
-    Py_XDECREF(res);
-    Py_DECREF(p);
-    Py_DECREF(ppos);
-    Py_DECREF(puser);
-    Py_DECREF(pwhen);
+    playlist_call(tramp, "track_created_changed",
+                  Py_BuildValue("(NiNiO)", Playlist_FromSpotify(playlist),
+                                position, User_FromSpotify(user), when,
+                                tramp->userdata));
     PyGILState_Release(gstate);
 }
 
@@ -524,24 +591,14 @@ playlist_track_message_changed_callback(sp_playlist * playlist,
                                         int position, const char *message,
                                         void *userdata)
 {
+    Callback *tramp = (Callback *) userdata;
     PyGILState_STATE gstate;
-    Callback *tramp;
-    PyObject *res, *ppos, *pmess;
 
     gstate = PyGILState_Ensure();
-    tramp = (Callback *) userdata;
-    PyObject *p = Playlist_FromSpotify(playlist);
-
-    ppos = PyInt_FromLong(position);
-    pmess = PyUnicode_FromString(message);
-    res = PyObject_CallFunctionObjArgs(tramp->callback,
-                                       p, ppos, pmess, tramp->userdata, NULL);
-    if (!res)
-        PyErr_WriteUnraisable(tramp->callback);
-    Py_XDECREF(res);
-    Py_DECREF(p);
-    Py_DECREF(ppos);
-    Py_DECREF(pmess);
+    playlist_call(tramp, "track_message_changed",
+                  Py_BuildValue("(NiNO)", Playlist_FromSpotify(playlist),
+                                position, PyUnicode_FromString(message),
+                                tramp->userdata));
     PyGILState_Release(gstate);
 }
 
@@ -561,24 +618,14 @@ void
 playlist_track_seen_changed_callback(sp_playlist * playlist,
                                      int position, bool seen, void *userdata)
 {
+    Callback *tramp = (Callback *) userdata;
     PyGILState_STATE gstate;
-    Callback *tramp;
-    PyObject *res, *ppos, *pseen;
 
     gstate = PyGILState_Ensure();
-    tramp = (Callback *) userdata;
-    PyObject *p = Playlist_FromSpotify(playlist);
-
-    ppos = PyInt_FromLong(position);
-    pseen = PyBool_FromLong(seen);
-    res = PyObject_CallFunctionObjArgs(tramp->callback,
-                                       p, ppos, pseen, tramp->userdata, NULL);
-    if (!res)
-        PyErr_WriteUnraisable(tramp->callback);
-    Py_XDECREF(res);
-    Py_DECREF(p);
-    Py_DECREF(ppos);
-    Py_DECREF(pseen);
+    playlist_call(tramp, "track_seen_changed",
+                  Py_BuildValue("(NiNO)", Playlist_FromSpotify(playlist),
+                                position, PyBool_FromLong(seen),
+                                tramp->userdata));
     PyGILState_Release(gstate);
 }
 
@@ -597,22 +644,14 @@ void
 playlist_description_changed_callback(sp_playlist * playlist,
                                       const char *description, void *userdata)
 {
+    Callback *tramp = (Callback *) userdata;
     PyGILState_STATE gstate;
-    Callback *tramp;
-    PyObject *res, *pdesc;
 
     gstate = PyGILState_Ensure();
-    tramp = (Callback *) userdata;
-    PyObject *p = Playlist_FromSpotify(playlist);
-
-    pdesc = PyUnicode_FromString(description);
-    res = PyObject_CallFunctionObjArgs(tramp->callback,
-                                       p, pdesc, tramp->userdata, NULL);
-    if (!res)
-        PyErr_WriteUnraisable(tramp->callback);
-    Py_XDECREF(res);
-    Py_DECREF(p);
-    Py_DECREF(pdesc);
+    playlist_call(tramp, "description_changed",
+                  Py_BuildValue("(NNO)", Playlist_FromSpotify(playlist),
+                                PyUnicode_FromString(description),
+                                tramp->userdata));
     PyGILState_Release(gstate);
 }
 
@@ -631,20 +670,13 @@ Playlist_add_description_changed_callback(Playlist * self, PyObject *args)
 void
 playlist_subscribers_changed_callback(sp_playlist * playlist, void *userdata)
 {
+    Callback *tramp = (Callback *) userdata;
     PyGILState_STATE gstate;
-    Callback *tramp;
-    PyObject *res;
 
     gstate = PyGILState_Ensure();
-    tramp = (Callback *) userdata;
-    PyObject *p = Playlist_FromSpotify(playlist);
-
-    res = PyObject_CallFunctionObjArgs(tramp->callback,
-                                       p, tramp->userdata, NULL);
-    if (!res)
-        PyErr_WriteUnraisable(tramp->callback);
-    Py_XDECREF(res);
-    Py_DECREF(p);
+    playlist_call(tramp, "subscribers_changed",
+                  Py_BuildValue("(NO)", Playlist_FromSpotify(playlist),
+                                tramp->userdata));
     PyGILState_Release(gstate);
 }
 
@@ -664,14 +696,11 @@ void
 playlist_image_changed_callback(sp_playlist * playlist, const byte * image,
                                 void *userdata)
 {
+    Callback *tramp = (Callback *) userdata;
     PyGILState_STATE gstate;
-    Callback *tramp;
-    PyObject *res, *pimage;
+    PyObject *pimage;
 
     gstate = PyGILState_Ensure();
-    tramp = (Callback *) userdata;
-    PyObject *p = Playlist_FromSpotify(playlist);
-
     if (image) {
         pimage = PyBytes_FromStringAndSize((const char *)image, 20);        //TODO: return Image
     }
@@ -679,13 +708,9 @@ playlist_image_changed_callback(sp_playlist * playlist, const byte * image,
         Py_INCREF(Py_None);
         pimage = Py_None;
     }
-    res = PyObject_CallFunctionObjArgs(tramp->callback,
-                                       p, pimage, tramp->userdata, NULL);
-    if (!res)
-        PyErr_WriteUnraisable(tramp->callback);
-    Py_XDECREF(res);
-    Py_DECREF(p);
-    Py_DECREF(pimage);
+    playlist_call(tramp, "image_changed",
+                  Py_BuildValue("(NNO)", Playlist_FromSpotify(playlist),
+                                pimage, tramp->userdata));
     PyGILState_Release(gstate);
 }
 
@@ -700,6 +725,74 @@ Playlist_add_image_changed_callback(Playlist * self, PyObject *args)
     return Playlist_add_callback(self, args, spl_callbacks);
 }
 
+/* Dispatches all the playlist events to the methods of a manager */
+static sp_playlist_callbacks playlist_manager_callbacks = {
+    &playlist_tracks_added_callback,
+    &playlist_tracks_removed_callback,
+    &playlist_tracks_moved_callback,
+    &playlist_renamed_callback,
+    &playlist_state_changed_callback,
+    &playlist_update_in_progress_callback,
+    &playlist_metadata_updated_callback,
+    &playlist_track_created_changed_callback,
+    &playlist_track_seen_changed_callback,
+    &playlist_description_changed_callback,
+    &playlist_image_changed_callback,
+    &playlist_track_message_changed_callback,
+    &playlist_subscribers_changed_callback
+};
+
+static PyObject *
+Playlist_add_manager(Playlist * self, PyObject *args)
+{
+    PyObject *manager, *userdata = NULL;
+    Callback *tramp;
+    playlist_callback *to_add;
+
+    if (!PyArg_ParseTuple(args, "O|O", &manager, &userdata))
+        return NULL;
+    if (!userdata)
+        userdata = Py_None;
+    tramp = create_trampoline(NULL, manager, userdata);
+    to_add = malloc(sizeof(playlist_callback));
+    if (!to_add) {
+        delete_trampoline(tramp);
+        return PyErr_NoMemory();
+    }
+    to_add->callback = &playlist_manager_callbacks;
+    to_add->trampoline = tramp;
+    if (pl_callbacks_table_add(self, to_add) < 0) {
+        free(to_add);
+        delete_trampoline(tramp);
+        return NULL;
+    }
+    sp_playlist_add_callbacks(self->_playlist, &playlist_manager_callbacks,
+                              tramp);
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+Playlist_remove_manager(Playlist * self, PyObject *args)
+{
+    PyObject *manager, *userdata = NULL;
+    playlist_callback *pl_callback;
+
+    if (!PyArg_ParseTuple(args, "O|O", &manager, &userdata))
+        return NULL;
+    if (!userdata)
+        userdata = Py_None;
+    pl_callback = pl_callbacks_table_remove(self, NULL, manager, userdata);
+    if (!pl_callback) {
+        PyErr_SetString(SpotifyError, "This manager was not added");
+        return NULL;
+    }
+    sp_playlist_remove_callbacks(self->_playlist, pl_callback->callback,
+                                 pl_callback->trampoline);
+    delete_trampoline(pl_callback->trampoline);
+    free(pl_callback);
+    Py_RETURN_NONE;
+}
+
 static PyObject *
 Playlist_remove_callback(Playlist * self, PyObject *args)
 {
@@ -717,7 +810,7 @@ Playlist_remove_callback(Playlist * self, PyObject *args)
     fprintf(stderr, "[DEBUG]-playlist- looking for callback py(%p,%p)\n",
             callback, userdata);
 #endif
-    pl_callback = pl_callbacks_table_remove(self, callback, userdata);
+    pl_callback = pl_callbacks_table_remove(self, callback, NULL, userdata);
     if (!pl_callback) {
         PyErr_SetString(SpotifyError, "This callback was not added");
         return NULL;
@@ -824,47 +917,180 @@ Playlist_update_subscribers(Playlist *self)
 }
 
 static PyObject *
-Playlist_add_tracks(Playlist *self, PyObject *args)
+Playlist_reorder_tracks(Playlist * self, PyObject *args)
 {
-    int position, num_tracks;
-    PyObject *tracks;
-    int i;
+    PyObject *py_tracks, *seq, *item;
+    PyObject *result = NULL;
     sp_error err;
+    int *tracks;
+    Py_ssize_t index;
+    int num_tracks, new_position, playlist_length;
+    int i;
+
+    if (!PyArg_ParseTuple(args, "Oi", &py_tracks, &new_position))
+        return NULL;
+    seq = PySequence_Fast(py_tracks, "expected an iterable of integers");
+    if (!seq)
+        return NULL;
+    num_tracks = PySequence_Fast_GET_SIZE(seq);
+    tracks = PyMem_New(int, num_tracks ? num_tracks : 1);
+    if (!tracks) {
+        Py_DECREF(seq);
+        return PyErr_NoMemory();
+    }
+    playlist_length = sp_playlist_num_tracks(self->_playlist);
+    if (new_position < 0 || new_position > playlist_length) {
+        PyErr_SetString(PyExc_IndexError, "invalid new position");
+        goto cleanup;
+    }
+    for (i = 0; i < num_tracks; i++) {
+        item = PySequence_Fast_GET_ITEM(seq, i);
+        if (!PyIndex_Check(item)) {
+            PyErr_SetString(PyExc_TypeError,
+                            "expected an iterable of integers");
+            goto cleanup;
+        }
+        index = PyNumber_AsSsize_t(item, PyExc_IndexError);
+        if (index == -1 && PyErr_Occurred())
+            goto cleanup;
+        if (index < 0 || index >= playlist_length) {
+            PyErr_SetString(PyExc_IndexError,
+                            "specified track does not exist");
+            goto cleanup;
+        }
+        tracks[i] = (int)index;
+    }
+
+    Py_BEGIN_ALLOW_THREADS;
+    err = sp_playlist_reorder_tracks(self->_playlist, tracks, num_tracks,
+                                     new_position);
+    Py_END_ALLOW_THREADS;
+    result = handle_error(err);
+
+cleanup:
+    PyMem_Free(tracks);
+    Py_DECREF(seq);
+    return result;
+}
+
+/* Returns the track of a spotify.Track object or of a track URI, with a
+ * reference to be released by the caller, or NULL with an exception set. */
+static sp_track *
+playlist_track_arg(PyObject *item)
+{
+    PyObject *encoded;
+    sp_link *link;
+    sp_track *track = NULL;
+
+    if (PyObject_TypeCheck(item, &TrackType)) {
+        track = ((Track *)item)->_track;
+        sp_track_add_ref(track);
+        return track;
+    }
+    if (PyUnicode_Check(item)) {
+        encoded = PyUnicode_AsUTF8String(item);
+        if (!encoded)
+            return NULL;
+    }
+    else if (PyBytes_Check(item)) {
+        Py_INCREF(item);
+        encoded = item;
+    }
+    else {
+        PyErr_SetString(PyExc_TypeError,
+                "Expected spotify.Track objects or track URIs");
+        return NULL;
+    }
+    link = sp_link_create_from_string(PyBytes_AS_STRING(encoded));
+    if (link && sp_link_type(link) == SP_LINKTYPE_TRACK) {
+        track = sp_link_as_track(link);
+        sp_track_add_ref(track);
+    }
+    else {
+        PyErr_Format(PyExc_ValueError, "Not a track URI: %s",
+                     PyBytes_AS_STRING(encoded));
+    }
+    if (link)
+        sp_link_release(link);
+    Py_DECREF(encoded);
+    return track;
+}
+
+static PyObject *
+Playlist_add_tracks(Playlist *self, PyObject *args, PyObject *kwds)
+{
+    int position, num_tracks, chunk_size = 0;
+    int i, n, done;
+    PyObject *tracks, *seq;
+    PyObject *progress = NULL;
+    PyObject *result = NULL;
+    sp_track **ts;
+    sp_error err = SP_ERROR_OK;
+    static char *kwlist[] =
+        { "position", "tracks", "chunk_size", "progress", NULL };
 
     if (!sp_playlist_is_loaded(self->_playlist)) {
         PyErr_SetString(SpotifyError, "Playlist not loaded");
         return NULL;
     }
-    if (!PyArg_ParseTuple(args, "iO!", &position, &PyList_Type, &tracks))
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "iO|iO", kwlist, &position,
+                                     &tracks, &chunk_size, &progress))
+        return NULL;
+    seq = PySequence_Fast(tracks,
+            "Expected an iterable of spotify.Track objects or track URIs");
+    if (!seq)
         return NULL;
-    num_tracks = PyList_GET_SIZE(tracks);
-    if (num_tracks <= 0)
+    num_tracks = PySequence_Fast_GET_SIZE(seq);
+    if (num_tracks <= 0) {
+        Py_DECREF(seq);
         Py_RETURN_NONE;
+    }
 
-    sp_track *ts[num_tracks];
+    /* On the heap: batches may be too large for the stack */
+    ts = PyMem_New(sp_track *, num_tracks);
+    if (!ts) {
+        Py_DECREF(seq);
+        return PyErr_NoMemory();
+    }
     for (i = 0; i < num_tracks; i++) {
-        PyObject *t = PyList_GetItem(tracks, i);
-        if (t->ob_type != &TrackType) {
-            PyErr_SetString(PyExc_TypeError,
-                    "Expected a list of spotify.Track objects");
-            return NULL;
-        }
-        ts[i] = ((Track *)t)->_track;
+        ts[i] = playlist_track_arg(PySequence_Fast_GET_ITEM(seq, i));
+        if (!ts[i])
+            goto cleanup;
+    }
+    if (chunk_size <= 0)
+        chunk_size = num_tracks;
+    for (done = 0; done < num_tracks; done += n) {
+        n = num_tracks - done < chunk_size ? num_tracks - done : chunk_size;
+        Py_BEGIN_ALLOW_THREADS;
+        err = sp_playlist_add_tracks(self->_playlist,
+                                     (sp_track *const *)ts + done, n,
+                                     position + done, g_session);
+        Py_END_ALLOW_THREADS;
+        if (err != SP_ERROR_OK)
+            break;
+        if (playlist_report_progress(progress, done + n, num_tracks) < 0)
+            goto cleanup;
     }
-    err = sp_playlist_add_tracks(self->_playlist, (sp_track *const *)ts,
-                                 num_tracks, position, g_session);
     switch(err) {
         case SP_ERROR_OK:
+            Py_INCREF(Py_None);
+            result = Py_None;
             break;
         case SP_ERROR_INVALID_INDATA:
             PyErr_SetString(PyExc_IndexError,
                             "Cannot add tracks at this position");
-            return NULL;
+            break;
         default:
             PyErr_SetString(SpotifyError, sp_error_message(err));
-            return NULL;
+            break;
     }
-    Py_RETURN_NONE;
+
+cleanup:
+    while (i-- > 0)
+        sp_track_release(ts[i]);
+    PyMem_Free(ts);
+    Py_DECREF(seq);
+    return result;
 }
 
 static PyObject *
@@ -873,6 +1099,227 @@ Playlist_type(Playlist *self)
     return PyBytes_FromString("playlist");
 }
 
+/* Fields returned by Playlist.tracks_metadata(). Integer fields come as
+ * array('i') columns, the others as lists. */
+enum {
+    TM_NAME,
+    TM_URI,
+    TM_ARTISTS,
+    TM_ALBUM,
+    TM_DURATION,
+    TM_POPULARITY,
+    TM_DISC,
+    TM_INDEX,
+    TM_IS_LOADED,
+    TM_CREATE_TIME,
+    TM_COUNT
+};
+
+#define TM_FIRST_INT TM_DURATION
+
+static const char *tracks_metadata_fields[TM_COUNT] = {
+    "name",
+    "uri",
+    "artists",
+    "album",
+    "duration",
+    "popularity",
+    "disc",
+    "index",
+    "is_loaded",
+    "create_time"
+};
+
+/* Returns a new array('i') of the given length, and its data in *data */
+static PyObject *
+int_array_new(Py_ssize_t length, int **data)
+{
+    PyObject *module, *zero, *array;
+    Py_ssize_t size;
+
+    module = PyImport_ImportModule("array");
+    if (!module)
+        return NULL;
+    zero = PyObject_CallMethod(module, "array", "s[i]", "i", 0);
+    Py_DECREF(module);
+    if (!zero)
+        return NULL;
+    array = PySequence_Repeat(zero, length);
+    Py_DECREF(zero);
+    if (!array)
+        return NULL;
+    if (PyObject_AsWriteBuffer(array, (void **)data, &size) < 0) {
+        Py_DECREF(array);
+        return NULL;
+    }
+    return array;
+}
+
+static PyObject *
+track_uri(sp_track *track)
+{
+    char uri[1024];
+    int len;
+    sp_link *link = sp_link_create_from_track(track, 0);
+
+    if (!link)
+        Py_RETURN_NONE;
+    len = sp_link_as_string(link, uri, sizeof(uri));
+    sp_link_release(link);
+    if (len < 0)
+        Py_RETURN_NONE;
+    return PyBytes_FromStringAndSize(uri, len);
+}
+
+static PyObject *
+track_artists(sp_track *track)
+{
+    int i, count = sp_track_num_artists(track);
+    PyObject *names = PyTuple_New(count);
+
+    if (!names)
+        return NULL;
+    for (i = 0; i < count; i++) {
+        PyObject *name = PyUnicode_FromString(
+                            sp_artist_name(sp_track_artist(track, i)));
+        if (!name) {
+            Py_DECREF(names);
+            return NULL;
+        }
+        PyTuple_SET_ITEM(names, i, name);
+    }
+    return names;
+}
+
+static PyObject *
+track_album(sp_track *track)
+{
+    sp_album *album = sp_track_album(track);
+
+    if (!album)
+        Py_RETURN_NONE;
+    return PyUnicode_FromString(sp_album_name(album));
+}
+
+static PyObject *
+Playlist_tracks_metadata(Playlist *self, PyObject *args, PyObject *kwds)
+{
+    PyObject *fields = NULL, *result = NULL;
+    PyObject *columns[TM_COUNT];
+    int *values[TM_COUNT];
+    int wanted[TM_COUNT];
+    int i, f, num_tracks;
+
+    static char *kwlist[] = { "fields", NULL };
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "|O", kwlist, &fields))
+        return NULL;
+
+    for (f = 0; f < TM_COUNT; f++) {
+        columns[f] = NULL;
+        wanted[f] = (fields == NULL || fields == Py_None);
+    }
+    if (fields && fields != Py_None) {
+        PyObject *iter = PyObject_GetIter(fields);
+        PyObject *item;
+
+        if (!iter)
+            return NULL;
+        while ((item = PyIter_Next(iter))) {
+            char *name;
+
+            if (!PyArg_Parse(item, "s", &name)) {
+                Py_DECREF(item);
+                break;
+            }
+            for (f = 0; f < TM_COUNT; f++) {
+                if (strcmp(name, tracks_metadata_fields[f]) == 0)
+                    break;
+            }
+            if (f == TM_COUNT) {
+                PyErr_Format(PyExc_ValueError, "unknown track field: %s",
+                             name);
+                Py_DECREF(item);
+                break;
+            }
+            wanted[f] = 1;
+            Py_DECREF(item);
+        }
+        Py_DECREF(iter);
+        if (PyErr_Occurred())
+            return NULL;
+    }
+
+    num_tracks = sp_playlist_num_tracks(self->_playlist);
+    for (f = 0; f < TM_COUNT; f++) {
+        if (!wanted[f])
+            continue;
+        if (f >= TM_FIRST_INT)
+            columns[f] = int_array_new(num_tracks, &values[f]);
+        else
+            columns[f] = PyList_New(num_tracks);
+        if (!columns[f])
+            goto error;
+    }
+
+    for (i = 0; i < num_tracks; i++) {
+        sp_track *track = sp_playlist_track(self->_playlist, i);
+
+        for (f = 0; f < TM_FIRST_INT; f++) {
+            PyObject *value;
+
+            if (!wanted[f])
+                continue;
+            switch (f) {
+            case TM_NAME:
+                value = PyUnicode_FromString(sp_track_name(track));
+                break;
+            case TM_URI:
+                value = track_uri(track);
+                break;
+            case TM_ARTISTS:
+                value = track_artists(track);
+                break;
+            default:
+                value = track_album(track);
+                break;
+            }
+            if (!value)
+                goto error;
+            PyList_SET_ITEM(columns[f], i, value);
+        }
+        if (wanted[TM_DURATION])
+            values[TM_DURATION][i] = sp_track_duration(track);
+        if (wanted[TM_POPULARITY])
+            values[TM_POPULARITY][i] = sp_track_popularity(track);
+        if (wanted[TM_DISC])
+            values[TM_DISC][i] = sp_track_disc(track);
+        if (wanted[TM_INDEX])
+            values[TM_INDEX][i] = sp_track_index(track);
+        if (wanted[TM_IS_LOADED])
+            values[TM_IS_LOADED][i] = sp_track_is_loaded(track);
+        if (wanted[TM_CREATE_TIME])
+            values[TM_CREATE_TIME][i] =
+                sp_playlist_track_create_time(self->_playlist, i);
+    }
+
+    result = PyDict_New();
+    if (!result)
+        goto error;
+    for (f = 0; f < TM_COUNT; f++) {
+        if (columns[f] && PyDict_SetItemString(result,
+                                  tracks_metadata_fields[f], columns[f]) < 0) {
+            Py_CLEAR(result);
+            break;
+        }
+    }
+
+error:
+    for (f = 0; f < TM_COUNT; f++)
+        Py_XDECREF(columns[f]);
+    return result;
+}
+
 /////////////// SEQUENCE PROTOCOL
 
 Py_ssize_t
@@ -888,7 +1335,7 @@ Playlist_sq_item(PyObject *o, Py_ssize_t index)
 {
     Playlist *self = (Playlist *) o;
 
-    if (index >= sp_playlist_num_tracks(self->_playlist)) {
+    if (index < 0 || index >= sp_playlist_num_tracks(self->_playlist)) {
         PyErr_SetString(PyExc_IndexError, "");
         return NULL;
     }
@@ -898,6 +1345,16 @@ Playlist_sq_item(PyObject *o, Py_ssize_t index)
     return track;
 }
 
+static PyObject *
+Playlist_mp_subscript(PyObject *o, PyObject *key)
+{
+    Playlist *self = (Playlist *) o;
+
+    return sequence_subscript(o, key,
+                              sp_playlist_num_tracks(self->_playlist),
+                              Playlist_sq_item);
+}
+
 /////////////// ADDITIONAL METHODS
 
 static PyObject *
@@ -918,12 +1375,16 @@ static PyMethodDef Playlist_methods[] = {
      "Return collaborative status for a playlist. A playlist in collaborative state can be modifed by all users, not only the user owning the list"},
     {"add_tracks",
      (PyCFunction)Playlist_add_tracks,
-     METH_VARARGS,
-     ""},
+     METH_VARARGS | METH_KEYWORDS,
+     "Add tracks to a playlist"},
     {"remove_tracks",
      (PyCFunction)Playlist_remove_tracks,
-     METH_VARARGS,
+     METH_VARARGS | METH_KEYWORDS,
      "Remove tracks from a playlist"},
+    {"reorder_tracks",
+     (PyCFunction)Playlist_reorder_tracks,
+     METH_VARARGS,
+     "Move tracks to a new position in a playlist"},
     {"add_tracks_added_callback",
      (PyCFunction)Playlist_add_tracks_added_callback,
      METH_VARARGS,
@@ -980,6 +1441,14 @@ static PyMethodDef Playlist_methods[] = {
      (PyCFunction)Playlist_remove_callback,
      METH_VARARGS,
      ""},
+    {"add_manager",
+     (PyCFunction)Playlist_add_manager,
+     METH_VARARGS,
+     "Dispatch all the events of the playlist to the methods of a manager"},
+    {"remove_manager",
+     (PyCFunction)Playlist_remove_manager,
+     METH_VARARGS,
+     "Stop dispatching the events of the playlist to a manager"},
  	{"track_create_time",
      (PyCFunction)Playlist_track_create_time,
      METH_VARARGS,
@@ -1012,6 +1481,10 @@ static PyMethodDef Playlist_methods[] = {
      (PyCFunction)Playlist_type,
      METH_NOARGS,
      ""},
+    {"tracks_metadata",
+     (PyCFunction)Playlist_tracks_metadata,
+     METH_VARARGS | METH_KEYWORDS,
+     "Returns the metadata of all the tracks, in one column per field"},
     {NULL}
 };
 
@@ -1026,6 +1499,12 @@ static PySequenceMethods Playlist_as_sequence = {
     0,                  // sq_inplace_repeat
 };
 
+static PyMappingMethods Playlist_as_mapping = {
+    Playlist_sq_length, // mp_length
+    Playlist_mp_subscript,      // mp_subscript
+    0,                  // mp_ass_subscript
+};
+
 PyTypeObject PlaylistType = {
     PyObject_HEAD_INIT(NULL) 0, /*ob_size */
     "spotify.Playlist", /*tp_name */
@@ -1039,8 +1518,8 @@ PyTypeObject PlaylistType = {
     0,                  /*tp_repr */
     0,                  /*tp_as_number */
     &Playlist_as_sequence,      /*tp_as_sequence */
-    0,                  /*tp_as_mapping */
-    0,                  /*tp_hash */
+    &Playlist_as_mapping,       /*tp_as_mapping */
+    (hashfunc) Playlist_hash,   /*tp_hash */
     0,                  /*tp_call */
     Playlist_str,       /*tp_str */
     0,                  /*tp_getattro */
@@ -1050,8 +1529,8 @@ PyTypeObject PlaylistType = {
     "Playlist objects", /* tp_doc */
     0,                  /* tp_traverse */
     0,                  /* tp_clear */
-    0,                  /* tp_richcompare */
-    0,                  /* tp_weaklistoffset */
+    Playlist_richcompare,       /* tp_richcompare */
+    offsetof(Playlist, _weakreflist),   /* tp_weaklistoffset */
     0,                  /* tp_iter */
     0,                  /* tp_iternext */
     Playlist_methods,   /* tp_methods */
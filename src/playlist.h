@@ -3,6 +3,7 @@
 
 typedef struct {
     PyObject_HEAD sp_playlist *_playlist;
+    PyObject *_weakreflist;
 } Playlist;
 
 extern PyTypeObject PlaylistType;
@@ -20,7 +21,6 @@ typedef struct _playlist_callback {
 typedef struct _pl_cb_entry {
     sp_playlist *playlist;
     playlist_callback *callbacks;
-    struct _pl_cb_entry *next;
 } pl_cb_entry;
 
 PyObject *Playlist_FromSpotify(sp_playlist * spl);
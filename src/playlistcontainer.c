@@ -8,14 +8,15 @@
 
 /* This is the playlist container callbacks table.
  *
- * It is a linked list of entries keeping enough information into pyspotify
- * to be able to remove the callbacks after a while, especially when dealing
- * with a different python PlaylistContainer object than the one the callbacks
- * were added from. Each entry corresponds to a spotify playlist container on
- * which callbacks have been added. When all callbacks are removed from a
- * playlist container, the entry is free'd from memory.
+ * It is a hash table of entries, keyed by the spotify playlist container,
+ * keeping enough information into pyspotify to be able to remove the
+ * callbacks after a while, especially when dealing with a different python
+ * PlaylistContainer object than the one the callbacks were added from. Each
+ * entry corresponds to a spotify playlist container on which callbacks have
+ * been added. When all callbacks are removed from a playlist container, the
+ * entry is free'd from memory.
  */
-static plc_cb_entry *playlistcontainer_callbacks_table = NULL;
+static ptr_table playlistcontainer_callbacks_table;
 
 static PyMemberDef PlaylistContainer_members[] = {
     {NULL}
@@ -49,21 +50,16 @@ PlaylistContainer_dealloc(PlaylistContainer * self)
     self->ob_type->tp_free(self);
 }
 
-static void
+/* Returns -1 with an exception set if memory is exhausted */
+static int
 plc_callbacks_table_add(PlaylistContainer * plc,
                         playlistcontainer_callback * cb)
 {
-    plc_cb_entry *curr, *entry = NULL;
+    plc_cb_entry *entry;
 
     /* Look for an existing entry for this playlist */
-    curr = playlistcontainer_callbacks_table;
-    while (curr) {
-        if (curr->playlistcontainer == plc->_playlistcontainer) {
-            entry = curr;
-            break;
-        }
-        curr = curr->next;
-    }
+    entry = ptr_table_get(&playlistcontainer_callbacks_table,
+                          plc->_playlistcontainer);
     /* Update callbacks entry */
     if (entry) {
         cb->next = entry->callbacks;
@@ -72,12 +68,21 @@ plc_callbacks_table_add(PlaylistContainer * plc,
     else {
         cb->next = NULL;
         entry = malloc(sizeof(plc_cb_entry));
-        sp_playlistcontainer_add_ref(plc->_playlistcontainer);
+        if (!entry) {
+            PyErr_NoMemory();
+            return -1;
+        }
         entry->playlistcontainer = plc->_playlistcontainer;
         entry->callbacks = cb;
-        entry->next = playlistcontainer_callbacks_table;
-        playlistcontainer_callbacks_table = entry;
+        if (ptr_table_set(&playlistcontainer_callbacks_table,
+                          plc->_playlistcontainer, entry) < 0) {
+            free(entry);
+            PyErr_NoMemory();
+            return -1;
+        }
+        sp_playlistcontainer_add_ref(plc->_playlistcontainer);
     }
+    return 0;
 }
 
 static PyObject *
@@ -100,9 +105,17 @@ PlaylistContainer_add_callback(PlaylistContainer * self,
     }
     tramp = create_trampoline(callback, Py_None, userdata);
     to_add = malloc(sizeof(playlistcontainer_callback));
+    if (!to_add) {
+        delete_trampoline(tramp);
+        return PyErr_NoMemory();
+    }
     to_add->callback = plc_callbacks;
     to_add->trampoline = tramp;
-    plc_callbacks_table_add(self, to_add);
+    if (plc_callbacks_table_add(self, to_add) < 0) {
+        free(to_add);
+        delete_trampoline(tramp);
+        return NULL;
+    }
 #ifdef DEBUG
     fprintf(stderr, "[DEBUG]-plcontainer- adding callback (%p,%p) py(%p,%p)\n",
             plc_callbacks, tramp, tramp->callback, tramp->userdata);
@@ -317,7 +330,8 @@ PlaylistContainer_sq_item(PyObject *o, Py_ssize_t index)
     PyObject *p;
     sp_playlist_type type;
 
-    if (index >= sp_playlistcontainer_num_playlists(pc->_playlistcontainer)) {
+    if (index < 0 ||
+        index >= sp_playlistcontainer_num_playlists(pc->_playlistcontainer)) {
         PyErr_SetString(PyExc_IndexError, "");
         return NULL;
     }
@@ -333,6 +347,42 @@ PlaylistContainer_sq_item(PyObject *o, Py_ssize_t index)
     return p;
 }
 
+static PyObject *
+PlaylistContainer_mp_subscript(PyObject *o, PyObject *key)
+{
+    PlaylistContainer *pc = (PlaylistContainer *) o;
+
+    return sequence_subscript(o, key,
+            sp_playlistcontainer_num_playlists(pc->_playlistcontainer),
+            PlaylistContainer_sq_item);
+}
+
+static PyObject *
+PlaylistContainer_playlists(PlaylistContainer *pc)
+{
+    int count = sp_playlistcontainer_num_playlists(pc->_playlistcontainer);
+    PyObject *l, *p;
+    int i;
+
+    l = PyList_New(0);
+    if (!l)
+        return NULL;
+    for (i = 0; i < count; i++) {
+        if (sp_playlistcontainer_playlist_type(pc->_playlistcontainer, i) !=
+            SP_PLAYLIST_TYPE_PLAYLIST)
+            continue;
+        p = Playlist_FromSpotify(sp_playlistcontainer_playlist(
+                    pc->_playlistcontainer, i));
+        if (!p || PyList_Append(l, p) < 0) {
+            Py_XDECREF(p);
+            Py_DECREF(l);
+            return NULL;
+        }
+        Py_DECREF(p);
+    }
+    return l;
+}
+
 /// PlaylistContainer Set Item [] =
 PyObject *
 PlaylistContainer_sq_ass_item(PyObject *o, Py_ssize_t index, Py_ssize_t meh)
@@ -352,6 +402,12 @@ PySequenceMethods PlaylistContainer_as_sequence = {
     0,                  // sq_inplace_repeat
 };
 
+static PyMappingMethods PlaylistContainer_as_mapping = {
+    PlaylistContainer_sq_length,        // mp_length
+    PlaylistContainer_mp_subscript,     // mp_subscript
+    0,                  // mp_ass_subscript
+};
+
 static PyMethodDef PlaylistContainer_methods[] = {
     {"add_loaded_callback",
      (PyCFunction)PlaylistContainer_add_loaded_callback,
@@ -373,6 +429,10 @@ static PyMethodDef PlaylistContainer_methods[] = {
      (PyCFunction)PlaylistContainer_add_new_playlist,
      METH_VARARGS,
      "Add a new empty playlist to the playlist container."},
+    {"playlists",
+     (PyCFunction)PlaylistContainer_playlists,
+     METH_NOARGS,
+     "Return a list of the playlists, without the folders."},
     {NULL}
 };
 
@@ -389,7 +449,7 @@ PyTypeObject PlaylistContainerType = {
     0,                  /*tp_repr */
     0,                  /*tp_as_number */
     &PlaylistContainer_as_sequence,     /*tp_as_sequence */
-    0,                  /*tp_as_mapping */
+    &PlaylistContainer_as_mapping,      /*tp_as_mapping */
     0,                  /*tp_hash */
     0,                  /*tp_call */
     PlaylistContainer_str,      /*tp_str */
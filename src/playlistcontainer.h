@@ -22,5 +22,4 @@ typedef struct _playlistcontainer_callback {
 typedef struct _plc_cb_entry {
     sp_playlistcontainer *playlistcontainer;
     playlistcontainer_callback *callbacks;
-    struct _plc_cb_entry *next;
 } plc_cb_entry;
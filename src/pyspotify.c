@@ -1,4 +1,5 @@
 #include <Python.h>
+#include <stdint.h>
 #include <libspotify/api.h>
 #include "pyspotify.h"
 
@@ -8,7 +9,7 @@ create_trampoline(PyObject *callback, PyObject *manager, PyObject *userdata)
     Callback *tr = NULL;
 
     tr = malloc(sizeof(Callback));
-    Py_INCREF(callback);
+    Py_XINCREF(callback);
     Py_XINCREF(manager);
     Py_XINCREF(userdata);
     tr->callback = callback;
@@ -25,7 +26,7 @@ delete_trampoline(Callback * tr)
     gstate = PyGILState_Ensure();
     Py_XDECREF(tr->userdata);
     Py_XDECREF(tr->manager);
-    Py_DECREF(tr->callback);
+    Py_XDECREF(tr->callback);
     free(tr);
     PyGILState_Release(gstate);
 }
@@ -51,3 +52,207 @@ error_message(int err)
         Py_RETURN_NONE;
     }
 }
+
+PyObject *
+wrapper_cache_get(PyObject *cache, void *ptr)
+{
+    PyObject *key, *ref, *wrapper;
+
+    if (!cache || !ptr)
+        return NULL;
+    key = PyLong_FromVoidPtr(ptr);
+    if (!key) {
+        PyErr_Clear();
+        return NULL;
+    }
+    ref = PyDict_GetItem(cache, key);
+    Py_DECREF(key);
+    if (!ref)
+        return NULL;
+    wrapper = PyWeakref_GET_OBJECT(ref);
+    if (wrapper == Py_None || wrapper->ob_refcnt <= 0)
+        return NULL;
+    Py_INCREF(wrapper);
+    return wrapper;
+}
+
+void
+wrapper_cache_add(PyObject **cache, void *ptr, PyObject *wrapper)
+{
+    PyObject *key, *ref;
+
+    if (!*cache) {
+        *cache = PyDict_New();
+        if (!*cache) {
+            PyErr_Clear();
+            return;
+        }
+    }
+    key = PyLong_FromVoidPtr(ptr);
+    ref = PyWeakref_NewRef(wrapper, NULL);
+    if (!key || !ref || PyDict_SetItem(*cache, key, ref) < 0)
+        PyErr_Clear();
+    Py_XDECREF(key);
+    Py_XDECREF(ref);
+}
+
+void
+wrapper_cache_remove(PyObject *cache, void *ptr, PyObject *wrapper)
+{
+    PyObject *key, *ref;
+    PyObject *type, *value, *traceback;
+
+    if (!cache || !ptr)
+        return;
+    /* Called from deallocators, which must preserve the current exception */
+    PyErr_Fetch(&type, &value, &traceback);
+    key = PyLong_FromVoidPtr(ptr);
+    if (key) {
+        ref = PyDict_GetItem(cache, key);
+        if (ref && PyWeakref_GET_OBJECT(ref) == wrapper)
+            PyDict_DelItem(cache, key);
+        Py_DECREF(key);
+    }
+    PyErr_Clear();
+    PyErr_Restore(type, value, traceback);
+}
+
+#define PTR_TABLE_MIN_SIZE 16
+
+static size_t
+ptr_table_bucket(size_t size, void *key)
+{
+    /* Pointers are aligned: drop the low bits, and mix the others */
+    return (((uintptr_t)key >> 3) * 2654435761u) & (size - 1);
+}
+
+void *
+ptr_table_get(ptr_table *table, void *key)
+{
+    ptr_table_entry *entry;
+
+    if (!table->size)
+        return NULL;
+    entry = table->buckets[ptr_table_bucket(table->size, key)];
+    while (entry) {
+        if (entry->key == key)
+            return entry->value;
+        entry = entry->next;
+    }
+    return NULL;
+}
+
+static int
+ptr_table_resize(ptr_table *table, size_t size)
+{
+    ptr_table_entry **buckets, *entry, *next;
+    size_t i, b;
+
+    buckets = calloc(size, sizeof(ptr_table_entry *));
+    if (!buckets)
+        return -1;
+    for (i = 0; i < table->size; i++) {
+        for (entry = table->buckets[i]; entry; entry = next) {
+            next = entry->next;
+            b = ptr_table_bucket(size, entry->key);
+            entry->next = buckets[b];
+            buckets[b] = entry;
+        }
+    }
+    free(table->buckets);
+    table->buckets = buckets;
+    table->size = size;
+    return 0;
+}
+
+int
+ptr_table_set(ptr_table *table, void *key, void *value)
+{
+    ptr_table_entry *entry;
+    size_t b;
+
+    if (!table->size && ptr_table_resize(table, PTR_TABLE_MIN_SIZE) < 0)
+        return -1;
+    b = ptr_table_bucket(table->size, key);
+    for (entry = table->buckets[b]; entry; entry = entry->next) {
+        if (entry->key == key) {
+            entry->value = value;
+            return 0;
+        }
+    }
+    entry = malloc(sizeof(ptr_table_entry));
+    if (!entry)
+        return -1;
+    entry->key = key;
+    entry->value = value;
+    entry->next = table->buckets[b];
+    table->buckets[b] = entry;
+    table->count++;
+    /* Failing to grow only makes lookups slower */
+    if (table->count > table->size)
+        ptr_table_resize(table, table->size * 2);
+    return 0;
+}
+
+void *
+ptr_table_pop(ptr_table *table, void *key)
+{
+    ptr_table_entry **link, *entry;
+    void *value;
+
+    if (!table->size)
+        return NULL;
+    link = &table->buckets[ptr_table_bucket(table->size, key)];
+    for (entry = *link; entry; link = &entry->next, entry = entry->next) {
+        if (entry->key == key) {
+            *link = entry->next;
+            value = entry->value;
+            free(entry);
+            table->count--;
+            return value;
+        }
+    }
+    return NULL;
+}
+
+PyObject *
+sequence_subscript(PyObject *self, PyObject *key, Py_ssize_t length,
+                   ssizeargfunc item)
+{
+    Py_ssize_t index, start, stop, step, slicelength, i;
+    PyObject *list, *value;
+
+    if (PyIndex_Check(key)) {
+        index = PyNumber_AsSsize_t(key, PyExc_IndexError);
+        if (index == -1 && PyErr_Occurred())
+            return NULL;
+        if (index < 0)
+            index += length;
+        if (index < 0 || index >= length) {
+            PyErr_SetString(PyExc_IndexError, "index out of range");
+            return NULL;
+        }
+        return item(self, index);
+    }
+    if (!PySlice_Check(key)) {
+        PyErr_Format(PyExc_TypeError,
+                     "indices must be integers, not %.200s",
+                     key->ob_type->tp_name);
+        return NULL;
+    }
+    if (PySlice_GetIndicesEx((PySliceObject *)key, length, &start, &stop,
+                             &step, &slicelength) < 0)
+        return NULL;
+    list = PyList_New(slicelength);
+    if (!list)
+        return NULL;
+    for (i = 0, index = start; i < slicelength; i++, index += step) {
+        value = item(self, index);
+        if (!value) {
+            Py_DECREF(list);
+            return NULL;
+        }
+        PyList_SET_ITEM(list, i, value);
+    }
+    return list;
+}
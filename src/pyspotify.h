@@ -25,7 +25,8 @@ typedef struct {
     PyObject *userdata;
 } Callback;
 
-/* Trampolines for callback handling */
+/* Trampolines for callback handling. callback may be NULL for trampolines
+ * dispatching to the methods of the manager. */
 Callback *create_trampoline(PyObject *callback, PyObject *manager,
                             PyObject *userdata);
 void delete_trampoline(Callback * tr);
@@ -38,3 +39,53 @@ PyObject *as_function(PyObject *o);
 
 /* Returns a Python string for the error, or None if SP_ERROR_OK */
 PyObject *error_message(int err);
+
+/* Implements mp_subscript for a sequence of length items: index may be
+ * negative, and a slice gives a list. item is only called with indices in
+ * range. */
+PyObject *sequence_subscript(PyObject *self, PyObject *key, Py_ssize_t length,
+                             ssizeargfunc item);
+
+/* Hash tables keyed by pointers, used to find the data pyspotify keeps about
+ * libspotify objects. Collisions are handled by chaining, and the number of
+ * buckets doubles when it gets lower than the number of entries. A table
+ * must be zero-initialized before use.
+ */
+typedef struct _ptr_table_entry {
+    void *key;
+    void *value;
+    struct _ptr_table_entry *next;
+} ptr_table_entry;
+
+typedef struct {
+    ptr_table_entry **buckets;
+    size_t size;
+    size_t count;
+} ptr_table;
+
+/* Returns the value for key, or NULL */
+void *ptr_table_get(ptr_table *table, void *key);
+
+/* Sets the value for key. Returns -1 if out of memory, 0 otherwise. */
+int ptr_table_set(ptr_table *table, void *key, void *value);
+
+/* Removes key from the table, and returns its value, or NULL */
+void *ptr_table_pop(ptr_table *table, void *key);
+
+/* Identity caches of the wrappers of libspotify objects.
+ *
+ * A cache maps the address of a libspotify object to a weak reference to its
+ * Python wrapper, so that the same wrapper is returned for as long as it is
+ * alive. The cache dictionary is created on first use. Wrappers must support
+ * weak references, and remove themselves from the cache when deallocated.
+ */
+
+/* Returns a new reference to the cached wrapper of ptr, or NULL */
+PyObject *wrapper_cache_get(PyObject *cache, void *ptr);
+
+/* Adds wrapper to the cache. Failing to do so is not an error. */
+void wrapper_cache_add(PyObject **cache, void *ptr, PyObject *wrapper);
+
+/* Removes wrapper from the cache, if it is the cached wrapper of ptr. Must be
+ * called before clearing the weak references to wrapper. */
+void wrapper_cache_remove(PyObject *cache, void *ptr, PyObject *wrapper);
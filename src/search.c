@@ -6,6 +6,7 @@
 #include "artist.h"
 #include "album.h"
 #include "track.h"
+#include "view.h"
 
 static PyMemberDef Results_members[] = {
     {NULL}
@@ -57,53 +58,61 @@ Results_error(Results * self)
     return Py_BuildValue("i", sp_search_error(self->_search));
 }
 
-static PyObject *
-Results_artists(Results * self)
+static int
+results_num_artists(void *search)
 {
-    sp_artist *artist;
-    int count = sp_search_num_artists(self->_search);
-    PyObject *l = PyList_New(count);
-    int i;
+    return sp_search_num_artists(search);
+}
 
-    for (i = 0; i < count; ++i) {
-        artist = sp_search_artist(self->_search, i);
-        PyObject *a = Artist_FromSpotify(artist);
+static PyObject *
+results_artist(void *search, int index)
+{
+    return Artist_FromSpotify(sp_search_artist(search, index));
+}
 
-        PyList_SetItem(l, i, a);
-    }
-    return l;
+static int
+results_num_albums(void *search)
+{
+    return sp_search_num_albums(search);
 }
 
 static PyObject *
-Results_albums(Results * self)
+results_album(void *search, int index)
 {
-    sp_album *album;
-    int count = sp_search_num_albums(self->_search);
-    PyObject *l = PyList_New(count);
-    int i;
+    return Album_FromSpotify(sp_search_album(search, index));
+}
 
-    for (i = 0; i < count; ++i) {
-        album = sp_search_album(self->_search, i);
-        PyObject *a = Album_FromSpotify(album);
+static int
+results_num_tracks(void *search)
+{
+    return sp_search_num_tracks(search);
+}
 
-        PyList_SetItem(l, i, a);
-    }
-    return l;
+static PyObject *
+results_track(void *search, int index)
+{
+    return Track_FromSpotify(sp_search_track(search, index));
 }
 
 static PyObject *
-Results_tracks(Results * self)
+Results_artists(Results * self)
 {
-    int count = sp_search_num_tracks(self->_search);
-    PyObject *l = PyList_New(count);
-    int i;
+    return SequenceView_New((PyObject *)self, self->_search,
+                            results_num_artists, results_artist);
+}
 
-    for (i = 0; i < count; ++i) {
-        PyObject *a = Track_FromSpotify(sp_search_track(self->_search, i));
+static PyObject *
+Results_albums(Results * self)
+{
+    return SequenceView_New((PyObject *)self, self->_search,
+                            results_num_albums, results_album);
+}
 
-        PyList_SetItem(l, i, a);
-    }
-    return l;
+static PyObject *
+Results_tracks(Results * self)
+{
+    return SequenceView_New((PyObject *)self, self->_search,
+                            results_num_tracks, results_track);
 }
 
 static PyObject *
@@ -152,15 +161,15 @@ static PyMethodDef Results_methods[] = {
     {"artists",
      (PyCFunction)Results_artists,
      METH_NOARGS,
-     "Return a list of all the artists found by the search"},
+     "Return a sequence of all the artists found by the search"},
     {"albums",
      (PyCFunction)Results_albums,
      METH_NOARGS,
-     "Return a list of all the albums found by the search"},
+     "Return a sequence of all the albums found by the search"},
     {"tracks",
      (PyCFunction)Results_tracks,
      METH_NOARGS,
-     "Return a list of all the tracks found by the search"},
+     "Return a sequence of all the tracks found by the search"},
     {"total_albums",
      (PyCFunction)Results_total_albums,
      METH_NOARGS,
@@ -17,6 +17,7 @@
 #include "search.h"
 #include "image.h"
 #include "user.h"
+#include "frames.h"
 
 static int session_constructed = 0;
 sp_session *g_session;
@@ -188,6 +189,16 @@ Session_unload(Session * self)
     Py_RETURN_NONE;
 }
 
+/* Number of metadata_updated callbacks received, only accessed with the GIL
+ * held */
+static unsigned long g_metadata_updates = 0;
+
+static PyObject *
+Session_metadata_updates(Session * self)
+{
+    return PyLong_FromUnsignedLong(g_metadata_updates);
+}
+
 static PyObject *
 Session_process_events(Session * self)
 {
@@ -333,6 +344,9 @@ static PyMethodDef Session_methods[] = {
      "Logout from the session and terminate the main loop"},
     {"process_events", (PyCFunction)Session_process_events, METH_NOARGS,
      "Process any outstanding events"},
+    {"metadata_updates", (PyCFunction)Session_metadata_updates,
+     METH_NOARGS,
+     "Return the number of metadata updates notified by libspotify"},
     {"load", (PyCFunction)Session_load, METH_VARARGS,
      "Load the specified track on the player"},
     {"seek", (PyCFunction)Session_seek, METH_VARARGS,
@@ -407,30 +421,138 @@ PyTypeObject SessionType = {
 /*           CALLBACK SHIMS          */
 /*************************************/
 
+/* Client methods called by the callback shims, in the order of
+ * sp_session_callbacks. notify_main_thread calls the client's wake(). */
+enum {
+    CB_LOGGED_IN,
+    CB_LOGGED_OUT,
+    CB_METADATA_UPDATED,
+    CB_CONNECTION_ERROR,
+    CB_MESSAGE_TO_USER,
+    CB_NOTIFY_MAIN_THREAD,
+    CB_MUSIC_DELIVERY,
+    CB_PLAY_TOKEN_LOST,
+    CB_LOG_MESSAGE,
+    CB_END_OF_TRACK,
+    CB_COUNT
+};
+
+static const char *callback_names[CB_COUNT] = {
+    "logged_in",
+    "logged_out",
+    "metadata_updated",
+    "connection_error",
+    "message_to_user",
+    "wake",
+    "music_delivery",
+    "play_token_lost",
+    "log_message",
+    "end_of_track"
+};
+
+/* The Session object passed to the client and the client's bound methods
+ * are created once per session instead of once per callback, which matters
+ * for music_delivery. Only accessed with the GIL held. */
+static struct {
+    sp_session *session;
+    PyObject *client;           /* borrowed, only used to detect changes */
+    PyObject *psession;
+    PyObject *methods[CB_COUNT];
+} g_callback_cache;
+
+static void
+callback_cache_clear(void)
+{
+    int i;
+
+    g_callback_cache.session = NULL;
+    g_callback_cache.client = NULL;
+    Py_CLEAR(g_callback_cache.psession);
+    for (i = 0; i < CB_COUNT; i++)
+        Py_CLEAR(g_callback_cache.methods[i]);
+}
+
+/* Returns a borrowed reference to the Session object for session */
+static PyObject *
+cached_session(sp_session * session)
+{
+    PyObject *client = (PyObject *)sp_session_userdata(session);
+
+    if (g_callback_cache.session != session
+        || g_callback_cache.client != client) {
+        callback_cache_clear();
+        g_callback_cache.psession =
+            PyObject_CallObject((PyObject *)&SessionType, NULL);
+        if (!g_callback_cache.psession)
+            return NULL;
+        ((Session *) g_callback_cache.psession)->_session = session;
+        g_callback_cache.session = session;
+        g_callback_cache.client = client;
+    }
+    return g_callback_cache.psession;
+}
+
+/* Returns a borrowed reference to the client method for callback cb, or
+ * NULL after reporting the error */
+static PyObject *
+client_method(sp_session * session, int cb)
+{
+    PyObject *method;
+
+    if (!cached_session(session)) {
+        PyErr_WriteUnraisable((PyObject *)&SessionType);
+        return NULL;
+    }
+    method = g_callback_cache.methods[cb];
+    if (!method) {
+        method = PyObject_GetAttrString(g_callback_cache.client,
+                                        callback_names[cb]);
+        if (!method) {
+            PyErr_WriteUnraisable(g_callback_cache.client);
+            return NULL;
+        }
+        g_callback_cache.methods[cb] = method;
+    }
+    return method;
+}
+
+/* Calls the client method for callback cb with the session and, if not
+ * NULL, arg as arguments. Returns a new reference to the result, or NULL
+ * after reporting the error. */
+static PyObject *
+call_client(sp_session * session, int cb, PyObject *arg)
+{
+    PyObject *psession, *method, *res;
+
+    method = client_method(session, cb);
+    if (!method)
+        return NULL;
+    /* The client may reconnect, and thus clear the cache, from the call */
+    psession = g_callback_cache.psession;
+    Py_INCREF(psession);
+    Py_INCREF(method);
+    res = PyObject_CallFunctionObjArgs(method, psession, arg, NULL);
+    if (!res)
+        PyErr_WriteUnraisable(method);
+    Py_DECREF(method);
+    Py_DECREF(psession);
+    return res;
+}
+
 static void
 logged_in(sp_session * session, sp_error error)
 {
     PyGILState_STATE gstate;
-    PyObject *res, *err, *method;
+    PyObject *res, *err;
 
 #ifdef DEBUG
     fprintf(stderr, "[DEBUG]-session- >> logged_in called\n");
 #endif
     gstate = PyGILState_Ensure();
-    Session *psession =
-        (Session *) PyObject_CallObject((PyObject *)&SessionType, NULL);
-    psession->_session = session;
-    PyObject *client = (PyObject *)sp_session_userdata(session);
-
     err = error_message(error);
-    method = PyObject_GetAttrString(client, "logged_in");
-    res = PyObject_CallFunctionObjArgs(method, psession, err, NULL);
-    if (!res)
-        PyErr_WriteUnraisable(method);
-    Py_DECREF(psession);
+    res = call_client(session, CB_LOGGED_IN, err);
     Py_DECREF(err);
     Py_XDECREF(res);
-    Py_DECREF(method);
     PyGILState_Release(gstate);
 }
 
@@ -438,24 +560,14 @@ static void
 logged_out(sp_session * session)
 {
     PyGILState_STATE gstate;
-    PyObject *res, *method;
+    PyObject *res;
 
 #ifdef DEBUG
         fprintf(stderr, "[DEBUG]-session- >> logged_out called\n");
 #endif
     gstate = PyGILState_Ensure();
-    Session *psession =
-        (Session *) PyObject_CallObject((PyObject *)&SessionType, NULL);
-    psession->_session = session;
-    PyObject *client = (PyObject *)sp_session_userdata(session);
-
-    method = PyObject_GetAttrString(client, "logged_out");
-    res = PyObject_CallFunctionObjArgs(method, psession, NULL);
-    if (!res)
-        PyErr_WriteUnraisable(method);
-    Py_DECREF(psession);
+    res = call_client(session, CB_LOGGED_OUT, NULL);
     Py_XDECREF(res);
-    Py_DECREF(method);
     PyGILState_Release(gstate);
 }
 
@@ -463,24 +575,15 @@ static void
 metadata_updated(sp_session * session)
 {
     PyGILState_STATE gstate;
-    PyObject *res, *method;
+    PyObject *res;
 
 #ifdef DEBUG
         fprintf(stderr, "[DEBUG]-session- >> metadata_updated called\n");
 #endif
     gstate = PyGILState_Ensure();
-    Session *psession =
-        (Session *) PyObject_CallObject((PyObject *)&SessionType, NULL);
-    psession->_session = session;
-    PyObject *client = (PyObject *)sp_session_userdata(session);
-
-    method = PyObject_GetAttrString(client, "metadata_updated");
-    res = PyObject_CallFunctionObjArgs(method, psession, NULL);
-    if (!res)
-        PyErr_WriteUnraisable(method);
-    Py_DECREF(psession);
+    g_metadata_updates++;
+    res = call_client(session, CB_METADATA_UPDATED, NULL);
     Py_XDECREF(res);
-    Py_DECREF(method);
     PyGILState_Release(gstate);
 }
 
@@ -488,26 +591,16 @@ static void
 connection_error(sp_session * session, sp_error error)
 {
     PyGILState_STATE gstate;
-    PyObject *res, *err, *method;
+    PyObject *res, *err;
 
 #ifdef DEBUG
         fprintf(stderr, "[DEBUG]-session- >> connection_error called\n");
 #endif
     gstate = PyGILState_Ensure();
-    Session *psession =
-        (Session *) PyObject_CallObject((PyObject *)&SessionType, NULL);
-    psession->_session = session;
-    PyObject *client = (PyObject *)sp_session_userdata(session);
-
     err = error_message(error);
-    method = PyObject_GetAttrString(client, "connection_error");
-    res = PyObject_CallFunctionObjArgs(method, psession, err, NULL);
-    if (!res)
-        PyErr_WriteUnraisable(method);
-    Py_DECREF(psession);
+    res = call_client(session, CB_CONNECTION_ERROR, err);
     Py_DECREF(err);
     Py_XDECREF(res);
-    Py_DECREF(method);
     PyGILState_Release(gstate);
 }
 
@@ -515,26 +608,16 @@ static void
 message_to_user(sp_session * session, const char *message)
 {
     PyGILState_STATE gstate;
-    PyObject *res, *method, *msg;
+    PyObject *res, *msg;
 
 #ifdef DEBUG
         fprintf(stderr, "[DEBUG]-session- >> message to user: %s\n", message);
 #endif
     gstate = PyGILState_Ensure();
-    Session *psession =
-        (Session *) PyObject_CallObject((PyObject *)&SessionType, NULL);
-    psession->_session = session;
-    PyObject *client = (PyObject *)sp_session_userdata(session);
-
     msg = PyUnicode_FromString(message);
-    method = PyObject_GetAttrString(client, "message_to_user");
-    res =
-        PyObject_CallFunctionObjArgs(method, psession, msg, NULL);
-    if (!res)
-        PyErr_WriteUnraisable(method);
-    Py_DECREF(psession);
+    res = call_client(session, CB_MESSAGE_TO_USER, msg);
+    Py_XDECREF(msg);
     Py_XDECREF(res);
-    Py_DECREF(method);
     PyGILState_Release(gstate);
 }
 
@@ -542,7 +625,7 @@ static void
 notify_main_thread(sp_session * session)
 {
     PyGILState_STATE gstate;
-    PyObject *res, *method;
+    PyObject *res;
 
 #ifdef DEBUG
         fprintf(stderr, "[DEBUG]-session- >> notify_main_thread called\n");
@@ -550,20 +633,10 @@ notify_main_thread(sp_session * session)
     if (!session_constructed)
         return;
     gstate = PyGILState_Ensure();
-    Session *psession =
-        (Session *) PyObject_CallObject((PyObject *)&SessionType, NULL);
-    psession->_session = session;
-    PyObject *client = (PyObject *)sp_session_userdata(session);
-
-    if (client != NULL) {
-        method = PyObject_GetAttrString(client, "wake");
-        res = PyObject_CallFunctionObjArgs(method, psession, NULL);
-        if (!res)
-            PyErr_WriteUnraisable(method);
+    if (sp_session_userdata(session) != NULL) {
+        res = call_client(session, CB_NOTIFY_MAIN_THREAD, NULL);
         Py_XDECREF(res);
-        Py_DECREF(method);
     }
-    Py_DECREF(psession);
     PyGILState_Release(gstate);
 }
 
@@ -584,24 +657,50 @@ music_delivery(sp_session * session, const sp_audioformat * format,
                const void *frames, int num_frames)
 {
     PyGILState_STATE gstate;
-    PyObject *res, *method;
+    PyObject *res, *psession, *method;
 
 #ifdef DEBUG
         fprintf(stderr, "[DEBUG]-session- >> music_delivery called\n");
 #endif
     gstate = PyGILState_Ensure();
     int siz = frame_size(format);
-    PyObject *pyframes = PyBuffer_FromMemory((void *)frames, num_frames * siz);
-    Session *psession =
-        (Session *) PyObject_CallObject((PyObject *)&SessionType, NULL);
-    psession->_session = session;
-    PyObject *client = (PyObject *)sp_session_userdata(session);
-    method = PyObject_GetAttrString(client, "music_delivery");
+    int consumed = num_frames;  // assume all consumed
+
+    method = client_method(session, CB_MUSIC_DELIVERY);
+    if (!method) {
+        PyGILState_Release(gstate);
+        return consumed;
+    }
+    psession = g_callback_cache.psession;
+    PyObject *pyframes;
+
+    if (frames_pool_enabled()) {
+        pyframes = Frames_FromPool(frames, num_frames, format->channels);
+        if (!pyframes) {
+            /* All the blocks are still in use: let libspotify deliver
+             * these frames again later. */
+            if (PyErr_Occurred())
+                PyErr_WriteUnraisable(method);
+            PyGILState_Release(gstate);
+            return 0;
+        }
+    }
+    else {
+        pyframes = Frames_FromMemory(frames, num_frames, format->channels,
+                                     NULL);
+        if (!pyframes) {
+            PyErr_WriteUnraisable(method);
+            PyGILState_Release(gstate);
+            return 0;
+        }
+    }
+
+    Py_INCREF(psession);
+    Py_INCREF(method);
     res =
         PyObject_CallFunction(method, "OOiiiii", psession,
                               pyframes, siz, num_frames, format->sample_type,
                               format->sample_rate, format->channels);
-    int consumed = num_frames;  // assume all consumed
     if (!res)
         PyErr_WriteUnraisable(method);
     else if (PyInt_Check(res))
@@ -613,6 +712,8 @@ music_delivery(sp_session * session, const sp_audioformat * format,
                         "music_delivery must return an integer");
         PyErr_WriteUnraisable(method);
     }
+    /* The audio data is only valid until we return */
+    Frames_Invalidate(pyframes);
     Py_DECREF(pyframes);
     Py_DECREF(psession);
     Py_XDECREF(res);
@@ -625,24 +726,14 @@ static void
 play_token_lost(sp_session * session)
 {
     PyGILState_STATE gstate;
-    PyObject *res, *method;
+    PyObject *res;
 
 #ifdef DEBUG
         fprintf(stderr, "[DEBUG]-session- >> play_token_lost called\n");
 #endif
     gstate = PyGILState_Ensure();
-    Session *psession =
-        (Session *) PyObject_CallObject((PyObject *)&SessionType, NULL);
-    psession->_session = session;
-    PyObject *client = (PyObject *)sp_session_userdata(session);
-
-    method = PyObject_GetAttrString(client, "play_token_lost");
-    res = PyObject_CallFunctionObjArgs(method, psession, NULL);
-    if (!res)
-        PyErr_WriteUnraisable(method);
-    Py_DECREF(psession);
+    res = call_client(session, CB_PLAY_TOKEN_LOST, NULL);
     Py_XDECREF(res);
-    Py_DECREF(method);
     PyGILState_Release(gstate);
 }
 
@@ -650,26 +741,16 @@ static void
 log_message(sp_session * session, const char *data)
 {
     PyGILState_STATE gstate;
-    PyObject *res, *method, *msg;
+    PyObject *res, *msg;
 
 #ifdef DEBUG
         fprintf(stderr, "[DEBUG]-session- >> log message: %s\n", data);
 #endif
     gstate = PyGILState_Ensure();
-    Session *psession =
-        (Session *) PyObject_CallObject((PyObject *)&SessionType, NULL);
-    psession->_session = session;
-    PyObject *client = (PyObject *)sp_session_userdata(session);
-
     msg = PyUnicode_FromString(data);
-    method = PyObject_GetAttrString(client, "log_message");
-    res = PyObject_CallFunctionObjArgs(method, psession, msg, NULL);
-    if (!res)
-        PyErr_WriteUnraisable(method);
-    Py_DECREF(psession);
+    res = call_client(session, CB_LOG_MESSAGE, msg);
+    Py_XDECREF(msg);
     Py_XDECREF(res);
-    Py_DECREF(msg);
-    Py_DECREF(method);
     PyGILState_Release(gstate);
 }
 
@@ -677,24 +758,14 @@ static void
 end_of_track(sp_session * session)
 {
     PyGILState_STATE gstate;
-    PyObject *res, *method;
+    PyObject *res;
 
 #ifdef DEBUG
         fprintf(stderr, "[DEBUG]-session- >> end_of_track called\n");
 #endif
     gstate = PyGILState_Ensure();
-    Session *psession =
-        (Session *) PyObject_CallObject((PyObject *)&SessionType, NULL);
-    psession->_session = session;
-    PyObject *client = (PyObject *)sp_session_userdata(session);
-
-    method = PyObject_GetAttrString(client, "end_of_track");
-    res = PyObject_CallFunctionObjArgs(method, psession, NULL);
-    if (!res)
-        PyErr_WriteUnraisable(method);
-    Py_DECREF(psession);
+    res = call_client(session, CB_END_OF_TRACK, NULL);
     Py_XDECREF(res);
-    Py_DECREF(method);
     PyGILState_Release(gstate);
 }
 
@@ -765,6 +836,7 @@ session_connect(PyObject *self, PyObject *args)
     if (!PyArg_ParseTuple(args, "O", &client))
         return NULL;
     PyEval_InitThreads();
+    callback_cache_clear();
 
     memset(&config, 0, sizeof(config));
     config.api_version = SPOTIFY_API_VERSION;
@@ -836,6 +908,22 @@ session_connect(PyObject *self, PyObject *args)
     PyErr_Clear();
     Py_XDECREF(remember);
 
+    long frames_pool_size = 0;
+    PyObject *pool_size = PyObject_GetAttrString(client, "frames_pool_size");
+
+    if (!pool_size)
+        PyErr_Clear();
+    else if (pool_size != Py_None) {
+        frames_pool_size = PyInt_AsLong(pool_size);
+        if (frames_pool_size == -1 && PyErr_Occurred()) {
+            Py_DECREF(pool_size);
+            return NULL;
+        }
+    }
+    Py_XDECREF(pool_size);
+    if (frames_pool_configure(frames_pool_size) < 0)
+        return NULL;
+
 #ifdef DEBUG
     fprintf(stderr, "[DEBUG]-session- creating session...\n");
 #endif
@@ -865,8 +953,8 @@ session_connect(PyObject *self, PyObject *args)
         Py_END_ALLOW_THREADS;
     }
     g_session = session;
-    Session *psession =
-        (Session *) PyObject_CallObject((PyObject *)&SessionType, NULL);
-    psession->_session = session;
-    return (PyObject *)psession;
+    PyObject *psession = cached_session(session);
+
+    Py_XINCREF(psession);
+    return psession;
 }
@@ -18,27 +18,63 @@ Track_new(PyTypeObject * type, PyObject *args, PyObject *kwds)
 
     self = (Track *) type->tp_alloc(type, 0);
     self->_track = NULL;
+    self->_weakreflist = NULL;
     return (PyObject *)self;
 }
 
+/* Wrappers of the tracks currently alive, see wrapper_cache_get() */
+static PyObject *track_cache = NULL;
+
 PyObject *
 Track_FromSpotify(sp_track * track)
 {
-    PyObject *t = PyObject_CallObject((PyObject *)&TrackType, NULL);
+    PyObject *t = wrapper_cache_get(track_cache, track);
 
+    if (t)
+        return t;
+    t = PyObject_CallObject((PyObject *)&TrackType, NULL);
     ((Track *) t)->_track = track;
     sp_track_add_ref(track);
+    wrapper_cache_add(&track_cache, track, t);
     return t;
 }
 
 static void
 Track_dealloc(Track * self)
 {
+    wrapper_cache_remove(track_cache, self->_track, (PyObject *)self);
+    if (self->_weakreflist)
+        PyObject_ClearWeakRefs((PyObject *)self);
     if (self->_track)
         sp_track_release(self->_track);
     self->ob_type->tp_free(self);
 }
 
+static PyObject *
+Track_richcompare(PyObject *a, PyObject *b, int op)
+{
+    PyObject *result;
+
+    if (!PyObject_TypeCheck(a, &TrackType)
+        || !PyObject_TypeCheck(b, &TrackType)
+        || (op != Py_EQ && op != Py_NE)) {
+        Py_INCREF(Py_NotImplemented);
+        return Py_NotImplemented;
+    }
+    if ((((Track *) a)->_track == ((Track *) b)->_track) == (op == Py_EQ))
+        result = Py_True;
+    else
+        result = Py_False;
+    Py_INCREF(result);
+    return result;
+}
+
+static long
+Track_hash(Track * self)
+{
+    return _Py_HashPointer(self->_track);
+}
+
 static PyObject *
 Track_str(PyObject *oself)
 {
@@ -223,7 +259,7 @@ PyTypeObject TrackType = {
     0,                  /*tp_as_number */
     0,                  /*tp_as_sequence */
     0,                  /*tp_as_mapping */
-    0,                  /*tp_hash */
+    (hashfunc) Track_hash, /*tp_hash */
     0,                  /*tp_call */
     Track_str,          /*tp_str */
     0,                  /*tp_getattro */
@@ -233,8 +269,8 @@ PyTypeObject TrackType = {
     "Track objects",    /* tp_doc */
     0,                  /* tp_traverse */
     0,                  /* tp_clear */
-    0,                  /* tp_richcompare */
-    0,                  /* tp_weaklistoffset */
+    Track_richcompare,  /* tp_richcompare */
+    offsetof(Track, _weakreflist), /* tp_weaklistoffset */
     0,                  /* tp_iter */
     0,                  /* tp_iternext */
     Track_methods,      /* tp_methods */
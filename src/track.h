@@ -1,5 +1,6 @@
 typedef struct {
     PyObject_HEAD sp_track *_track;
+    PyObject *_weakreflist;
 } Track;
 
 extern PyTypeObject TrackType;
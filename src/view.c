@@ -0,0 +1,108 @@
+#include <Python.h>
+#include "pyspotify.h"
+#include "view.h"
+
+PyObject *
+SequenceView_New(PyObject *owner, void *ptr, view_length_func length,
+                 view_item_func item)
+{
+    SequenceView *self;
+
+    self = PyObject_New(SequenceView, &SequenceViewType);
+    if (!self)
+        return NULL;
+    Py_INCREF(owner);
+    self->_owner = owner;
+    self->_ptr = ptr;
+    self->_length = length;
+    self->_item = item;
+    return (PyObject *)self;
+}
+
+static void
+SequenceView_dealloc(SequenceView * self)
+{
+    Py_DECREF(self->_owner);
+    PyObject_Del(self);
+}
+
+static Py_ssize_t
+SequenceView_sq_length(SequenceView * self)
+{
+    return self->_length(self->_ptr);
+}
+
+static PyObject *
+SequenceView_sq_item(SequenceView * self, Py_ssize_t index)
+{
+    if (index < 0 || index >= self->_length(self->_ptr)) {
+        PyErr_SetString(PyExc_IndexError, "index out of range");
+        return NULL;
+    }
+    return self->_item(self->_ptr, (int)index);
+}
+
+static PyObject *
+SequenceView_mp_subscript(SequenceView * self, PyObject *key)
+{
+    return sequence_subscript((PyObject *)self, key,
+                              self->_length(self->_ptr),
+                              (ssizeargfunc) SequenceView_sq_item);
+}
+
+static PyObject *
+SequenceView_repr(SequenceView * self)
+{
+    return PyString_FromFormat("<spotify.SequenceView of %d items>",
+                               self->_length(self->_ptr));
+}
+
+static PySequenceMethods SequenceView_as_sequence = {
+    (lenfunc) SequenceView_sq_length,   /* sq_length */
+    0,                                  /* sq_concat */
+    0,                                  /* sq_repeat */
+    (ssizeargfunc) SequenceView_sq_item,        /* sq_item */
+    0,                                  /* sq_slice */
+    0,                                  /* sq_ass_item */
+    0,                                  /* sq_ass_slice */
+    0,                                  /* sq_contains */
+    0,                                  /* sq_inplace_concat */
+    0,                                  /* sq_inplace_repeat */
+};
+
+static PyMappingMethods SequenceView_as_mapping = {
+    (lenfunc) SequenceView_sq_length,   // mp_length
+    (binaryfunc) SequenceView_mp_subscript,     // mp_subscript
+    0,                  // mp_ass_subscript
+};
+
+PyTypeObject SequenceViewType = {
+    PyObject_HEAD_INIT(NULL) 0, /*ob_size */
+    "spotify.SequenceView",     /*tp_name */
+    sizeof(SequenceView),       /*tp_basicsize */
+    0,                  /*tp_itemsize */
+    (destructor) SequenceView_dealloc,  /*tp_dealloc */
+    0,                  /*tp_print */
+    0,                  /*tp_getattr */
+    0,                  /*tp_setattr */
+    0,                  /*tp_compare */
+    (reprfunc) SequenceView_repr,       /*tp_repr */
+    0,                  /*tp_as_number */
+    &SequenceView_as_sequence,  /*tp_as_sequence */
+    &SequenceView_as_mapping,   /*tp_as_mapping */
+    0,                  /*tp_hash */
+    0,                  /*tp_call */
+    0,                  /*tp_str */
+    0,                  /*tp_getattro */
+    0,                  /*tp_setattro */
+    0,                  /*tp_as_buffer */
+    Py_TPFLAGS_DEFAULT, /*tp_flags */
+    "Lazy sequence of Spotify objects", /* tp_doc */
+};
+
+void
+view_init(PyObject *m)
+{
+    Py_INCREF(&SequenceViewType);
+    PyModule_AddObject(m, "SequenceView", (PyObject *)&SequenceViewType);
+}
@@ -0,0 +1,25 @@
+/* Lazy sequences of the objects held by a libspotify object, such as the
+ * tracks found by a search. They support len(), indexing, slicing and
+ * iteration, and create the wrappers of the objects only when they are
+ * accessed. */
+
+typedef int (*view_length_func) (void *ptr);
+typedef PyObject *(*view_item_func) (void *ptr, int index);
+
+typedef struct {
+    PyObject_HEAD
+    PyObject *_owner;           /* keeps the libspotify object alive */
+    void *_ptr;
+    view_length_func _length;
+    view_item_func _item;
+} SequenceView;
+
+extern PyTypeObject SequenceViewType;
+
+extern void view_init(PyObject *m);
+
+/* Returns a view of the objects of ptr, of which there are length(ptr), the
+ * index-th being wrapped by item(ptr, index). owner is the Python object
+ * wrapping ptr. */
+PyObject *SequenceView_New(PyObject *owner, void *ptr,
+                           view_length_func length, view_item_func item);
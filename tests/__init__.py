@@ -1,3 +1,7 @@
+import bisect
+
+from spotify import SpotifyError
+
 try: # 2.7
     # pylint: disable = E0611,F0401
     from unittest.case import SkipTest
@@ -8,3 +12,62 @@ except ImportError:
     except ImportError: # Failsafe
         class SkipTest(Exception):
             pass
+
+
+class FakePlaylist(object):
+    """
+    A playlist of track URIs notifying its managers of the changes made to it
+    the way libspotify does.
+    """
+
+    def __init__(self, uris, loaded=True):
+        self.uris = list(uris)
+        self.loaded = loaded
+        self.managers = []
+        self.calls = []
+
+    def __len__(self):
+        return len(self.uris)
+
+    def __getitem__(self, index):
+        return self.uris[index]
+
+    def is_loaded(self):
+        return self.loaded
+
+    def tracks_metadata(self, fields):
+        return {'uri': list(self.uris)}
+
+    def add_manager(self, manager, userdata=None):
+        self.managers.append((manager, userdata))
+
+    def remove_manager(self, manager, userdata=None):
+        if (manager, userdata) not in self.managers:
+            raise SpotifyError('This manager was not added')
+        self.managers.remove((manager, userdata))
+
+    def remove_tracks(self, tracks):
+        self.calls.append('remove')
+        for i in sorted(tracks, reverse=True):
+            del self.uris[i]
+        for manager, userdata in list(self.managers):
+            manager.tracks_removed(self, tracks, userdata)
+
+    def reorder_tracks(self, tracks, new_position):
+        # As in libspotify, new_position is taken before the move, both here
+        # and in the tracks_moved callback.
+        self.calls.append('move')
+        indexes = sorted(tracks)
+        moving = [self.uris[i] for i in indexes]
+        for i in reversed(indexes):
+            del self.uris[i]
+        position = new_position - bisect.bisect_left(indexes, new_position)
+        self.uris[position:position] = moving
+        for manager, userdata in list(self.managers):
+            manager.tracks_moved(self, tracks, new_position, userdata)
+
+    def add_tracks(self, position, tracks):
+        self.calls.append('add')
+        self.uris[position:position] = tracks
+        for manager, userdata in list(self.managers):
+            manager.tracks_added(self, tracks, position, userdata)
@@ -40,6 +40,15 @@ class TestAlbumbrowser(unittest.TestCase):
         assert self.browser[1].name() == 'baz2'
         assert self.browser[2].name() == 'baz3'
 
+    def test_negative_index(self):
+        self.assertEqual(self.browser[-1].name(), 'baz3')
+        self.assertRaises(IndexError, lambda: self.browser[-4])
+
+    def test_tracks(self):
+        tracks = self.browser.tracks()
+        self.assertEqual(len(tracks), 3)
+        self.assertEqual([t.name() for t in tracks[:2]], ['baz1', 'baz2'])
+
     def test_browser(self):
         browser = AlbumBrowser(self.album)
 
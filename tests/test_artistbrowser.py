@@ -59,6 +59,12 @@ class TestArtistbrowser(unittest.TestCase):
         self.assertEqual([a.name() for a in self.browser.tracks()],
                         ['track1', 'track2', 'track3'])
 
+    def test_views(self):
+        self.assertEqual(len(self.browser.albums()), 3)
+        self.assertEqual(self.browser.similar_artists()[-1].name(), 'artist3')
+        self.assertEqual([a.name() for a in self.browser.tracks()[1:]],
+                         ['track2', 'track3'])
+
     def test_browser(self):
         browser = ArtistBrowser(self.artist)
 
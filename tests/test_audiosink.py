@@ -0,0 +1,81 @@
+import threading
+import time
+import unittest
+
+from spotify.audiosink import BaseAudioSink, BufferedSink
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.001)
+    return condition()
+
+class FakeSink(BaseAudioSink):
+
+    def __init__(self):
+        super(FakeSink, self).__init__()
+        self.data = ''
+        self.ended = False
+        self.unblocked = threading.Event()
+        self.unblocked.set()
+
+    def music_delivery(self, session, frames, frame_size, num_frames,
+            sample_type, sample_rate, channels):
+        self.unblocked.wait()
+        self.data += str(frames)
+        return num_frames
+
+    def end_of_track(self):
+        self.ended = True
+
+class TestBufferedSink(unittest.TestCase):
+
+    def setUp(self):
+        self.sink = FakeSink()
+        # 100 frames of 4 bytes
+        self.buffered = BufferedSink(self.sink, buffer_ms=100)
+
+    def deliver(self, data):
+        return self.buffered.music_delivery(None, data, 4, len(data) // 4,
+                                            0, 1000, 2)
+
+    def test_writes_in_order(self):
+        data = ''.join(chr(i) * 4 for i in range(250))
+        written = 0
+        deadline = time.time() + 5
+        while written < len(data) and time.time() < deadline:
+            written += self.deliver(data[written:written + 120]) * 4
+        self.assertEqual(written, len(data))
+        self.assertTrue(wait_for(lambda: len(self.sink.data) == len(data)))
+        self.assertEqual(self.sink.data, data)
+
+    def test_partial_consumption(self):
+        self.sink.unblocked.clear()
+        self.assertEqual(self.deliver('a' * 4 * 60), 60)
+        self.assertEqual(self.deliver('b' * 4 * 60), 40)
+        self.assertEqual(self.buffered.overruns, 1)
+        self.assertEqual(self.deliver('c' * 4), 0)
+        self.assertEqual(self.buffered.overruns, 2)
+        self.sink.unblocked.set()
+        self.assertTrue(wait_for(lambda: len(self.sink.data) == 400))
+        self.assertEqual(self.sink.data, 'a' * 240 + 'b' * 160)
+
+    def test_underrun(self):
+        self.deliver('a' * 40)
+        self.assertTrue(wait_for(lambda: self.buffered.underruns == 1))
+        self.assertFalse(self.sink.ended)
+
+    def test_end_of_track_after_playing(self):
+        self.sink.unblocked.clear()
+        self.deliver('a' * 40)
+        self.buffered.end_of_track()
+        time.sleep(0.05)
+        self.assertFalse(self.sink.ended)
+        self.sink.unblocked.set()
+        self.assertTrue(wait_for(lambda: self.sink.ended))
+        self.assertEqual(self.sink.data, 'a' * 40)
+        self.assertEqual(self.buffered.underruns, 0)
+
+    def test_zero_frames(self):
+        self.assertEqual(self.deliver(''), 0)
+        self.assertEqual(self.buffered.overruns, 0)
@@ -0,0 +1,90 @@
+import array
+import unittest
+
+from spotify import SpotifyError
+from spotify._mockspotify import mock_frames, mock_frames_pool
+from spotify._mockspotify import mock_frames_invalidate
+
+class TestFrames(unittest.TestCase):
+
+    samples = array.array('h', [0, 1, -1, 2, -2, 3])
+    data = samples.tostring()
+
+    def tearDown(self):
+        mock_frames_pool(0)
+
+    def test_num_frames(self):
+        frames = mock_frames(self.data)
+        self.assertEqual(frames.num_frames(), 3)
+        self.assertEqual(frames.channels(), 2)
+
+    def test_mono(self):
+        frames = mock_frames(self.data, 1)
+        self.assertEqual(frames.num_frames(), 6)
+        self.assertEqual(frames.channels(), 1)
+
+    def test_bytes_buffer(self):
+        frames = mock_frames(self.data)
+        self.assertEqual(bytearray(buffer(frames)), self.data)
+        self.assertEqual(str(bytearray(frames)), self.data)
+
+    def test_memoryview(self):
+        view = memoryview(mock_frames(self.data))
+        self.assertEqual(view.format, 'h')
+        self.assertEqual(view.itemsize, 2)
+        self.assertEqual(view.ndim, 2)
+        self.assertEqual(view.shape, (3, 2))
+        self.assertEqual(view.strides, (4, 2))
+        self.assertTrue(view.readonly)
+        self.assertEqual(view.tobytes(), self.data)
+
+    def test_buffer(self):
+        frames = mock_frames(self.data)
+        self.assertEqual(len(frames), len(self.data))
+        self.assertEqual(str(frames), self.data)
+        self.assertEqual(str(buffer(frames)), self.data)
+
+    def test_invalid(self):
+        frames = mock_frames(self.data, valid=False)
+        self.assertFalse(frames.is_valid())
+        self.assertEqual(frames.num_frames(), 3)
+        self.assertRaises(SpotifyError, str, frames)
+        self.assertRaises(SpotifyError, memoryview, frames)
+        self.assertRaises(SpotifyError, lambda: str(buffer(frames)))
+
+    def test_invalidate_with_view(self):
+        frames = mock_frames(self.data)
+        view = memoryview(frames)
+        mock_frames_invalidate(frames)
+        self.assertTrue(frames.is_valid())
+        self.assertEqual(view.tobytes(), self.data)
+        self.assertEqual(str(frames), self.data)
+        frames = mock_frames(self.data)
+        view = memoryview(frames)
+        del view
+        mock_frames_invalidate(frames)
+        self.assertFalse(frames.is_valid())
+
+    def test_pool(self):
+        mock_frames_pool(2)
+        frames = [mock_frames(self.data, pooled=True) for i in range(2)]
+        self.assertEqual(mock_frames(self.data, pooled=True), None)
+        self.assertEqual(str(frames[0]), self.data)
+        del frames[0]
+        self.assertNotEqual(mock_frames(self.data, pooled=True), None)
+
+    def test_pool_copies(self):
+        mock_frames_pool(1)
+        data = array.array('h', [4, 5]).tostring()
+        frames = mock_frames(data, pooled=True)
+        del data
+        self.assertTrue(frames.is_valid())
+        self.assertEqual(memoryview(frames).tobytes(),
+                         array.array('h', [4, 5]).tostring())
+
+    def test_pool_grows_blocks(self):
+        mock_frames_pool(1)
+        data = self.data * 2048
+        frames = mock_frames(data, pooled=True)
+        self.assertEqual(frames.num_frames(), 3 * 2048)
+        self.assertEqual(str(frames), data)
@@ -0,0 +1,60 @@
+import unittest
+import weakref
+
+from spotify import SpotifyError
+from spotify._mockspotify import mock_image
+
+class UserData(object):
+    pass
+
+class TestImage(unittest.TestCase):
+
+    image_id = '01234567890123456789'
+
+    def callback(self, image, userdata):
+        pass
+
+    def test_image_id(self):
+        image = mock_image(self.image_id)
+        self.assertEqual(image.image_id(), self.image_id)
+        self.assertEqual(image.image_id_hex(), self.image_id.encode('hex'))
+
+    def test_remove_load_callback(self):
+        image = mock_image(self.image_id)
+        userdata = UserData()
+        ref = weakref.ref(userdata)
+        image.add_load_callback(self.callback, userdata)
+        del userdata
+        self.assertNotEqual(ref(), None)
+        image.remove_load_callback(self.callback, ref())
+        self.assertEqual(ref(), None)
+        self.assertRaises(SpotifyError, image.remove_load_callback,
+                          self.callback)
+
+    def test_remove_load_callback_without_userdata(self):
+        image = mock_image(self.image_id)
+        image.add_load_callback(self.callback)
+        image.add_load_callback(self.callback, 1)
+        image.remove_load_callback(self.callback)
+        self.assertRaises(SpotifyError, image.remove_load_callback,
+                          self.callback)
+        image.remove_load_callback(self.callback, 1)
+
+    def test_remove_unknown_callback(self):
+        image = mock_image(self.image_id)
+        image.add_load_callback(self.callback, 1)
+        self.assertRaises(SpotifyError, image.remove_load_callback,
+                          self.callback, 2)
+        self.assertRaises(SpotifyError, image.remove_load_callback,
+                          lambda image, userdata: None, 1)
+
+    def test_abandoned_image_releases_callbacks(self):
+        refs = []
+        for i in range(1000):
+            image = mock_image(self.image_id)
+            userdata = UserData()
+            refs.append(weakref.ref(userdata))
+            image.add_load_callback(lambda image, data, keep=userdata: None,
+                                    userdata)
+            del image, userdata
+        self.assertEqual([ref for ref in refs if ref() is not None], [])
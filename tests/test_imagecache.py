@@ -0,0 +1,204 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from spotify.imagecache import ImageCache
+
+class FakeImage(object):
+
+    def __init__(self, data, loaded=False, error=0, image_id=None):
+        self._data = data
+        self._image_id = image_id
+        self.loaded = loaded
+        self._error = error
+        self.callbacks = []
+
+    def is_loaded(self):
+        return self.loaded
+
+    def error(self):
+        return self._error
+
+    def data(self):
+        return buffer(self._data)
+
+    def image_id(self):
+        return self._image_id
+
+    def add_load_callback(self, callback, userdata=None):
+        self.callbacks.append((callback, userdata))
+
+    def load(self):
+        self.loaded = True
+        for callback, userdata in self.callbacks:
+            callback(self, userdata)
+
+class FakeSession(object):
+
+    def __init__(self):
+        self.images = {}
+        self.created = []
+
+    def image_create(self, image_id):
+        self.created.append(image_id)
+        return self.images[image_id]
+
+class FakeAlbum(object):
+
+    def __init__(self, cover):
+        self._cover = cover
+
+    def cover(self):
+        return self._cover
+
+class TestImageCache(unittest.TestCase):
+
+    image_id = '01234567890123456789'
+
+    def setUp(self):
+        self.session = FakeSession()
+        self.cache = ImageCache(max_bytes=10)
+        self.called = []
+
+    def callback(self, data, userdata):
+        self.called.append((data, userdata))
+
+    def test_load(self):
+        image = self.session.images[self.image_id] = FakeImage('abc')
+        self.assertEqual(self.cache.load(self.session, self.image_id,
+                                         self.callback, 1), None)
+        self.cache.load(self.session, self.image_id, self.callback, 2)
+        self.assertEqual(self.called, [])
+        image.load()
+        self.assertEqual(self.called, [('abc', 1), ('abc', 2)])
+        self.assertEqual(self.cache.load(self.session, self.image_id,
+                                         self.callback, 3), 'abc')
+        self.assertEqual(self.called[-1], ('abc', 3))
+        self.assertEqual(self.session.created, [self.image_id])
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+    def test_already_loaded(self):
+        self.session.images[self.image_id] = FakeImage('abc', loaded=True)
+        self.cache.load(self.session, self.image_id, self.callback)
+        self.assertEqual(self.called, [('abc', None)])
+
+    def test_error_not_kept(self):
+        self.session.images[self.image_id] = FakeImage('', loaded=True,
+                                                       error=3)
+        self.cache.load(self.session, self.image_id, self.callback)
+        self.assertEqual(self.called, [(None, None)])
+        self.assertEqual(self.cache.get(self.image_id), None)
+
+    def test_shared_cover(self):
+        image = self.session.images[self.image_id] = FakeImage('abc')
+        for i in range(200):
+            self.cache.album_cover(self.session, FakeAlbum(self.image_id),
+                                   self.callback, i)
+        image.load()
+        self.assertEqual(self.called, [('abc', i) for i in range(200)])
+        self.assertEqual(self.session.created, [self.image_id])
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache.stats()['coalesced'], 199)
+
+    def test_create_error(self):
+        def image_create(image_id):
+            # Joined by another load before failing
+            self.cache.load(self.session, image_id, self.callback, 2)
+            raise KeyError(image_id)
+        self.session.image_create = image_create
+        self.assertRaises(KeyError, self.cache.load, self.session,
+                          self.image_id, self.callback, 1)
+        self.assertEqual(self.called, [(None, 2)])
+        del self.session.image_create
+        self.session.images[self.image_id] = FakeImage('abc', loaded=True)
+        self.cache.load(self.session, self.image_id, self.callback, 3)
+        self.assertEqual(self.called[-1], ('abc', 3))
+
+    def test_store(self):
+        self.assertFalse(self.cache.store(FakeImage('abc')))
+        self.assertTrue(self.cache.store(
+            FakeImage('abc', loaded=True, image_id=self.image_id)))
+        self.assertEqual(self.cache.get(self.image_id), 'abc')
+
+    def test_memory_bytes(self):
+        self.cache.put('a' * 20, '1234')
+        self.cache.put('b' * 20, '5678')
+        self.cache.get('a' * 20)
+        self.cache.put('c' * 20, '9012')
+        self.assertEqual(self.cache.memory_bytes(), 8)
+        self.assertEqual(self.cache.get('a' * 20), '1234')
+        self.assertEqual(self.cache.get('b' * 20), None)
+        self.cache.put('d' * 20, 'x' * 11)
+        self.assertEqual(self.cache.get('d' * 20), None)
+
+    def test_album_cover(self):
+        self.cache.put(self.image_id, 'abc')
+        self.assertEqual(self.cache.album_cover(
+            self.session, FakeAlbum(self.image_id), self.callback), 'abc')
+        self.cache.album_cover(self.session, FakeAlbum(None), self.callback)
+        self.assertEqual(self.called, [('abc', None), (None, None)])
+        self.assertEqual(self.session.created, [])
+
+class TestDiskTier(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_persists(self):
+        cache = ImageCache(path=self.path)
+        cache.put('a' * 20, 'data')
+        cache = ImageCache(path=self.path)
+        self.assertEqual(cache.disk_bytes(), 4)
+        self.assertEqual(cache.get('a' * 20), 'data')
+        self.assertEqual(cache.stats()['disk_hits'], 1)
+        self.assertEqual(cache.get('a' * 20), 'data')
+        self.assertEqual(cache.stats()['hits'], 1)
+
+    def test_disk_bytes(self):
+        cache = ImageCache(max_bytes=0, path=self.path, max_disk_bytes=10)
+        cache.put('a' * 20, '1234')
+        cache.put('b' * 20, '5678')
+        cache.get('a' * 20)
+        cache.put('c' * 20, '9012')
+        self.assertEqual(cache.disk_bytes(), 8)
+        self.assertEqual(sorted(os.listdir(self.path)),
+                         ['61' * 20, '63' * 20])
+
+    def test_removes_partial_writes(self):
+        open(os.path.join(self.path, 'abc.tmp'), 'w').close()
+        ImageCache(path=self.path)
+        self.assertEqual(os.listdir(self.path), [])
+
+    def test_disk_written_without_lock(self):
+        cache = ImageCache(path=self.path)
+        acquired = []
+        def acquire():
+            # The lock is free if another thread can take it
+            if cache._lock.acquire(False):
+                cache._lock.release()
+                acquired.append(True)
+        write = os.write
+        def check_write(fd, data):
+            thread = threading.Thread(target=acquire)
+            thread.start()
+            thread.join()
+            return write(fd, data)
+        os.write = check_write
+        try:
+            cache.put('a' * 20, 'data')
+        finally:
+            os.write = write
+        self.assertEqual(acquired, [True])
+
+    def test_clear(self):
+        cache = ImageCache(path=self.path)
+        cache.put('a' * 20, 'data')
+        cache.clear()
+        self.assertEqual(os.listdir(self.path), [])
+        self.assertEqual(cache.get('a' * 20), None)
@@ -73,3 +73,18 @@ class TestLink(unittest.TestCase):
         s = "spotify:track:str_test"
         l = Link.from_string(s)
         self.assertEqual(str(l), "spotify:track:str_test")
+
+    def test_resolve_many(self):
+        objects = Link.resolve_many(["spotify:track:test_track",
+                                     u"spotify:album:test_album",
+                                     "BADLINK",
+                                     "spotify:artist:test_artist"])
+        self.assertEqual(len(objects), 4)
+        self.assertEqual(objects[0], self.track)
+        self.assertEqual(objects[1], self.album)
+        self.assertTrue(isinstance(objects[2], SpotifyError))
+        self.assertEqual(objects[3], self.artist)
+
+    def test_resolve_many_bad_argument(self):
+        self.assertRaises(TypeError, Link.resolve_many, 42)
+        self.assertRaises(TypeError, Link.resolve_many, ["spotify:track:a", 1])
@@ -0,0 +1,115 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from spotify._mockspotify import mock_album, mock_artist, mock_track
+from spotify._mockspotify import mock_user, registry_add, registry_clean
+from spotify.metadatacache import MetadataCache, object_metadata, object_uri
+
+class TestMetadataCache(unittest.TestCase):
+
+    artist = mock_artist('artist')
+    album = mock_album('album', artist, 2012)
+    track = mock_track('track', [artist], album, 60000, 42, 1, 3)
+    loading = mock_track('loading', [artist], album, is_loaded=0)
+
+    def setUp(self):
+        registry_add('spotify:artist:test_artist', self.artist)
+        registry_add('spotify:album:test_album', self.album)
+        registry_add('spotify:track:test_track', self.track)
+        registry_add('spotify:track:loading', self.loading)
+        self.now = 1000
+        self.cache = MetadataCache(ttl=60, max_entries=3)
+        self.cache._time = lambda: self.now
+
+    def tearDown(self):
+        self.cache.close()
+        registry_clean()
+
+    def test_put_get(self):
+        self.cache.put('spotify:artist:a', {'name': u'a'})
+        self.assertEqual(self.cache.get('spotify:artist:a'), {'name': u'a'})
+        self.assertEqual(self.cache.get('spotify:artist:b'), None)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_ttl(self):
+        self.cache.put('spotify:artist:a', {'name': u'a'})
+        self.now += 61
+        self.assertEqual(self.cache.get('spotify:artist:a'), None)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_lru(self):
+        for name in 'abc':
+            self.cache.put('spotify:artist:' + name, {'name': name})
+            self.now += 1
+        self.cache.get('spotify:artist:a')
+        self.now += 1
+        self.cache.put('spotify:artist:d', {'name': u'd'})
+        self.assertEqual(len(self.cache), 3)
+        self.assertEqual(self.cache.get('spotify:artist:b'), None)
+        self.assertNotEqual(self.cache.get('spotify:artist:a'), None)
+
+    def test_reads_do_not_write(self):
+        self.cache.put('spotify:artist:a', {'name': u'a'})
+        changes = self.cache._db.total_changes
+        for i in range(10):
+            self.cache.get('spotify:artist:a')
+        self.assertEqual(self.cache._db.total_changes, changes)
+        self.cache.flush()
+        self.assertEqual(self.cache._db.total_changes, changes + 1)
+        self.now += 31
+        self.cache.get('spotify:artist:a')
+        self.assertEqual(self.cache._db.total_changes, changes + 2)
+
+    def test_lookup_unchanged(self):
+        self.cache.lookup(self.track)
+        changes = self.cache._db.total_changes
+        self.cache.lookup(self.track)
+        self.assertEqual(self.cache._db.total_changes, changes)
+        self.now += 31
+        self.cache.lookup(self.track)
+        self.assertNotEqual(self.cache._db.total_changes, changes)
+
+    def test_track_metadata(self):
+        self.assertEqual(object_uri(self.track), 'spotify:track:test_track')
+        metadata = object_metadata(self.track)
+        self.assertEqual(metadata['name'], 'track')
+        self.assertEqual(metadata['artists'], ['artist'])
+        self.assertEqual(metadata['artists_uri'],
+                         ['spotify:artist:test_artist'])
+        self.assertEqual(metadata['album_uri'], 'spotify:album:test_album')
+        self.assertEqual(metadata['duration'], 60000)
+
+    def test_user_uri(self):
+        self.assertEqual(object_uri(mock_user(u'us\xe9r')),
+                         'spotify:user:us\xc3\xa9r')
+
+    def test_lookup(self):
+        self.assertEqual(self.cache.lookup(self.loading), None)
+        self.cache.put('spotify:track:loading', {'name': u'cached'})
+        self.assertEqual(self.cache.lookup(self.loading), {'name': u'cached'})
+        self.assertEqual(self.cache.lookup(self.track)['name'], 'track')
+        self.assertEqual(
+            self.cache.get('spotify:track:test_track')['popularity'], 42)
+
+    def test_store(self):
+        self.assertEqual(self.cache.store(self.track, self.loading,
+                                          self.album), 2)
+        self.assertEqual(
+            self.cache.get('spotify:album:test_album')['year'], 2012)
+
+    def test_persistent(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'metadata.db')
+            cache = MetadataCache(path)
+            cache.store(self.artist)
+            cache.close()
+            cache = MetadataCache(path)
+            self.assertEqual(len(cache), 1)
+            self.assertEqual(cache.get('spotify:artist:test_artist'),
+                             {'type': 'artist', 'name': 'artist'})
+            cache.close()
+        finally:
+            shutil.rmtree(directory)
@@ -1,5 +1,6 @@
 # encoding: utf-8
 
+import array
 import unittest
 from nose.tools import raises
 
@@ -29,6 +30,21 @@ class TestPlaylistContainer(unittest.TestCase):
             return pc[2]
         self.assertRaises(IndexError, _)
 
+    def test_slice(self):
+        pc = mock_playlistcontainer(self.owner, [self.p1, self.p2])
+        self.assertEqual(pc[-1].name(), "bar")
+        self.assertRaises(IndexError, lambda: pc[-3])
+        self.assertEqual([p.name() for p in pc[:]], ["foo", "bar"])
+        self.assertEqual([p.name() for p in pc[::-1]], ["bar", "foo"])
+        self.assertEqual(pc[2:], [])
+
+    def test_playlists(self):
+        f1 = mock_playlistfolder("folder_start", "foo", folder_id=42)
+        f2 = mock_playlistfolder("folder_end", "")
+        pc = mock_playlistcontainer(self.owner, [self.p1, f1, self.p2, f2])
+        self.assertEqual(len(pc[:]), 4)
+        self.assertEqual(pc.playlists(), [self.p1, self.p2])
+
     def test_add_new_playlist(self):
         pc = mock_playlistcontainer(self.owner, [])
         pc.add_new_playlist('foo');
@@ -97,6 +113,29 @@ class TestPlaylist(unittest.TestCase):
         self.assertEqual(playlist[1].name(), 'track2')
         self.assertEqual(playlist[2].name(), 'track3')
 
+    def test_negative_index(self):
+        playlist = mock_playlist(u'foo', self.tracks, self.owner)
+        self.assertEqual(playlist[-1].name(), 'track3')
+        self.assertEqual(playlist[-3].name(), 'track1')
+        self.assertRaises(IndexError, lambda: playlist[-4])
+        self.assertRaises(IndexError, lambda: playlist[3])
+
+    def test_slice(self):
+        playlist = mock_playlist(u'foo', self.tracks, self.owner)
+        self.assertEqual(playlist[:], self.pure_tracks)
+        self.assertEqual(playlist[1:], self.pure_tracks[1:])
+        self.assertEqual(playlist[-2:], self.pure_tracks[-2:])
+        self.assertEqual(playlist[::2], self.pure_tracks[::2])
+        self.assertEqual(playlist[::-1], self.pure_tracks[::-1])
+        self.assertEqual(playlist[5:10], [])
+        self.assertRaises(TypeError, lambda: playlist['a'])
+
+    def test_sq_item_same_wrapper(self):
+        playlist = mock_playlist(u'foo', self.tracks, self.owner)
+        self.assertTrue(playlist[0] is self.pure_tracks[0])
+        self.assertEqual(playlist[1], self.pure_tracks[1])
+        self.assertNotEqual(playlist[1], self.pure_tracks[2])
+
     def test_num_subscribers(self):
         playlist = mock_playlist('foo', [], self.owner, num_subscribers=42)
         self.assertEqual(playlist.num_subscribers(), 42)
@@ -120,6 +159,59 @@ class TestPlaylist(unittest.TestCase):
         self.assertRaises(TypeError, playlist.add_tracks, 0, True)
         self.assertRaises(TypeError, playlist.add_tracks, [False])
 
+    def test_add_tracks_iterable(self):
+        playlist = mock_playlist('foo', [], self.owner)
+        playlist.add_tracks(0, iter(self.pure_tracks))
+        self.assertEqual(playlist[:], self.pure_tracks)
+
+    def test_add_tracks_chunks(self):
+        playlist = mock_playlist('foo', [], self.owner)
+        progress = []
+        playlist.add_tracks(0, self.pure_tracks * 3, chunk_size=4,
+                            progress=lambda *args: progress.append(args))
+        self.assertEqual(progress, [(4, 9), (8, 9), (9, 9)])
+        self.assertEqual(playlist[:], self.pure_tracks * 3)
+
+    def test_add_tracks_progress_error(self):
+        playlist = mock_playlist('foo', [], self.owner)
+        def progress(done, total):
+            raise ValueError()
+        self.assertRaises(ValueError, playlist.add_tracks, 0,
+                          self.pure_tracks, chunk_size=2, progress=progress)
+        self.assertEqual(len(playlist), 2)
+
+    def test_remove_tracks(self):
+        playlist = mock_playlist('foo', self.tracks, self.owner)
+        playlist.remove_tracks([2, 0])
+        self.assertEqual(playlist[:], self.pure_tracks[1:2])
+
+    def test_remove_tracks_chunks(self):
+        playlist = mock_playlist('foo', self.tracks * 3, self.owner)
+        progress = []
+        playlist.remove_tracks(xrange(0, 9, 2), chunk_size=2,
+                               progress=lambda *args: progress.append(args))
+        self.assertEqual(progress, [(2, 5), (4, 5), (5, 5)])
+        self.assertEqual(playlist[:], (self.pure_tracks * 3)[1::2])
+
+    def test_remove_tracks_wrong_index(self):
+        playlist = mock_playlist('foo', self.tracks, self.owner)
+        self.assertRaises(IndexError, playlist.remove_tracks, [0, 3])
+        self.assertRaises(IndexError, playlist.remove_tracks, [-1])
+        self.assertRaises(TypeError, playlist.remove_tracks, ['a'])
+        self.assertEqual(len(playlist), 3)
+
+    def test_reorder_tracks(self):
+        playlist = mock_playlist('foo', self.tracks, self.owner)
+        playlist.reorder_tracks([0], 3)
+        self.assertEqual(playlist[:],
+                         self.pure_tracks[1:] + self.pure_tracks[:1])
+
+    def test_reorder_tracks_wrong_index(self):
+        playlist = mock_playlist('foo', self.tracks, self.owner)
+        self.assertRaises(IndexError, playlist.reorder_tracks, [3], 0)
+        self.assertRaises(IndexError, playlist.reorder_tracks, [0], 4)
+        self.assertRaises(TypeError, playlist.reorder_tracks, ['a'], 0)
+
     def test_track_create_time(self):
         playlist = mock_playlist('foo', self.tracks, self.owner)
         self.assertEqual(playlist.track_create_time(0), 1320961109)
@@ -128,3 +220,44 @@ class TestPlaylist(unittest.TestCase):
         playlist = mock_playlist('foo', [], self.owner)
         self.assertEqual(playlist.owner().canonical_name(),
                          self.owner.canonical_name())
+
+    def test_tracks_metadata(self):
+        tracks = [
+            (mock_track(u'trâck1', [self.artist], self.album, 10, 20),
+             self.owner, 1320961109),
+            (mock_track('track2', [self.artist], self.album, 30, 40),
+             self.owner, 1320961110),
+        ]
+        playlist = mock_playlist('foo', tracks, self.owner)
+        metadata = playlist.tracks_metadata(
+            ['name', 'artists', 'album', 'duration', 'popularity',
+             'create_time'])
+        self.assertEqual(sorted(metadata.keys()),
+                         ['album', 'artists', 'create_time', 'duration',
+                          'name', 'popularity'])
+        self.assertEqual(metadata['name'], [u'trâck1', u'track2'])
+        self.assertEqual(metadata['artists'], [(u'artist',), (u'artist',)])
+        self.assertEqual(metadata['album'], [u'album', u'album'])
+        self.assertEqual(metadata['duration'], array.array('i', [10, 30]))
+        self.assertEqual(metadata['popularity'], array.array('i', [20, 40]))
+        self.assertEqual(metadata['create_time'],
+                         array.array('i', [1320961109, 1320961110]))
+
+    def test_tracks_metadata_all_fields(self):
+        playlist = mock_playlist('foo', self.tracks, self.owner)
+        metadata = playlist.tracks_metadata()
+        self.assertEqual(sorted(metadata.keys()),
+                         ['album', 'artists', 'create_time', 'disc',
+                          'duration', 'index', 'is_loaded', 'name',
+                          'popularity', 'uri'])
+        for column in metadata.values():
+            self.assertEqual(len(column), 3)
+
+    def test_tracks_metadata_empty(self):
+        playlist = mock_playlist('foo', [], self.owner)
+        metadata = playlist.tracks_metadata(['name', 'duration'])
+        self.assertEqual(metadata, {'name': [], 'duration': array.array('i')})
+
+    def test_tracks_metadata_unknown_field(self):
+        playlist = mock_playlist('foo', self.tracks, self.owner)
+        self.assertRaises(ValueError, playlist.tracks_metadata, ['foo'])
@@ -3,6 +3,8 @@ from spotify._mockspotify import mock_playlist, mock_event_trigger
 from spotify._mockspotify import mock_album, mock_artist, mock_user, mock_track
 from spotify.manager import SpotifyPlaylistManager
 from spotify._mockspotify import User, Playlist
+from spotify import SpotifyError
+from tests import FakePlaylist
 
 callback_called = None
 
@@ -294,3 +296,125 @@ class TestPlaylistManager(unittest.TestCase):
         self.assertEqual(args[1].name(), self.playlist.name())
         self.assertEqual(type(args[2]), bytes)
         self.assertEqual(args[2], '01234567890123456789')
+
+    def test_watch_many_playlists(self):
+        global callback_called
+        playlists = [mock_playlist('pl%d' % i, [], self.owner)
+                     for i in range(1000)]
+        for playlist in playlists:
+            self.manager.watch(playlist)
+        mock_event_trigger(20, playlists[500])
+        self.assertEqual(callback_called[0], 'tracks_added')
+        self.assertEqual(callback_called[1][1], playlists[500])
+
+        for playlist in playlists:
+            self.manager.unwatch(playlist)
+        callback_called = None
+        mock_event_trigger(20, playlists[500])
+        self.assertEqual(callback_called, None)
+
+    def test_watch_dispatches_all_events(self):
+        global callback_called
+        playlist = mock_playlist('watched', [], self.owner)
+        self.manager.watch(playlist, 'userdata')
+        for code, name in [(20, 'tracks_added'), (23, 'playlist_renamed'),
+                           (25, 'playlist_update_in_progress'),
+                           (32, 'image_changed')]:
+            callback_called = None
+            mock_event_trigger(code, playlist)
+            self.assertEqual(callback_called[0], name)
+            self.assertEqual(callback_called[1][0], self.manager)
+            self.assertEqual(callback_called[1][1], playlist)
+            self.assertEqual(callback_called[1][-1], 'userdata')
+        self.manager.unwatch(playlist, 'userdata')
+
+    def test_remove_manager(self):
+        global callback_called
+        playlist = mock_playlist('managed', [], self.owner)
+        playlist.add_manager(self.manager)
+        self.assertRaises(SpotifyError, playlist.remove_manager,
+                          self.manager, 'other')
+        playlist.remove_manager(self.manager)
+        self.assertRaises(SpotifyError, playlist.remove_manager,
+                          self.manager)
+        mock_event_trigger(23, playlist)
+        self.assertEqual(callback_called, None)
+
+
+class CoalescingPlaylistManager(SpotifyPlaylistManager):
+
+    coalesce_changes = True
+
+    def __init__(self):
+        # Does not call the __init__ of SpotifyPlaylistManager, which has none
+        self.calls = []
+
+    def tracks_added(self, playlist, tracks, position, userdata):
+        self.calls.append(('tracks_added', tracks, position))
+
+    def tracks_changed(self, playlist, removed, added, moved, userdata):
+        self.calls.append(('tracks_changed', removed, added, moved))
+
+    def playlist_update_in_progress(self, playlist, done, userdata):
+        self.calls.append(('playlist_update_in_progress', done))
+
+
+class TestCoalescedChanges(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = CoalescingPlaylistManager()
+        self.playlist = FakePlaylist(range(5))
+        self.manager.watch(self.playlist)
+        self.events = self.playlist.managers[0][0]
+
+    def test_outside_update(self):
+        self.events.tracks_added(self.playlist, ['a'], 1, None)
+        self.assertEqual(self.manager.calls, [('tracks_added', ['a'], 1)])
+
+    def test_changes_merged(self):
+        self.events.playlist_update_in_progress(self.playlist, False, None)
+        # 0 1 a b 2 3 4
+        self.events.tracks_added(self.playlist, ['a', 'b'], 2, None)
+        # 1 a b 2 4
+        self.events.tracks_removed(self.playlist, [0, 5], None)
+        # 4 1 a b 2
+        self.events.tracks_moved(self.playlist, [4], 0, None)
+        # 4 1 a b 2 c
+        self.events.tracks_added(self.playlist, ['c'], 5, None)
+        # 4 1 b 2 c
+        self.events.tracks_removed(self.playlist, [2], None)
+        self.playlist.uris = [4, 1, 'b', 2, 'c']
+        self.events.playlist_update_in_progress(self.playlist, True, None)
+        self.assertEqual(self.manager.calls, [
+            ('playlist_update_in_progress', False),
+            ('tracks_changed', [0, 3], [(2, ['b']), (4, ['c'])], [(4, 0)]),
+            ('playlist_update_in_progress', True),
+        ])
+
+    def test_track_counts(self):
+        self.playlist.uris[1:1] = ['a', 'b']
+        self.events.tracks_added_count(self.playlist, 2, 1, None)
+        self.events.playlist_update_in_progress(self.playlist, False, None)
+        self.playlist.uris.append('c')
+        self.events.tracks_added_count(self.playlist, 1, 7, None)
+        self.events.playlist_update_in_progress(self.playlist, True, None)
+        self.assertEqual(self.manager.calls, [
+            ('tracks_added', ['a', 'b'], 1),
+            ('playlist_update_in_progress', False),
+            ('tracks_changed', [], [(7, ['c'])], []),
+            ('playlist_update_in_progress', True),
+        ])
+
+    def test_no_changes(self):
+        self.events.playlist_update_in_progress(self.playlist, False, None)
+        self.events.tracks_added(self.playlist, ['a'], 0, None)
+        self.events.tracks_removed(self.playlist, [0], None)
+        self.events.playlist_update_in_progress(self.playlist, True, None)
+        self.assertEqual(self.manager.calls, [
+            ('playlist_update_in_progress', False),
+            ('playlist_update_in_progress', True),
+        ])
+
+    def test_unwatch(self):
+        self.manager.unwatch(self.playlist)
+        self.assertEqual(self.playlist.managers, [])
@@ -0,0 +1,95 @@
+import random
+import unittest
+
+from spotify.manager import PlaylistSynchronizer
+from tests import FakePlaylist
+
+class TestPlaylistSynchronizer(unittest.TestCase):
+
+    def setUp(self):
+        self.results = []
+
+    def callback(self, playlist, ok, userdata):
+        self.results.append((ok, userdata))
+
+    def sync(self, current, target):
+        playlist = FakePlaylist(current)
+        PlaylistSynchronizer(playlist).sync(target, self.callback, 1)
+        self.assertEqual(playlist.uris, list(target))
+        self.assertEqual(playlist.managers, [])
+        self.assertEqual(self.results[-1], (True, 1))
+        return playlist.calls
+
+    def test_unchanged(self):
+        self.assertEqual(self.sync('abc', 'abc'), [])
+
+    def test_diff(self):
+        synchronizer = PlaylistSynchronizer(FakePlaylist('abcdef'))
+        self.assertEqual(synchronizer.diff('axcfbdy'), [
+            ('remove', [4]), ('move', [1, 3], 5), ('add', 1, ['x']),
+            ('add', 6, ['y'])])
+
+    def test_batched(self):
+        self.assertEqual(self.sync('abcdefgh', 'efghabcd'), ['move'])
+        self.assertEqual(self.sync('abcdefgh', 'axyzdh'),
+                         ['remove', 'add'])
+        self.assertEqual(self.sync(['x'] * 500, []), ['remove'])
+        self.assertEqual(self.sync([], ['x'] * 500), ['add'])
+
+    def test_duplicates(self):
+        self.sync('aabab', 'babaa')
+        self.sync('abcabc', 'cba')
+
+    def test_random(self):
+        rng = random.Random(0)
+        for i in range(200):
+            current = [rng.choice('abcdefgh')
+                       for i in range(rng.randint(0, 20))]
+            target = [rng.choice('abcdefghij')
+                      for i in range(rng.randint(0, 20))]
+            self.sync(current, target)
+
+    def test_failed(self):
+        playlist = FakePlaylist('ab')
+        playlist.add_tracks = lambda position, tracks: \
+            FakePlaylist.add_tracks(playlist, position, ['z'])
+        PlaylistSynchronizer(playlist).sync('abc', self.callback)
+        self.assertEqual(self.results, [(False, None)])
+        self.assertEqual(playlist.managers, [])
+
+    def test_chunked(self):
+        # libspotify may notify the tracks of a call in several callbacks
+        playlist = FakePlaylist('ab')
+        def add_tracks(position, tracks):
+            for i, track in enumerate(tracks):
+                FakePlaylist.add_tracks(playlist, position + i, [track])
+        playlist.add_tracks = add_tracks
+        PlaylistSynchronizer(playlist).sync('axyzb', self.callback)
+        self.assertEqual(self.results, [(True, None)])
+        self.assertEqual(playlist.managers, [])
+
+    def test_read_once_notified(self):
+        playlist = FakePlaylist('abcdefgh')
+        reads = []
+        def tracks_metadata(fields):
+            reads.append(fields)
+            return FakePlaylist.tracks_metadata(playlist, fields)
+        playlist.tracks_metadata = tracks_metadata
+        PlaylistSynchronizer(playlist).sync('hgfedcba', self.callback)
+        self.assertTrue(playlist.calls.count('move') > 1)
+        # Once for the changes to make, once to check the result
+        self.assertEqual(len(reads), 2)
+        self.assertEqual(self.results, [(True, None)])
+
+    def test_cancel(self):
+        playlist = FakePlaylist('ab')
+        playlist.add_tracks = lambda position, tracks: None
+        synchronizer = PlaylistSynchronizer(playlist)
+        synchronizer.sync('abc', self.callback)
+        self.assertEqual(self.results, [])
+        self.assertRaises(RuntimeError, synchronizer.sync, 'a')
+        synchronizer.cancel()
+        self.assertEqual(self.results, [(False, None)])
+        self.assertEqual(playlist.managers, [])
+        synchronizer.sync('a', self.callback)
+        self.assertEqual(self.results[-1], (True, None))
@@ -0,0 +1,196 @@
+import threading
+import unittest
+
+import spotify.requestcache
+from spotify import _mockspotify
+# monkeypatch for testing
+spotify.requestcache.spotify = _mockspotify
+
+from spotify.requestcache import BrowseCache, SearchCache, normalize_query
+from spotify._mockspotify import mock_album, mock_albumbrowse, mock_artist
+from spotify._mockspotify import mock_toplistbrowse, mock_track
+from spotify._mockspotify import registry_add, registry_clean
+from spotify._mockspotify import AlbumBrowser, ToplistBrowser
+
+class FakeResults(object):
+
+    def __init__(self, query, error=0):
+        self.query = query
+        self._error = error
+
+    def error(self):
+        return self._error
+
+class FakeSession(object):
+    """Stands in for a session, completing searches on demand"""
+
+    def __init__(self):
+        self.searches = []
+        self.error = 0
+
+    def search(self, query, callback, **kwargs):
+        results = FakeResults(query, self.error)
+        self.searches.append((results, callback, kwargs))
+        return results
+
+    def complete(self):
+        for results, callback, kwargs in self.searches:
+            callback(results, None)
+
+class TestSearchCache(unittest.TestCase):
+
+    def setUp(self):
+        self.session = FakeSession()
+        self.cache = SearchCache(max_entries=2, ttl=60)
+        self.now = 1000
+        self.cache._time = lambda: self.now
+        self.called = []
+
+    def callback(self, results, userdata):
+        self.called.append((results, userdata))
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query('  Foo \t  BAR '), u'Foo BAR')
+        self.assertEqual(normalize_query('\xc3\x89t\xc3\xa9'),
+                         u'\xc9t\xe9')
+
+    def test_query_given_as_is(self):
+        self.cache.search(self.session, ' foo  AND bar')
+        self.cache.search(self.session, 'FOO and bar')
+        self.assertEqual([results.query for results, callback, kwargs
+                          in self.session.searches],
+                         [' foo  AND bar', 'FOO and bar'])
+
+    def test_coalesce_in_flight(self):
+        first = self.cache.search(self.session, 'foo', self.callback,
+                                  userdata=1)
+        second = self.cache.search(self.session, ' foo ', self.callback,
+                                   userdata=2)
+        self.assertTrue(first is second)
+        self.assertEqual(len(self.session.searches), 1)
+        self.assertEqual(self.called, [])
+        self.session.complete()
+        self.assertEqual(self.called, [(first, 1), (first, 2)])
+        self.assertEqual(self.cache.stats(),
+            {'hits': 0, 'misses': 1, 'coalesced': 1, 'entries': 1})
+
+    def test_coalesce_while_starting(self):
+        started = threading.Event()
+        release = threading.Event()
+        session = self.session
+        class SlowSession(object):
+            def search(self, query, callback, **kwargs):
+                started.set()
+                release.wait()
+                return session.search(query, callback, **kwargs)
+        first = []
+        thread = threading.Thread(target=lambda: first.append(
+            self.cache.search(SlowSession(), 'foo')))
+        thread.start()
+        started.wait()
+        threading.Timer(0.05, release.set).start()
+        second = self.cache.search(self.session, 'foo')
+        thread.join()
+        self.assertNotEqual(second, None)
+        self.assertTrue(second is first[0])
+
+    def test_start_error(self):
+        class FailingSession(object):
+            def search(self, query, callback, **kwargs):
+                self.cache.search(session, 'foo', self.callback, userdata=2)
+                raise ValueError()
+        session = FailingSession()
+        session.cache = self.cache
+        session.callback = self.callback
+        self.assertRaises(ValueError, self.cache.search, session, 'foo',
+                          self.callback, userdata=1)
+        self.assertEqual(self.called, [(None, 2)])
+        self.cache.search(self.session, 'foo')
+        self.assertEqual(len(self.session.searches), 1)
+
+    def test_hit(self):
+        results = self.cache.search(self.session, 'foo')
+        self.session.complete()
+        self.assertTrue(self.cache.search(self.session, 'foo ', self.callback,
+                                          userdata=3) is results)
+        self.assertEqual(self.called, [(results, 3)])
+        self.assertEqual(len(self.session.searches), 1)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_offsets_in_key(self):
+        self.cache.search(self.session, 'foo')
+        self.cache.search(self.session, 'foo', track_offset=32)
+        self.assertEqual(len(self.session.searches), 2)
+        self.assertEqual(self.session.searches[1][2]['track_offset'], 32)
+
+    def test_ttl(self):
+        self.cache.search(self.session, 'foo')
+        self.session.complete()
+        self.now += 61
+        self.cache.search(self.session, 'foo')
+        self.assertEqual(len(self.session.searches), 2)
+
+    def test_lru(self):
+        for query in ['a', 'b', 'a', 'c']:
+            self.cache.search(self.session, query)
+            self.session.complete()
+            self.session.searches = []
+        self.cache.search(self.session, 'a')
+        self.assertEqual(self.session.searches, [])
+        self.cache.search(self.session, 'b')
+        self.assertEqual(len(self.session.searches), 1)
+
+    def test_errors_not_cached(self):
+        self.session.error = 1
+        self.cache.search(self.session, 'foo')
+        self.session.complete()
+        self.assertEqual(len(self.cache), 0)
+
+    def test_failing_callback(self):
+        def failing(results, userdata):
+            raise ValueError()
+        self.cache.search(self.session, 'foo', failing)
+        self.cache.search(self.session, 'foo', self.callback)
+        self.session.complete()
+        self.assertEqual(len(self.called), 1)
+
+class TestBrowseCache(unittest.TestCase):
+
+    artist = mock_artist('artist')
+    album = mock_album('album', artist)
+    track = mock_track('track', [artist], album)
+
+    def setUp(self):
+        registry_add('spotify:album:1234', self.album)
+        registry_add('spotify:albumbrowse:1234',
+                     mock_albumbrowse(self.album, [self.track]))
+        registry_add('spotify:toplist:tracks:FR',
+                     mock_toplistbrowse([], [], [self.track]))
+        self.cache = BrowseCache()
+        self.called = []
+
+    def tearDown(self):
+        registry_clean()
+
+    def callback(self, browser, userdata):
+        self.called.append((browser, userdata))
+
+    def test_browse_album(self):
+        self.assertEqual(type(self.cache.browse_album(self.album,
+                                                      self.callback, 1)),
+                         AlbumBrowser)
+        # The mock completes browsing right away
+        browser = self.called[0][0]
+        self.assertTrue(self.cache.browse_album(self.album, self.callback,
+                                                2) is browser)
+        self.assertEqual(self.called, [(browser, 1), (browser, 2)])
+        self.assertEqual(self.cache.stats(),
+            {'hits': 1, 'misses': 1, 'coalesced': 0, 'entries': 1})
+
+    def test_toplist(self):
+        self.cache.toplist('tracks', 'FR', self.callback)
+        browser = self.called[0][0]
+        self.assertEqual(type(browser), ToplistBrowser)
+        self.assertEqual(browser[0].name(), 'track')
+        self.assertTrue(self.cache.toplist('tracks', 'FR') is browser)
+        self.assertEqual(self.cache.hits, 1)
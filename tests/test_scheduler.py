@@ -0,0 +1,120 @@
+import unittest
+
+from spotify.manager import RequestScheduler, INTERACTIVE, BATCH
+
+class FakeRequest(object):
+
+    def __init__(self, name, complete):
+        self.name = name
+        self.complete = complete
+
+class TestRequestScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = RequestScheduler({'search': 2},
+                                          default_max_in_flight=1)
+        self.started = []
+        self.completed = []
+
+    def submit(self, name, type='search', **kwargs):
+        def start(complete):
+            request = FakeRequest(name, complete)
+            self.started.append(request)
+            return request
+        return self.scheduler.submit(type, start, self.callback, name,
+                                     **kwargs)
+
+    def callback(self, result, userdata):
+        self.completed.append((result.name, userdata))
+
+    def complete(self, name):
+        for request in self.started:
+            if request.name == name:
+                request.complete(request, None)
+
+    def names(self):
+        return [request.name for request in self.started]
+
+    def test_limits_in_flight(self):
+        for i in range(5):
+            self.submit(i)
+        self.assertEqual(self.names(), [0, 1])
+        self.assertEqual(self.scheduler.in_flight('search'), 2)
+        self.assertEqual(self.scheduler.queued('search'), 3)
+        self.complete(1)
+        self.assertEqual(self.completed, [(1, 1)])
+        self.assertEqual(self.names(), [0, 1, 2])
+        self.complete(0)
+        self.complete(2)
+        self.complete(3)
+        self.complete(4)
+        self.assertEqual(self.names(), [0, 1, 2, 3, 4])
+        self.assertEqual(self.scheduler.in_flight('search'), 0)
+        self.assertEqual(self.scheduler.queued('search'), 0)
+
+    def test_types_are_independent(self):
+        self.submit('a', type='image')
+        self.submit('b', type='image')
+        self.submit('c')
+        self.assertEqual(self.names(), ['a', 'c'])
+        self.assertEqual(self.scheduler.queued('image'), 1)
+
+    def test_completes_once(self):
+        self.submit('a', type='image')
+        self.submit('b', type='image')
+        self.complete('a')
+        self.complete('a')
+        self.assertEqual(self.completed, [('a', 'a')])
+        self.assertEqual(self.scheduler.in_flight('image'), 1)
+
+    def test_interactive_first(self):
+        self.submit('a', type='image')
+        self.submit('b1', type='image', priority=BATCH)
+        self.submit('b2', type='image', priority=BATCH)
+        self.submit('i', type='image', priority=INTERACTIVE)
+        self.complete('a')
+        self.assertEqual(self.names(), ['a', 'i'])
+        self.complete('i')
+        self.complete('b1')
+        self.assertEqual(self.names(), ['a', 'i', 'b1', 'b2'])
+
+    def test_fair_queuing(self):
+        self.submit('a', type='image')
+        for i in range(3):
+            self.submit('x%d' % i, type='image', owner='x')
+        self.submit('y0', type='image', owner='y')
+        self.submit('y1', type='image', owner='y')
+        for name in ['a', 'x0', 'y0', 'x1', 'y1']:
+            self.complete(name)
+        self.assertEqual(self.names(), ['a', 'x0', 'y0', 'x1', 'y1', 'x2'])
+
+    def test_cancel(self):
+        self.assertFalse(self.submit('a', type='image').cancel())
+        scheduled = self.submit('b', type='image')
+        self.submit('c', type='image')
+        self.assertTrue(scheduled.cancel())
+        self.assertFalse(scheduled.cancel())
+        self.complete('a')
+        self.assertEqual(self.names(), ['a', 'c'])
+
+    def test_synchronous_completion(self):
+        def start(complete):
+            request = FakeRequest(len(self.started), complete)
+            self.started.append(request)
+            complete(request, None)
+            return request
+        for i in range(1000):
+            self.scheduler.submit('image', start, self.callback)
+        self.assertEqual(len(self.completed), 1000)
+        self.assertEqual(self.scheduler.in_flight('image'), 0)
+
+    def test_start_error(self):
+        def start(complete):
+            raise ValueError()
+        self.scheduler.submit('image', start, self.failed, 'x')
+        self.submit('a', type='image')
+        self.assertEqual(self.names(), ['a'])
+        self.assertEqual(self.completed, [(None, 'x')])
+
+    def failed(self, result, userdata):
+        self.completed.append((result, userdata))
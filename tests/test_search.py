@@ -38,6 +38,28 @@ class TestSearch(unittest.TestCase):
                         ['track11', 'track12', 'track13',
                          'track21', 'track22', 'track23'])
 
+    def test_tracks_view(self):
+        tracks = self.search.tracks()
+        self.assertEqual(len(tracks), 6)
+        self.assertEqual(tracks[0].name(), 'track11')
+        self.assertEqual(tracks[-1].name(), 'track23')
+        self.assertRaises(IndexError, lambda: tracks[6])
+        self.assertRaises(IndexError, lambda: tracks[-7])
+        self.assertRaises(TypeError, lambda: tracks['a'])
+        self.assertEqual([t.name() for t in tracks[1:5:2]],
+                         ['track12', 'track21'])
+        self.assertEqual([t.name() for t in tracks[::-3]],
+                         ['track23', 'track13'])
+        self.assertEqual(tracks[10:], [])
+        self.assertTrue(self.tracks[2] in tracks)
+
+    def test_view_keeps_results(self):
+        search = mock_search('query', self.tracks, self.albums, self.artists,
+                             6, 2, 2, 'query2', 0)
+        albums = search.albums()
+        del search
+        self.assertEqual([a.name() for a in albums], ['album1', 'album2'])
+
     def test_query(self):
         self.assertEqual(self.search.query(), "query")
 
@@ -2,14 +2,19 @@
 
 import unittest
 import threading
+import time
 
 from spotify import _mockspotify
 import spotify.manager.session
+from spotify import SpotifyError
 # monkeypatch for testing
 spotify.manager.session.spotify = spotify._mockspotify
 
 from spotify.manager import SpotifySessionManager
-from spotify._mockspotify import mock_track, mock_album
+from spotify._mockspotify import mock_track, mock_album, mock_artist
+from spotify._mockspotify import mock_toplistbrowse, ToplistBrowser
+from spotify._mockspotify import registry_add, registry_clean
+from spotify._mockspotify import mock_playlist, mock_user
 
 
 class BaseMockClient(SpotifySessionManager):
@@ -34,6 +39,170 @@ class BaseMockUnicodeClient(SpotifySessionManager):
         SpotifySessionManager.__init__(self, "username_good", "password_good")
         self.awoken = threading.Event() # used to block until awoken
 
+class FakeLoopSession(object):
+    """Stands in for a session, terminating the client after some rounds"""
+
+    def __init__(self, client, rounds, timeout, waker=None):
+        self.client = client
+        self.rounds = rounds
+        self.timeout = timeout
+        self.waker = waker
+        self.thread_counts = []
+
+    def process_events(self):
+        self.thread_counts.append(threading.activeCount())
+        if self.waker is not None:
+            self.waker.start()
+            self.waker = None
+        self.rounds -= 1
+        if self.rounds == 0:
+            self.client.terminate()
+        return self.timeout
+
+class FakeMetadataSession(object):
+    """Stands in for a session, counting metadata updates"""
+
+    def __init__(self):
+        self.updates = 0
+
+    def process_events(self):
+        return 10
+
+    def metadata_updates(self):
+        return self.updates
+
+class FakeLoadable(object):
+
+    def __init__(self, loaded=False):
+        self.loaded = loaded
+
+    def is_loaded(self):
+        return self.loaded
+
+class FakeResults(object):
+
+    def __init__(self, offset, count, total):
+        self._tracks = range(offset, min(offset + count, total))
+        self._total = total
+
+    def tracks(self):
+        return self._tracks
+
+    def total_tracks(self):
+        return self._total
+
+class FakeSearchSession(object):
+    """Stands in for a session, completing searches right away"""
+
+    def __init__(self, total):
+        self.total = total
+        self.requests = []
+        self.threads = set()
+
+    def process_events(self):
+        return 10
+
+    def metadata_updates(self):
+        return 0
+
+    def search(self, query, callback, userdata=None, **kwargs):
+        self.threads.add(threading.current_thread())
+        self.requests.append(kwargs)
+        results = FakeResults(kwargs['track_offset'], kwargs['track_count'],
+                              self.total)
+        callback(results, userdata)
+        return results
+
+class FakeHandle(object):
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+class FakeFuture(object):
+
+    def __init__(self):
+        self._done = False
+        self._cancelled = False
+        self._result = None
+        self._exception = None
+        self._callbacks = []
+
+    def done(self):
+        return self._done
+
+    def cancelled(self):
+        return self._cancelled
+
+    def add_done_callback(self, callback):
+        self._callbacks.append(callback)
+
+    def cancel(self):
+        if self._done:
+            return False
+        self._cancelled = True
+        self._finish()
+        return True
+
+    def set_result(self, result):
+        self._check_pending()
+        self._result = result
+        self._finish()
+
+    def set_exception(self, exception):
+        self._check_pending()
+        self._exception = exception
+        self._finish()
+
+    def result(self):
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+    def _check_pending(self):
+        # As asyncio's InvalidStateError
+        if self._done:
+            raise RuntimeError('The future is already done')
+
+    def _finish(self):
+        self._done = True
+        for callback in self._callbacks:
+            callback(self)
+
+class FakeEventLoop(object):
+    """Runs callbacks synchronously, ignoring call_later() delays"""
+
+    def __init__(self):
+        self.ready = []
+        self.timers = []
+
+    def call_soon_threadsafe(self, callback):
+        self.ready.append(FakeHandle(callback))
+
+    def call_later(self, delay, callback):
+        handle = FakeHandle(callback)
+        self.timers.append(handle)
+        return handle
+
+    def create_future(self):
+        return FakeFuture()
+
+    def run_until(self, condition, max_steps=100):
+        steps = 0
+        while not condition() and steps < max_steps:
+            steps += 1
+            handles = self.ready or self.timers
+            if self.ready:
+                self.ready = []
+            else:
+                self.timers = []
+            for handle in handles:
+                if not handle.cancelled:
+                    handle.callback()
+
 class TestSession(unittest.TestCase):
 
     def test_initialisation(self):
@@ -60,6 +229,219 @@ class TestSession(unittest.TestCase):
         c.connect()
         self.assertEqual(c.username, c.found_username)
 
+    def test_loop_does_not_start_threads(self):
+        c = BaseMockClient()
+        session = FakeLoopSession(c, 20, 1)
+        before = threading.activeCount()
+        c.loop(session)
+        self.assertEqual(session.thread_counts, [before] * 20)
+        self.assertEqual(threading.activeCount(), before)
+
+    def test_wake_interrupts_loop_timeout(self):
+        c = BaseMockClient()
+        woken = []
+        def wake():
+            woken.append(time.time())
+            c.wake()
+        waker = threading.Timer(0.1, wake)
+        session = FakeLoopSession(c, 2, 60 * 1000, waker)
+        c.loop(session)
+        returned = time.time()
+        waker.join()
+        self.assertTrue(returned - woken[0] < 0.01)
+
+    def test_event_loop(self):
+        class MockClient(BaseMockClient):
+            def logged_in(self, session, error):
+                self.found_username = session.username()
+                session.logout()
+                self.disconnect()
+
+        c = MockClient()
+        event_loop = FakeEventLoop()
+        session = c.connect(event_loop)
+        self.assertNotEqual(session, None)
+        event_loop.run_until(lambda: c.finished)
+        self.assertEqual(c.username, c.found_username)
+        self.assertEqual(event_loop.ready, [])
+        self.assertTrue(all(h.cancelled for h in event_loop.timers))
+
+    def test_callbacks_share_session(self):
+        class MockClient(BaseMockClient):
+            sessions = []
+            def logged_in(self, session, error):
+                self.sessions.append(session)
+                session.logout()
+                self.disconnect()
+            def logged_out(self, session):
+                self.sessions.append(session)
+
+        c = MockClient()
+        event_loop = FakeEventLoop()
+        session = c.connect(event_loop)
+        event_loop.run_until(lambda: c.finished)
+        self.assertTrue(len(c.sessions) > 0)
+        for s in c.sessions:
+            self.assertTrue(s is session)
+
+    def test_event_loop_wake(self):
+        c = BaseMockClient()
+        c.event_loop = FakeEventLoop()
+        c.wake()
+        self.assertEqual(len(c.event_loop.ready), 1)
+        self.assertFalse(c.awoken.isSet())
+
+    def test_toplist_future(self):
+        artist = mock_artist('artist')
+        album = mock_album('album', artist)
+        track = mock_track('track', [artist], album)
+        registry_add('spotify:toplist:tracks:FR',
+                     mock_toplistbrowse([], [], [track]))
+        try:
+            c = BaseMockClient()
+            c.event_loop = FakeEventLoop()
+            future = c.toplist_future('tracks', 'FR')
+            c.event_loop.run_until(future.done)
+            self.assertTrue(future.done())
+            self.assertEqual(type(future.result()), ToplistBrowser)
+            self.assertEqual(future.result()[0].name(), 'track')
+        finally:
+            registry_clean()
+
+    def test_future_without_event_loop(self):
+        c = BaseMockClient()
+        self.assertRaises(SpotifyError, c.toplist_future, 'tracks', 'FR')
+
+    def test_wait_loaded_future(self):
+        c = BaseMockClient()
+        c.event_loop = FakeEventLoop()
+        c._loop_session = session = FakeMetadataSession()
+        objs = [FakeLoadable(), FakeLoadable(True)]
+        future = c.wait_loaded(objs)
+        c._process_events()
+        self.assertFalse(future.done())
+        objs[0].loaded = True
+        c._process_events()
+        # Not checked again until metadata was updated
+        self.assertFalse(future.done())
+        session.updates += 1
+        c._process_events()
+        self.assertTrue(future.done())
+        self.assertEqual(future.result(), objs)
+
+    def test_wait_loaded_loaded(self):
+        c = BaseMockClient()
+        c.event_loop = FakeEventLoop()
+        future = c.wait_loaded([FakeLoadable(True)])
+        self.assertTrue(future.done())
+
+    def test_wait_loaded_timeout(self):
+        c = BaseMockClient()
+        c.event_loop = FakeEventLoop()
+        future = c.wait_loaded([FakeLoadable()], timeout=1)
+        c.event_loop.run_until(future.done)
+        self.assertRaises(SpotifyError, future.result)
+        self.assertEqual(c._load_waiters, [])
+
+    def test_wait_loaded_cancelled(self):
+        c = BaseMockClient()
+        c.event_loop = FakeEventLoop()
+        future = c.wait_loaded([FakeLoadable()], timeout=1)
+        future.cancel()
+        self.assertEqual(c._load_waiters, [])
+        timer = c.event_loop.timers[0]
+        self.assertTrue(timer.cancelled)
+        # A timeout already under way leaves the future alone
+        timer.callback()
+        self.assertTrue(future.cancelled())
+
+    def test_wait_loaded_blocking(self):
+        c = BaseMockClient()
+        session = FakeMetadataSession()
+        thread = threading.Thread(target=c.loop, args=(session,))
+        thread.start()
+        try:
+            obj = FakeLoadable()
+            self.assertFalse(c.wait_loaded([obj], timeout=0.05))
+            def load():
+                obj.loaded = True
+                session.updates += 1
+            loader = threading.Timer(0.05, load)
+            loader.start()
+            self.assertTrue(c.wait_loaded([obj], timeout=5))
+            loader.join()
+        finally:
+            c.terminate()
+            thread.join()
+
+    def test_wait_loaded_checked_in_loop(self):
+        c = BaseMockClient()
+        session = FakeMetadataSession()
+        checks = []
+        class Loadable(FakeLoadable):
+            def is_loaded(self):
+                checks.append(threading.current_thread())
+                return self.loaded
+        thread = threading.Thread(target=c.loop, args=(session,))
+        thread.start()
+        try:
+            self.assertFalse(c.wait_loaded([Loadable()], timeout=0.05))
+            self.assertTrue(c.wait_loaded([Loadable(True)], timeout=5))
+        finally:
+            c.terminate()
+            thread.join()
+        self.assertEqual(set(checks), set([thread]))
+        self.assertEqual(c._load_waiters, [])
+
+    def test_wait_loaded_polls_playlists(self):
+        c = BaseMockClient()
+        c.event_loop = FakeEventLoop()
+        c._loop_session = FakeMetadataSession()
+        playlist = mock_playlist('foo', [], mock_user('user'), is_loaded=0)
+        c.wait_loaded([playlist, FakeLoadable()])
+        self.assertTrue(c._load_waiters[0].polled())
+        c._remove_waiter(c._load_waiters[0])
+        c._remove_waiter(object())
+        self.assertEqual(c._load_waiters, [])
+
+    def start_loop(self, client, session):
+        thread = threading.Thread(target=client.loop, args=(session,))
+        thread.start()
+        def stop():
+            client.terminate()
+            thread.join()
+        self.addCleanup(stop)
+        while client._loop_session is not session:
+            time.sleep(0.01)
+        return thread
+
+    def test_search_iter(self):
+        c = BaseMockClient()
+        session = FakeSearchSession(25)
+        thread = self.start_loop(c, session)
+        tracks = c.search_iter('query', page_size=10, lookahead=1)
+        self.assertEqual(tracks.next(), 0)
+        # The next page is requested while the first one is iterated over
+        deadline = time.time() + 5
+        while len(session.requests) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual([r['track_offset'] for r in session.requests],
+                         [0, 10])
+        self.assertEqual(session.requests[0]['album_count'], 0)
+        self.assertEqual(list(tracks), range(1, 25))
+        self.assertEqual([r['track_offset'] for r in session.requests],
+                         [0, 10, 20])
+        # libspotify is only called from the thread processing events
+        self.assertEqual(session.threads, set([thread]))
+
+    def test_search_iter_not_connected(self):
+        c = BaseMockClient()
+        self.assertRaises(SpotifyError, c.search_iter, 'query')
+        session = FakeSearchSession(0)
+        self.start_loop(c, session)
+        self.assertRaises(ValueError, c.search_iter, 'query', 'playlists')
+        self.assertEqual(list(c.search_iter('query', timeout=5)), [])
+
     def NOtest_load(self):
         class MockClient(BaseMockClient):
             def logged_in(self, session, error):
@@ -0,0 +1,87 @@
+import threading
+import unittest
+
+from spotify._mockspotify import mock_album, mock_artist, mock_track
+from spotify._mockspotify import registry_add, registry_clean
+from spotify.manager import PlaylistSnapshot
+from tests import FakePlaylist
+
+class TestPlaylistSnapshot(unittest.TestCase):
+
+    artist = mock_artist('artist')
+    album = mock_album('album', artist)
+    track = mock_track('track', [artist], album)
+
+    def setUp(self):
+        registry_add('spotify:track:x', self.track)
+        self.playlist = FakePlaylist(['spotify:track:%s' % c for c in 'abcd'])
+        self.snapshot = PlaylistSnapshot(self.playlist)
+
+    def tearDown(self):
+        registry_clean()
+
+    def letters(self):
+        return ''.join(uri[-1] for uri in self.snapshot)
+
+    def test_read(self):
+        self.assertEqual(len(self.snapshot), 4)
+        self.assertEqual(self.snapshot[1], 'spotify:track:b')
+        self.assertEqual(self.snapshot[-1], 'spotify:track:d')
+        self.assertTrue('spotify:track:c' in self.snapshot)
+        self.assertFalse('spotify:track:x' in self.snapshot)
+        self.assertEqual(self.snapshot.index('spotify:track:c'), 2)
+        self.assertEqual(self.snapshot.count('spotify:track:c'), 1)
+
+    def test_watches(self):
+        self.assertEqual(self.playlist.managers, [(self.snapshot, None)])
+        self.snapshot.close()
+        self.assertEqual(self.playlist.managers, [])
+
+    def test_tracks_added(self):
+        self.snapshot.tracks_added(self.playlist, [self.track, self.track], 1,
+                                   None)
+        self.assertEqual(self.letters(), 'axxbcd')
+        self.assertEqual(self.snapshot.count('spotify:track:x'), 2)
+
+    def test_tracks_removed(self):
+        self.snapshot.tracks_added(self.playlist, [self.track], 0, None)
+        self.snapshot.tracks_removed(self.playlist, [4, 0, 2], None)
+        self.assertEqual(self.letters(), 'ac')
+        self.assertFalse('spotify:track:x' in self.snapshot)
+        self.assertFalse('spotify:track:b' in self.snapshot)
+        self.assertEqual(len(self.snapshot), 2)
+
+    def test_tracks_moved(self):
+        self.snapshot.tracks_moved(self.playlist, [0, 2], 4, None)
+        self.assertEqual(self.letters(), 'bdac')
+        self.snapshot.tracks_moved(self.playlist, [3], 0, None)
+        self.assertEqual(self.letters(), 'cbda')
+
+    def test_refresh_when_loaded(self):
+        self.playlist.uris.append('spotify:track:e')
+        self.playlist.loaded = False
+        self.snapshot.playlist_state_changed(self.playlist, None)
+        self.assertEqual(len(self.snapshot), 4)
+        self.playlist.loaded = True
+        self.snapshot.playlist_state_changed(self.playlist, None)
+        self.assertEqual(self.letters(), 'abcde')
+
+    def test_watched_before_read(self):
+        playlist = FakePlaylist(['spotify:track:a'])
+        def tracks_metadata(fields):
+            self.assertEqual(len(playlist.managers), 1)
+            return FakePlaylist.tracks_metadata(playlist, fields)
+        playlist.tracks_metadata = tracks_metadata
+        PlaylistSnapshot(playlist)
+
+    def test_refresh_other_thread(self):
+        errors = []
+        def refresh():
+            try:
+                self.snapshot.refresh()
+            except RuntimeError:
+                errors.append(True)
+        thread = threading.Thread(target=refresh)
+        thread.start()
+        thread.join()
+        self.assertEqual(errors, [True])
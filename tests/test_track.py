@@ -50,3 +50,16 @@ class TestTrack(unittest.TestCase):
 
     def test_is_local(self):
         self.assertFalse(self.track.is_local())
+
+    def test_same_wrapper(self):
+        self.assertTrue(self.track.album() is self.track.album())
+        self.assertTrue(self.track.artists()[0] is self.artists[0])
+
+    def test_eq_hash(self):
+        album1 = self.track.album()
+        album2 = self.track.album()
+        self.assertEqual(album1, album2)
+        self.assertEqual(hash(album1), hash(album2))
+        artist1, artist2 = self.track.artists()
+        self.assertNotEqual(artist1, artist2)
+        self.assertEqual(len(set(self.track.artists() + self.artists)), 2)